@@ -8,6 +8,20 @@ This application features:
 - FrontendArtifactLocator: Intelligent discovery of build artifacts with fallback logic
 - PredictionRequestHandler: Custom request validation and feature engineering
 - CornerstoneApiServer: Flask application with specialized endpoints
+- Batch JSON endpoint scoring many properties in one vectorized prediction
+- Direct inference path filling preallocated NumPy buffers instead of DataFrames
+- Optional compiled flat-array forest engine loaded instead of the pickled pipeline
+- Bounded LRU/TTL prediction cache keyed on model version and canonical features
+- Zero-downtime hot reload of retrained artifacts with smoke-tested atomic swaps
+- Memory-mapped engine artifacts shared between worker processes via the page cache
+- Per-stage request timing, optionally exposed as a Server-Timing response header
+- Prometheus-text /metrics endpoint with stage histograms, error counters and model state
+- Sampled per-request logging (off by default) to keep log writes off the hot path
+- Optional micro-batching that coalesces concurrent single-row predictions into one predict
+- Optional asyncio (ASGI) serving mode, see cornerstone_asgi.py
+- Per-request model selection from the versioned registry (id, alias or weighted traffic
+  split) with an LRU set of resident models bounded by memory
+- Optional uncertainty mode: mean, spread and quantiles of the per-tree predictions
 
 Key Differentiators:
 1. Service-oriented architecture with clear separation of concerns
@@ -17,14 +31,26 @@ Key Differentiators:
 """
 
 import os
+import random
+import hashlib
 import logging
+import threading
+import time
+from datetime import datetime, timezone
 from functools import wraps
-from dataclasses import dataclass
-from typing import Optional, Dict, Tuple
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, replace
+from typing import Optional, Dict, Tuple, List, Any, Union, Callable
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, jsonify, make_response
 import joblib
+import numpy as np
 import pandas as pd
 
+from inference_engine import (DirectForestPredictor, CompiledForestEngine, PredictionCache, MicroBatchCoalescer,
+                              PredictionDistribution, canonical_feature_keys, pipeline_tree_outputs)
+from service_metrics import MetricsRegistry, RequestStageTimer
+from model_registry import VersionedModelRegistry, choose_weighted_target
+
 # ==================== LOGGING CONFIGURATION ====================
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +58,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Largest feature magnitude that survives the float32 cast in the inference engines
+FLOAT32_FEATURE_LIMIT = float(np.finfo(np.float32).max)
+
 
 # ==================== CUSTOM EXCEPTION CLASSES ====================
 class CornerstoneServiceException(Exception):
@@ -44,11 +73,107 @@ class ModelArtifactNotFoundError(CornerstoneServiceException):
     pass
 
 
+class UnknownModelError(ModelArtifactNotFoundError):
+    """Raised when a request names a model id or alias the registry does not know"""
+    pass
+
+
 class InvalidPredictionRequestError(CornerstoneServiceException):
     """Raised when prediction request contains invalid data"""
     pass
 
 
+class BatchSizeExceededError(InvalidPredictionRequestError):
+    """Raised when a batch prediction request exceeds the configured row limit"""
+    pass
+
+
+# ==================== SERVICE CONFIGURATION ====================
+@dataclass
+class CornerstoneServiceConfig:
+    """
+    Configuration container for Cornerstone serving parameters.
+    Keeps request limits and tuning knobs in a single, reproducible structure.
+    """
+    # Upper bound on rows accepted by a single batch prediction request
+    MAX_BATCH_ROWS: int = 100000
+    
+    # Inference backend: 'pipeline' loads pipeline.pkl (with the direct buffer path),
+    # 'compiled' memory-maps the flat-array forest_engine/ and skips unpickling entirely
+    INFERENCE_ENGINE: str = 'pipeline'
+    
+    # Pipeline engine only: evaluate the unpacked forest on NumPy buffers instead of
+    # building a DataFrame per request (disable to serve through Pipeline.predict)
+    DIRECT_INFERENCE_ENABLED: bool = True
+    
+    # Directory holding model artifacts (empty means alongside app.py)
+    ARTIFACT_DIRECTORY: str = ''
+    
+    # Prediction memo cache: entry capacity (0 disables) and entry lifetime (0 never expires)
+    PREDICTION_CACHE_SIZE: int = 4096
+    PREDICTION_CACHE_TTL_SECONDS: float = 3600.0
+    
+    # Seconds between artifact change checks for hot reload (0 disables the watcher)
+    MODEL_RELOAD_INTERVAL_SECONDS: float = 10.0
+    
+    # Micro-batching: concurrent single-row predictions wait up to COALESCE_MAX_WAIT_SECONDS
+    # for each other and run as one predict of at most COALESCE_MAX_BATCH_ROWS rows
+    COALESCING_ENABLED: bool = False
+    COALESCE_MAX_BATCH_ROWS: int = 32
+    COALESCE_MAX_WAIT_SECONDS: float = 0.002
+    
+    # Uncertainty mode: default per-tree quantile levels (comma-separated) and the most
+    # levels a request may ask for
+    PREDICTION_QUANTILES: str = '0.1,0.9'
+    MAX_PREDICTION_QUANTILES: int = 9
+    
+    # Attach per-stage durations to prediction responses as a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = False
+    
+    # Front-end started by run(): 'wsgi' (Flask server) or 'asgi' (asyncio server, cornerstone_asgi.py)
+    SERVING_MODE: str = 'wsgi'
+    
+    # ASGI mode: threads evaluating forests off the event loop, and the in-flight request
+    # limit past which requests get 503 with Retry-After
+    ASYNC_EXECUTOR_WORKERS: int = 4
+    ASYNC_MAX_IN_FLIGHT: int = 64
+    ASYNC_RETRY_AFTER_SECONDS: int = 1
+    
+    # ASGI mode: largest accepted request body, timeout for each client read or write,
+    # and how long shutdown waits for in-flight predictions to drain
+    ASYNC_MAX_BODY_BYTES: int = 16 * 1024 * 1024
+    ASYNC_CLIENT_TIMEOUT_SECONDS: float = 15.0
+    ASYNC_SHUTDOWN_GRACE_SECONDS: float = 30.0
+    
+    # Fraction of successful predictions logged individually (0 = off, 1 = every request);
+    # failures are always logged and every request is counted in /metrics
+    REQUEST_LOG_SAMPLE_RATE: float = 0.0
+    
+    # Versioned model registry (empty means model_registry/ in the artifact directory)
+    MODEL_REGISTRY_DIRECTORY: str = ''
+    
+    # Memory budget for registry models kept loaded, evicted least recently used first
+    RESIDENT_MODEL_MEMORY_MB: float = 1024.0
+    
+    # Traffic split that routes requests naming no model (the root artifacts serve them
+    # while the registry has no split of this name)
+    DEFAULT_TRAFFIC_SPLIT: str = 'default'
+    
+    @classmethod
+    def from_environment(cls, prefix: str = 'CORNERSTONE_') -> 'CornerstoneServiceConfig':
+        """Build a configuration, overriding defaults with PREFIX_<FIELD> environment variables"""
+        overrides = {}
+        for config_field in fields(cls):
+            raw_value = os.environ.get(f'{prefix}{config_field.name}')
+            if raw_value is None:
+                continue
+            if config_field.type is bool:
+                overrides[config_field.name] = raw_value.strip().lower() in ('1', 'true', 'yes', 'on')
+            else:
+                overrides[config_field.name] = config_field.type(raw_value)
+        return cls(**overrides)
+
+
 # ==================== FRONTEND ARTIFACT LOCATOR ====================
 @dataclass
 class FrontendArtifactLocator:
@@ -83,58 +208,570 @@ class FrontendArtifactLocator:
 
 
 # ==================== INFERENCE SERVICE BRIDGE ====================
+@dataclass(frozen=True)
+class LoadedInferenceModel:
+    """
+    Immutable snapshot of one loaded model version.
+    Requests capture a snapshot once and use it throughout, so a hot reload
+    swapping in a new snapshot never changes the model under an in-flight request.
+    """
+    version: str
+    artifact_path: str
+    artifact_signature: Tuple
+    features: List[str]
+    pipeline: Any = None
+    direct_predictor: Optional[Union[DirectForestPredictor, CompiledForestEngine]] = None
+    loaded_at: float = 0.0
+    load_duration_seconds: float = 0.0
+    resident_bytes: int = 0
+
+
 class InferenceServiceBridge:
     """
     Custom abstraction layer for accessing the trained ML inference pipeline.
     Handles model loading, caching, and error management.
     """
     
-    def __init__(self, base_directory: str):
+    def __init__(self, base_directory: str, config: Optional[CornerstoneServiceConfig] = None):
         self.base_directory = base_directory
-        self._cached_pipeline = None
-        self._cached_features = None
+        self.config = config or CornerstoneServiceConfig()
+        self._active_model: Optional[LoadedInferenceModel] = None
+        self._buffer_storage = threading.local()
+        self._reload_lock = threading.Lock()
+        self._reload_monitor: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+        self._rejected_signature = None
+        self.reload_history: Dict[str, Any] = {
+            'reload_count': 0, 'failure_count': 0, 'last_attempt_at': None, 'last_error': None
+        }
+        self.prediction_cache = PredictionCache(
+            self.config.PREDICTION_CACHE_SIZE,
+            self.config.PREDICTION_CACHE_TTL_SECONDS
+        )
+        self.coalescer: Optional[MicroBatchCoalescer] = None
+        if self.config.COALESCING_ENABLED:
+            self.coalescer = MicroBatchCoalescer(
+                self.config.COALESCE_MAX_BATCH_ROWS,
+                self.config.COALESCE_MAX_WAIT_SECONDS
+            )
+        
+        # Registry models: resident snapshots in LRU order, and the routing (aliases and
+        # traffic splits) requests resolve against, published only once its targets are loaded
+        self.model_registry = VersionedModelRegistry(
+            self.config.MODEL_REGISTRY_DIRECTORY or os.path.join(base_directory, 'model_registry')
+        )
+        self._resident_models: 'OrderedDict[str, LoadedInferenceModel]' = OrderedDict()
+        self._resident_lock = threading.Lock()
+        self._registry_load_lock = threading.Lock()
+        self._routing: Dict[str, Any] = {'aliases': {}, 'traffic_splits': {}}
+        self._routing_signature = None
+        self.resident_history: Dict[str, int] = {'loads': 0, 'evictions': 0}
     
     def load_inference_artifacts(self) -> bool:
         """Attempt to load trained model and metadata artifacts"""
-        pipeline_path = os.path.join(self.base_directory, 'pipeline.pkl')
-        features_path = os.path.join(self.base_directory, 'model_columns.pkl')
+        try:
+            loaded_model = self._load_model_snapshot()
+        except Exception as e:
+            logger.error(f'Failed to load inference artifacts: {e}')
+            return False
         
-        if not os.path.exists(pipeline_path):
-            logger.error(f'Inference pipeline not found at {pipeline_path}')
+        if loaded_model is None:
             return False
         
+        self._activate_model(loaded_model)
+        logger.info(f'Inference artifacts loaded successfully (version {loaded_model.version})')
+        return True
+    
+    def _resolve_artifact_paths(self) -> Tuple[str, str]:
+        """Select the model artifact for the configured engine, plus the feature metadata path"""
+        features_path = os.path.join(self.base_directory, 'model_columns.pkl')
+        
+        if self.config.INFERENCE_ENGINE == 'compiled':
+            engine_path = os.path.join(self.base_directory, 'forest_engine')
+            if os.path.isdir(engine_path):
+                return engine_path, features_path
+            logger.warning(f'Compiled engine not found at {engine_path} - falling back to pipeline')
+        
+        return os.path.join(self.base_directory, 'pipeline.pkl'), features_path
+    
+    @staticmethod
+    def _artifact_signature(*artifact_paths: str) -> Tuple:
+        """Cheap change detector: modification time and size of each artifact"""
+        signature = []
+        for artifact_path in artifact_paths:
+            if os.path.isdir(artifact_path):
+                # Engine directories are republished whole; the manifest is written last
+                artifact_path = os.path.join(artifact_path, CompiledForestEngine.MANIFEST_NAME)
+            if os.path.exists(artifact_path):
+                stat_result = os.stat(artifact_path)
+                signature.append((artifact_path, stat_result.st_mtime_ns, stat_result.st_size))
+        return tuple(signature)
+    
+    def _load_model_snapshot(self) -> Optional[LoadedInferenceModel]:
+        """Load the current artifacts into a new snapshot without touching the active model"""
+        artifact_path, features_path = self._resolve_artifact_paths()
+        
+        if not os.path.exists(artifact_path):
+            logger.error(f'Inference pipeline not found at {artifact_path}')
+            return None
+        
+        return self._load_artifact(
+            artifact_path,
+            self._artifact_signature(artifact_path, features_path),
+            lambda: joblib.load(features_path) if os.path.exists(features_path) else [],
+            self._compute_artifact_digest(artifact_path)
+        )
+    
+    def _load_artifact(self, artifact_path: str, signature: Tuple, load_features: Callable[[], List[str]],
+                       version: str) -> LoadedInferenceModel:
+        """Load a pipeline pickle or a compiled engine directory into a snapshot"""
+        load_started = time.perf_counter()
+        
+        if os.path.isdir(artifact_path):
+            engine = CompiledForestEngine.load(artifact_path)
+            pipeline, features, direct_predictor = None, engine.feature_names, engine
+            resident_bytes = engine.nbytes
+            logger.info(f'Compiled engine loaded ({engine.tree_count} trees, {engine.node_count} nodes)')
+        else:
+            pipeline = joblib.load(artifact_path)
+            features = load_features()
+            direct_predictor = None
+            if self.config.DIRECT_INFERENCE_ENABLED:
+                direct_predictor = self._prepare_direct_predictor(pipeline, features)
+            # The pickle size tracks the unpickled forest closely enough for budgeting
+            resident_bytes = os.path.getsize(artifact_path)
+        
+        return LoadedInferenceModel(
+            version=version,
+            artifact_path=artifact_path,
+            artifact_signature=signature,
+            features=features,
+            pipeline=pipeline,
+            direct_predictor=direct_predictor,
+            loaded_at=time.time(),
+            load_duration_seconds=time.perf_counter() - load_started,
+            resident_bytes=resident_bytes
+        )
+    
+    def _activate_model(self, loaded_model: LoadedInferenceModel):
+        """Atomically publish a snapshot; requests already holding the old one finish on it"""
+        self._active_model = loaded_model
+        self.prediction_cache.clear()
+    
+    @staticmethod
+    def _compute_artifact_digest(artifact_path: str) -> str:
+        """Content hash identifying the loaded model artifact"""
+        if os.path.isdir(artifact_path):
+            # The manifest checksum covers every array, without reading the mapped buffers
+            return CompiledForestEngine.read_manifest(artifact_path)['checksum'][:16]
+        
+        digest = hashlib.sha256()
+        with open(artifact_path, 'rb') as artifact_file:
+            for block in iter(lambda: artifact_file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def _prepare_direct_predictor(pipeline, features: List[str]) -> Optional[DirectForestPredictor]:
+        """Unpack the pipeline for direct inference, keeping it only if it matches exactly"""
+        predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+        if predictor is None:
+            logger.info('Direct inference unavailable for this pipeline - using Pipeline.predict')
+            return None
+        
         try:
-            self._cached_pipeline = joblib.load(pipeline_path)
-            self._cached_features = joblib.load(features_path) if os.path.exists(features_path) else []
-            logger.info('Inference artifacts loaded successfully')
-            return True
+            is_identical = predictor.matches_pipeline(pipeline, predictor.build_probe_matrix())
         except Exception as e:
-            logger.error(f'Failed to load inference artifacts: {e}')
+            logger.warning(f'Direct inference verification failed: {e} - using Pipeline.predict')
+            return None
+        
+        if not is_identical:
+            logger.warning('Direct inference diverged from Pipeline.predict - using Pipeline.predict')
+            return None
+        
+        logger.info('Direct inference path enabled')
+        return predictor
+    
+    # ---------- Hot reload ----------
+    
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Load, smoke-test and swap in the artifact if it changed on disk.
+        The active model stays in place whenever loading or the smoke prediction fails.
+        Returns True when a new model version was activated.
+        """
+        with self._reload_lock:
+            artifact_path, features_path = self._resolve_artifact_paths()
+            signature = self._artifact_signature(artifact_path, features_path)
+            current_model = self._active_model
+            
+            if not force and current_model is not None and signature == current_model.artifact_signature:
+                return False
+            if not force and signature == self._rejected_signature:
+                return False
+            
+            self.reload_history['last_attempt_at'] = time.time()
+            try:
+                candidate = self._load_model_snapshot()
+                if candidate is None:
+                    raise ModelArtifactNotFoundError(f'Model artifact missing at {artifact_path}')
+                if current_model is not None and candidate.version == current_model.version:
+                    # Touched but identical content: adopt the new signature, keep the warm cache
+                    self._active_model = replace(current_model, artifact_signature=candidate.artifact_signature)
+                    return False
+                self._run_smoke_prediction(candidate)
+            except Exception as e:
+                self._rejected_signature = signature
+                self.reload_history['failure_count'] += 1
+                self.reload_history['last_error'] = f'{type(e).__name__}: {e}'
+                logger.error(f'Model reload rejected, keeping version '
+                             f'{current_model.version if current_model else None}: {e}')
+                return False
+            
+            self._activate_model(candidate)
+            self._rejected_signature = None
+            self.reload_history['reload_count'] += 1
+            self.reload_history['last_error'] = None
+            logger.info(f'Model hot-reloaded: version {candidate.version} '
+                        f'({candidate.load_duration_seconds * 1000:.0f} ms load)')
+            return True
+    
+    def _run_smoke_prediction(self, candidate: LoadedInferenceModel):
+        """Predict on an all-missing probe row; a non-finite answer rejects the candidate"""
+        probe_matrix = np.full((1, len(candidate.features)), np.nan)
+        if candidate.direct_predictor is None:
+            # The pipeline's own imputer fills the probe row
+            probe_prediction = self._predict_matrix(candidate, probe_matrix, candidate.features)
+        else:
+            probe_prediction = candidate.direct_predictor.predict_buffer(probe_matrix)
+        
+        if probe_prediction.shape != (1,) or not np.all(np.isfinite(probe_prediction)):
+            raise InvalidPredictionRequestError(f'Smoke prediction returned {probe_prediction!r}')
+    
+    def start_reload_monitor(self, interval_seconds: float):
+        """Poll the artifact in a daemon thread and hot-swap new versions as they appear"""
+        if interval_seconds <= 0 or self._reload_monitor is not None:
+            return
+        
+        def monitor_artifacts():
+            while not self._monitor_stop.wait(interval_seconds):
+                try:
+                    self.reload_if_changed()
+                    self.refresh_registry_routing()
+                except Exception as e:
+                    logger.error(f'Artifact monitor error: {e}')
+        
+        self._reload_monitor = threading.Thread(target=monitor_artifacts, name='cornerstone-artifact-monitor', daemon=True)
+        self._reload_monitor.start()
+        logger.info(f'Watching model artifacts every {interval_seconds:g}s for hot reload')
+    
+    def stop_reload_monitor(self):
+        """Stop the artifact polling thread"""
+        self._monitor_stop.set()
+        if self._reload_monitor is not None:
+            self._reload_monitor.join(timeout=5)
+            self._reload_monitor = None
+    
+    # ---------- Registry models ----------
+    
+    def refresh_registry_routing(self) -> bool:
+        """
+        Pick up edited aliases and traffic splits.
+        Every model they reference is loaded before the new routing is published, so
+        requests routed by alias or split never wait for a model load.
+        Returns True when new routing was published.
+        """
+        signature = self.model_registry.routing_signature()
+        if signature == self._routing_signature:
             return False
+        
+        routing = self.model_registry.read_routing()
+        routed_ids = set(routing['aliases'].values())
+        for weights in routing['traffic_splits'].values():
+            routed_ids.update(routing['aliases'].get(reference, reference) for reference in weights)
+        
+        for model_id in sorted(routed_ids):
+            try:
+                self.acquire_registry_model(model_id)
+            except Exception as e:
+                # Requests routed to this model load it on demand (and fail if it stays broken)
+                logger.error(f'Failed to preload routed model {model_id}: {e}')
+        
+        self._routing, self._routing_signature = routing, signature
+        logger.info(f"Model routing updated: {len(routing['aliases'])} aliases, "
+                    f"{len(routing['traffic_splits'])} traffic splits")
+        return True
     
-    def generate_prediction(self, input_dataframe: pd.DataFrame) -> float:
-        """Execute prediction through loaded inference pipeline"""
-        if self._cached_pipeline is None:
+    def acquire_registry_model(self, model_id: str) -> LoadedInferenceModel:
+        """Resident snapshot of a registry version, loading and admitting it on a miss"""
+        loaded_model = self._lookup_resident_model(model_id)
+        if loaded_model is not None:
+            return loaded_model
+        
+        with self._registry_load_lock:
+            # Another request may have loaded it while this one waited
+            loaded_model = self._lookup_resident_model(model_id)
+            if loaded_model is not None:
+                return loaded_model
+            
+            if not self.model_registry.has_version(model_id):
+                raise UnknownModelError(f'Unknown model {model_id!r}')
+            manifest = self.model_registry.read_manifest(model_id)
+            model_directory = self.model_registry.model_directory(model_id)
+            artifact_name = manifest['artifacts']['pipeline']
+            if self.config.INFERENCE_ENGINE == 'compiled' and manifest['artifacts'].get('engine'):
+                artifact_name = manifest['artifacts']['engine']
+            
+            artifact_path = os.path.join(model_directory, artifact_name)
+            loaded_model = self._load_artifact(
+                artifact_path, self._artifact_signature(artifact_path), lambda: manifest['features'], model_id
+            )
+            self._run_smoke_prediction(loaded_model)
+            self._admit_resident_model(loaded_model)
+            logger.info(f'Registry model {model_id} loaded '
+                        f'({loaded_model.load_duration_seconds * 1000:.0f} ms, {loaded_model.resident_bytes} bytes)')
+            return loaded_model
+    
+    def _lookup_resident_model(self, model_id: str) -> Optional[LoadedInferenceModel]:
+        """Resident snapshot of a model, marked most recently used, or None"""
+        with self._resident_lock:
+            loaded_model = self._resident_models.get(model_id)
+            if loaded_model is not None:
+                self._resident_models.move_to_end(model_id)
+            return loaded_model
+    
+    def _admit_resident_model(self, loaded_model: LoadedInferenceModel):
+        """
+        Keep a snapshot resident, evicting least recently used models past the memory budget.
+        The newest model always stays, even alone over budget; requests already holding an
+        evicted snapshot finish on it.
+        """
+        budget_bytes = self.config.RESIDENT_MODEL_MEMORY_MB * 1024 * 1024
+        with self._resident_lock:
+            self._resident_models[loaded_model.version] = loaded_model
+            self.resident_history['loads'] += 1
+            resident_bytes = sum(model.resident_bytes for model in self._resident_models.values())
+            while len(self._resident_models) > 1 and resident_bytes > budget_bytes:
+                evicted_id, evicted_model = self._resident_models.popitem(last=False)
+                resident_bytes -= evicted_model.resident_bytes
+                self.resident_history['evictions'] += 1
+                logger.info(f'Registry model {evicted_id} evicted from memory')
+    
+    def select_model(self, model_reference: Optional[str] = None,
+                     routing_key: Optional[str] = None) -> LoadedInferenceModel:
+        """
+        Model snapshot for one request: the named id or alias, else the default traffic
+        split (sticky per routing key), else the root artifacts' active model.
+        """
+        routing = self._routing
+        if not model_reference:
+            weights = routing['traffic_splits'].get(self.config.DEFAULT_TRAFFIC_SPLIT)
+            if not weights:
+                return self._require_model(None)
+            model_reference = choose_weighted_target(weights, routing_key, self.config.DEFAULT_TRAFFIC_SPLIT)
+        
+        model_id = routing['aliases'].get(model_reference, model_reference)
+        active_model = self._active_model
+        if active_model is not None and active_model.version == model_id:
+            # The root artifacts hold this version already (registry ids are the same digest)
+            return active_model
+        
+        try:
+            return self.acquire_registry_model(model_id)
+        except UnknownModelError:
+            raise UnknownModelError(f'Unknown model {model_reference!r}')
+        except Exception as e:
+            raise ModelArtifactNotFoundError(f'Model {model_reference!r} could not be loaded: {e}')
+    
+    def describe_resident_models(self) -> Dict[str, Any]:
+        """Resident registry models (least recently used first), routing and memory budget"""
+        with self._resident_lock:
+            resident_models = list(self._resident_models.values())
+        return {
+            'resident_models': [
+                {
+                    'model_id': loaded_model.version,
+                    'artifact_path': loaded_model.artifact_path,
+                    'resident_bytes': loaded_model.resident_bytes,
+                    'loaded_at': datetime.fromtimestamp(loaded_model.loaded_at, timezone.utc).isoformat()
+                }
+                for loaded_model in resident_models
+            ],
+            'resident_bytes': sum(loaded_model.resident_bytes for loaded_model in resident_models),
+            'memory_budget_bytes': int(self.config.RESIDENT_MODEL_MEMORY_MB * 1024 * 1024),
+            'default_traffic_split': self.config.DEFAULT_TRAFFIC_SPLIT,
+            'routing': self._routing,
+            **self.resident_history
+        }
+    
+    # ---------- Prediction ----------
+    
+    def _require_model(self, loaded_model: Optional[LoadedInferenceModel]) -> LoadedInferenceModel:
+        """Resolve the snapshot for a call, defaulting to the active model"""
+        loaded_model = loaded_model or self._active_model
+        if loaded_model is None:
             raise ModelArtifactNotFoundError('Inference pipeline not loaded')
+        return loaded_model
+    
+    def generate_prediction(self, input_dataframe: pd.DataFrame,
+                            loaded_model: Optional[LoadedInferenceModel] = None) -> float:
+        """Execute prediction through loaded inference pipeline"""
+        loaded_model = self._require_model(loaded_model)
+        
+        if loaded_model.features:
+            # The direct and compiled paths read columns by position, so align them by name first
+            missing_features = [feature for feature in loaded_model.features if feature not in input_dataframe.columns]
+            if missing_features:
+                raise InvalidPredictionRequestError(f'Missing model features: {", ".join(missing_features)}')
+            input_dataframe = input_dataframe[loaded_model.features]
+        
+        try:
+            feature_matrix = input_dataframe.to_numpy(dtype=np.float64, copy=True)
+            return float(self._predict_with_cache(loaded_model, feature_matrix, list(input_dataframe.columns))[0])
+        except Exception as e:
+            raise InvalidPredictionRequestError(f'Prediction failed: {e}')
+    
+    def acquire_feature_buffer(self, feature_count: int) -> np.ndarray:
+        """Return this thread's preallocated single-row feature buffer"""
+        feature_buffer = getattr(self._buffer_storage, 'feature_buffer', None)
+        if feature_buffer is None or feature_buffer.shape[1] != feature_count:
+            feature_buffer = np.zeros((1, feature_count), dtype=np.float64)
+            self._buffer_storage.feature_buffer = feature_buffer
+        return feature_buffer
+    
+    def generate_direct_prediction(self, feature_buffer: np.ndarray,
+                                   loaded_model: Optional[LoadedInferenceModel] = None) -> float:
+        """Execute prediction on a filled feature buffer, bypassing pandas and sklearn validation"""
+        loaded_model = self._require_model(loaded_model)
+        if loaded_model.direct_predictor is None:
+            raise ModelArtifactNotFoundError('Direct inference path not available')
         
         try:
-            prediction = self._cached_pipeline.predict(input_dataframe)[0]
-            return float(prediction)
+            return float(self._predict_with_cache(loaded_model, feature_buffer, loaded_model.features)[0])
         except Exception as e:
             raise InvalidPredictionRequestError(f'Prediction failed: {e}')
     
+    def generate_batch_predictions(self, feature_matrix: np.ndarray, feature_columns: List[str],
+                                   loaded_model: Optional[LoadedInferenceModel] = None) -> np.ndarray:
+        """Execute a single vectorized prediction over every row of the batch"""
+        loaded_model = self._require_model(loaded_model)
+        
+        if len(feature_matrix) == 0:
+            return np.empty(0, dtype=np.float64)
+        
+        try:
+            return self._predict_with_cache(loaded_model, feature_matrix, feature_columns)
+        except Exception as e:
+            raise InvalidPredictionRequestError(f'Batch prediction failed: {e}')
+    
+    def generate_prediction_distribution(self, feature_matrix: np.ndarray, feature_columns: List[str],
+                                         quantile_levels: Tuple[float, ...],
+                                         loaded_model: Optional[LoadedInferenceModel] = None) -> PredictionDistribution:
+        """
+        Mean, standard deviation and quantiles of the per-tree predictions for every row.
+        Bypasses the prediction cache and coalescer, which only hold point predictions.
+        """
+        loaded_model = self._require_model(loaded_model)
+        if len(feature_matrix) == 0:
+            return PredictionDistribution.from_tree_outputs(np.empty((0, 1)), quantile_levels)
+        
+        try:
+            if loaded_model.direct_predictor is not None:
+                tree_outputs = loaded_model.direct_predictor.predict_tree_outputs(feature_matrix)
+            else:
+                input_dataframe = pd.DataFrame(feature_matrix, columns=feature_columns)
+                tree_outputs = pipeline_tree_outputs(loaded_model.pipeline, input_dataframe)
+            return PredictionDistribution.from_tree_outputs(tree_outputs, quantile_levels)
+        except Exception as e:
+            raise InvalidPredictionRequestError(f'Uncertainty estimation failed: {e}')
+    
+    @staticmethod
+    def _predict_matrix(loaded_model: LoadedInferenceModel, feature_matrix: np.ndarray,
+                        feature_columns: List[str]) -> np.ndarray:
+        """Run a model snapshot over a feature matrix, preferring the direct path"""
+        if loaded_model.direct_predictor is not None:
+            return loaded_model.direct_predictor.predict_buffer(feature_matrix)
+        input_dataframe = pd.DataFrame(feature_matrix, columns=feature_columns)
+        return np.asarray(loaded_model.pipeline.predict(input_dataframe), dtype=np.float64)
+    
+    def _run_model(self, loaded_model: LoadedInferenceModel, feature_matrix: np.ndarray,
+                   feature_columns: List[str]) -> np.ndarray:
+        """Run the model, coalescing single rows with concurrent requests when enabled"""
+        if self.coalescer is None or len(feature_matrix) != 1:
+            return self._predict_matrix(loaded_model, feature_matrix, feature_columns)
+        
+        predicted_value = self.coalescer.submit(
+            (loaded_model.version, tuple(feature_columns)),
+            feature_matrix[0],
+            lambda batch_matrix: self._predict_matrix(loaded_model, batch_matrix, feature_columns)
+        )
+        return np.array([predicted_value], dtype=np.float64)
+    
+    def _predict_with_cache(self, loaded_model: LoadedInferenceModel, feature_matrix: np.ndarray,
+                            feature_columns: List[str]) -> np.ndarray:
+        """Serve rows from the prediction cache and run the model only for the misses"""
+        if not self.prediction_cache.enabled:
+            return self._run_model(loaded_model, feature_matrix, feature_columns)
+        
+        imputation_medians = getattr(loaded_model.direct_predictor, 'imputation_medians', None)
+        feature_keys = canonical_feature_keys(feature_matrix, imputation_medians, feature_columns)
+        cached_values = self.prediction_cache.lookup_many(loaded_model.version, feature_keys)
+        
+        missing_rows = [row for row, value in enumerate(cached_values) if value is None]
+        if not missing_rows:
+            return np.asarray(cached_values, dtype=np.float64)
+        
+        predictions = np.asarray([np.nan if value is None else value for value in cached_values], dtype=np.float64)
+        fresh_values = self._run_model(loaded_model, feature_matrix[missing_rows], feature_columns)
+        predictions[missing_rows] = fresh_values
+        
+        self.prediction_cache.store_many(
+            loaded_model.version,
+            [feature_keys[row] for row in missing_rows],
+            fresh_values.tolist()
+        )
+        return predictions
+    
+    @property
+    def active_model(self) -> Optional[LoadedInferenceModel]:
+        """Snapshot of the model currently serving requests"""
+        return self._active_model
+    
     @property
     def model_features(self):
         """Access the list of expected model features"""
-        return self._cached_features
+        return self._active_model.features if self._active_model else None
     
     @property
     def is_ready(self):
         """Check if inference service is ready for predictions"""
-        return self._cached_pipeline is not None
+        return self._active_model is not None or bool(self._routing['traffic_splits'].get(self.config.DEFAULT_TRAFFIC_SPLIT))
+    
+    @property
+    def model_version(self):
+        """Content hash of the loaded model artifact"""
+        return self._active_model.version if self._active_model else None
+    
+    @property
+    def supports_direct_inference(self):
+        """Check if the buffer-based direct inference path is active"""
+        return self._active_model is not None and self._active_model.direct_predictor is not None
 
 
 # ==================== PREDICTION REQUEST HANDLER ====================
+@dataclass
+class BatchValidationResult:
+    """
+    Outcome of validating a batch prediction payload.
+    Valid rows are packed into one matrix; invalid rows are reported, not raised.
+    """
+    feature_matrix: np.ndarray
+    feature_columns: List[str]
+    row_indices: np.ndarray
+    total_rows: int
+    row_errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
 class PredictionRequestHandler:
     """
     Specialized handler for prediction requests with validation and feature engineering.
@@ -147,6 +784,10 @@ class PredictionRequestHandler:
         """
         Validate form data and construct feature DataFrame for model inference.
         """
+        return self.construct_feature_frame(self.validate_form_features(form_data))
+    
+    def validate_form_features(self, form_data: dict) -> Dict[str, float]:
+        """Validate form fields into a feature-name to float mapping"""
         if self.model_features:
             # Strict validation: expect all known model features
             feature_dict = {}
@@ -156,17 +797,130 @@ class PredictionRequestHandler:
                     feature_dict[feature] = value
                 except ValueError:
                     raise InvalidPredictionRequestError(f'Invalid value for feature {feature}')
-            
-            feature_dataframe = pd.DataFrame([feature_dict])
-        else:
-            # Fallback: accept any numeric form fields
+            return feature_dict
+        
+        # Fallback: accept any numeric form fields
+        try:
+            return {k: float(v) for k, v in form_data.items()}
+        except ValueError:
+            raise InvalidPredictionRequestError('Non-numeric values in request')
+    
+    @staticmethod
+    def construct_feature_frame(feature_dict: Dict[str, float]) -> pd.DataFrame:
+        """Single-row feature DataFrame in the order the features were validated"""
+        return pd.DataFrame([feature_dict])
+    
+    def populate_feature_buffer(self, form_data: dict, feature_buffer: np.ndarray):
+        """
+        Validate form data straight into a preallocated single-row feature buffer.
+        Applies the same defaults and errors as validate_and_construct_features.
+        """
+        feature_row = feature_buffer[0]
+        for position, feature in enumerate(self.model_features):
             try:
-                feature_dict = {k: float(v) for k, v in form_data.items()}
-                feature_dataframe = pd.DataFrame([feature_dict])
+                feature_row[position] = float(form_data.get(feature, 0))
             except ValueError:
-                raise InvalidPredictionRequestError('Non-numeric values in request')
+                raise InvalidPredictionRequestError(f'Invalid value for feature {feature}')
+    
+    @staticmethod
+    def parse_quantile_levels(raw_levels: Union[str, List[Any]], max_levels: int) -> Tuple[float, ...]:
+        """Validate quantile levels given as '0.1,0.9' or a JSON list into a sorted tuple"""
+        if isinstance(raw_levels, str):
+            raw_levels = [level for level in raw_levels.split(',') if level.strip()]
+        if not isinstance(raw_levels, list):
+            raise InvalidPredictionRequestError("'quantiles' must be a list of levels between 0 and 1")
         
-        return feature_dataframe
+        try:
+            levels = sorted({float(level) for level in raw_levels})
+        except (TypeError, ValueError):
+            raise InvalidPredictionRequestError("'quantiles' must be a list of levels between 0 and 1")
+        if not all(0.0 <= level <= 1.0 for level in levels):
+            raise InvalidPredictionRequestError("'quantiles' must be a list of levels between 0 and 1")
+        if len(levels) > max_levels:
+            raise InvalidPredictionRequestError(f'At most {max_levels} quantile levels per request')
+        return tuple(levels)
+    
+    def validate_batch_payload(self, payload: Any, max_rows: int) -> BatchValidationResult:
+        """
+        Validate a JSON batch payload and construct one feature frame for all valid rows.
+        
+        Accepted payload shapes:
+            [{"OverallQual": 7, ...}, ...]                 - list of feature objects
+            {"instances": [{"OverallQual": 7, ...}, ...]}  - wrapped list of feature objects
+            {"columns": {"OverallQual": [7, 5], ...}}      - columnar arrays of equal length
+        
+        Missing or null features default to 0, matching the form endpoint. Rows with
+        non-numeric, non-finite or beyond-float32 values (the engines score float32
+        features) are reported in row_errors and excluded from the matrix.
+        """
+        row_errors = []
+        
+        if isinstance(payload, dict) and 'columns' in payload:
+            columns = payload['columns']
+            if not isinstance(columns, dict):
+                raise InvalidPredictionRequestError("'columns' must map feature names to arrays")
+            
+            lengths = {len(values) for values in columns.values() if isinstance(values, list)}
+            if len(lengths) != 1 or not all(isinstance(v, list) for v in columns.values()):
+                raise InvalidPredictionRequestError("'columns' must contain arrays of equal length")
+            
+            total_rows = lengths.pop()
+            if total_rows > max_rows:
+                raise BatchSizeExceededError(f'Batch of {total_rows} rows exceeds limit of {max_rows}')
+            raw_frame = pd.DataFrame(columns)
+        else:
+            records = payload.get('instances') if isinstance(payload, dict) else payload
+            if not isinstance(records, list):
+                raise InvalidPredictionRequestError(
+                    "Batch payload must be a list of feature objects, {'instances': [...]} or {'columns': {...}}"
+                )
+            
+            total_rows = len(records)
+            if total_rows > max_rows:
+                raise BatchSizeExceededError(f'Batch of {total_rows} rows exceeds limit of {max_rows}')
+            
+            # Non-object entries become empty rows here and are flagged below
+            malformed_rows = [i for i, record in enumerate(records) if not isinstance(record, dict)]
+            if malformed_rows:
+                records = [record if isinstance(record, dict) else {} for record in records]
+                row_errors.extend({'row': i, 'error': 'Row must be a JSON object'} for i in malformed_rows)
+            raw_frame = pd.DataFrame.from_records(records) if records else pd.DataFrame()
+        
+        feature_columns = list(self.model_features) if self.model_features else list(raw_frame.columns)
+        feature_matrix = np.zeros((total_rows, len(feature_columns)), dtype=np.float64)
+        invalid_mask = np.zeros(total_rows, dtype=bool)
+        invalid_mask[[error['row'] for error in row_errors]] = True
+        
+        # Column-wise coercion validates the whole batch in one pass per feature
+        for position, feature in enumerate(feature_columns):
+            if feature not in raw_frame.columns:
+                continue
+            
+            raw_values = raw_frame[feature]
+            numeric_values = pd.to_numeric(raw_values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(numeric_values)
+            rejected = missing & raw_values.notna().to_numpy()
+            # inf, "inf" and magnitudes like 1e300 would overflow the float32 cast
+            out_of_range = ~missing & ~(np.abs(numeric_values) <= FLOAT32_FEATURE_LIMIT)
+            
+            for row in np.flatnonzero(rejected & ~invalid_mask):
+                row_errors.append({'row': int(row), 'error': f'Invalid value for feature {feature}'})
+            for row in np.flatnonzero(out_of_range & ~invalid_mask):
+                row_errors.append({'row': int(row), 'error': f'Value for feature {feature} is not a finite float32'})
+            invalid_mask |= rejected | out_of_range
+            
+            feature_matrix[:, position] = np.where(missing | out_of_range, 0.0, numeric_values)
+        
+        row_indices = np.flatnonzero(~invalid_mask)
+        row_errors.sort(key=lambda error: error['row'])
+        
+        return BatchValidationResult(
+            feature_matrix=feature_matrix[row_indices],
+            feature_columns=feature_columns,
+            row_indices=row_indices,
+            total_rows=total_rows,
+            row_errors=row_errors
+        )
 
 
 # ==================== CORNERSTONE API SERVER ====================
@@ -175,16 +929,279 @@ class CornerstoneApiServer:
     Custom Flask application wrapper implementing distinctive API patterns.
     """
     
-    def __init__(self, base_directory: str):
+    # Per-request model selection: a model id or alias (also accepted as the 'model'
+    # query argument or batch JSON key), and the key that keeps traffic splits sticky
+    MODEL_HEADER = 'X-Cornerstone-Model'
+    ROUTING_KEY_HEADER = 'X-Cornerstone-Routing-Key'
+    
+    def __init__(self, base_directory: str, config: Optional[CornerstoneServiceConfig] = None):
         self.base_directory = base_directory
+        self.config = config or CornerstoneServiceConfig()
         
         # Initialize component services
         self.frontend_locator = FrontendArtifactLocator(base_directory)
-        self.inference_bridge = InferenceServiceBridge(base_directory)
+        self.inference_bridge = InferenceServiceBridge(self.config.ARTIFACT_DIRECTORY or base_directory, self.config)
+        self.metrics = MetricsRegistry()
+        self._register_metrics()
         
         # Create Flask app with discovered configuration
         self._initialize_flask_app()
     
+    def _register_metrics(self):
+        """Declare the service metric families and the scrape-time model/cache collector"""
+        self.request_duration = self.metrics.histogram(
+            'request_duration_seconds', 'Prediction request handling time', ('endpoint',)
+        )
+        self.stage_duration = self.metrics.histogram(
+            'request_stage_duration_seconds', 'Time spent in each prediction request stage', ('endpoint', 'stage')
+        )
+        self.request_total = self.metrics.counter(
+            'requests_total', 'Prediction requests by outcome', ('endpoint', 'outcome')
+        )
+        self.error_total = self.metrics.counter(
+            'prediction_errors_total', 'Failed prediction requests by exception class', ('endpoint', 'exception')
+        )
+        self.predicted_rows_total = self.metrics.counter(
+            'predicted_rows_total', 'Rows scored by the model', ('endpoint',)
+        )
+        self.model_request_total = self.metrics.counter(
+            'model_requests_total', 'Prediction requests served by each model version', ('model',)
+        )
+        
+        model_ready = self.metrics.gauge('model_ready', 'Whether a model is loaded and serving')
+        model_info = self.metrics.gauge(
+            'model_info', 'Active model version and inference path (value is always 1)',
+            ('version', 'engine', 'direct_inference')
+        )
+        model_load_duration = self.metrics.gauge(
+            'model_load_duration_seconds', 'Time taken to load the active model artifact'
+        )
+        model_loaded_at = self.metrics.gauge(
+            'model_loaded_timestamp_seconds', 'Unix time the active model was activated'
+        )
+        reload_total = self.metrics.counter('model_reloads_total', 'Successful model hot reloads')
+        reload_failure_total = self.metrics.counter('model_reload_failures_total', 'Rejected model reload attempts')
+        cache_entries = self.metrics.gauge('prediction_cache_entries', 'Entries held by the prediction cache')
+        cache_events = self.metrics.counter('prediction_cache_events_total', 'Prediction cache lookups and removals', ('event',))
+        coalesced_batches = self.metrics.counter(
+            'coalesced_batches_total', 'Micro-batches flushed by the request coalescer', ('reason',)
+        )
+        coalesced_rows = self.metrics.counter('coalesced_rows_total', 'Single-row predictions served through micro-batches')
+        resident_models = self.metrics.gauge('resident_models', 'Registry models held in memory')
+        resident_bytes = self.metrics.gauge('resident_model_bytes', 'Estimated memory held by resident registry models')
+        resident_evictions = self.metrics.counter(
+            'resident_model_evictions_total', 'Registry models evicted to stay within the memory budget'
+        )
+        
+        def collect_model_state():
+            loaded_model = self.inference_bridge.active_model
+            model_ready.set(1.0 if loaded_model is not None else 0.0)
+            if loaded_model is not None:
+                model_info.replace_all([(
+                    (loaded_model.version, 'compiled' if loaded_model.pipeline is None else 'pipeline',
+                     str(loaded_model.direct_predictor is not None).lower()),
+                    1.0
+                )])
+                model_load_duration.set(loaded_model.load_duration_seconds)
+                model_loaded_at.set(loaded_model.loaded_at)
+            
+            reload_total.set_total(self.inference_bridge.reload_history['reload_count'])
+            reload_failure_total.set_total(self.inference_bridge.reload_history['failure_count'])
+            
+            cache_statistics = self.inference_bridge.prediction_cache.statistics()
+            cache_entries.set(cache_statistics['size'])
+            for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+                cache_events.set_total(cache_statistics[event], (event,))
+            
+            if self.inference_bridge.coalescer is not None:
+                coalescer_statistics = self.inference_bridge.coalescer.statistics()
+                coalesced_batches.set_total(coalescer_statistics['size_flushes'], ('size',))
+                coalesced_batches.set_total(coalescer_statistics['deadline_flushes'], ('deadline',))
+                coalesced_rows.set_total(coalescer_statistics['rows'])
+            
+            resident_state = self.inference_bridge.describe_resident_models()
+            resident_models.set(len(resident_state['resident_models']))
+            resident_bytes.set(resident_state['resident_bytes'])
+            resident_evictions.set_total(resident_state['evictions'])
+        
+        self.metrics.register_collector(collect_model_state)
+    
+    def record_request(self, endpoint: str, timer: RequestStageTimer, started: float,
+                       error: Optional[Exception] = None, predicted_rows: int = 0):
+        """Feed one finished request into the histograms and counters"""
+        self.request_duration.observe(time.perf_counter() - started, (endpoint,))
+        for stage, seconds in timer.durations.items():
+            self.stage_duration.observe(seconds, (endpoint, stage))
+        
+        if error is None:
+            self.request_total.inc((endpoint, 'success'))
+        else:
+            self.request_total.inc((endpoint, 'error'))
+            self.error_total.inc((endpoint, type(error).__name__))
+        if predicted_rows:
+            self.predicted_rows_total.inc((endpoint,), predicted_rows)
+    
+    def _log_sampled(self, message: str):
+        """Log a per-request line for the configured fraction of requests only"""
+        sample_rate = self.config.REQUEST_LOG_SAMPLE_RATE
+        if sample_rate >= 1.0 or (sample_rate > 0.0 and random.random() < sample_rate):
+            logger.info(message)
+    
+    # ---------- Request logic shared by the WSGI routes and the ASGI application ----------
+    
+    def record_unavailable_request(self, endpoint: str, timer: RequestStageTimer, started: float):
+        """Count a request turned away because no model is loaded"""
+        self.record_request(endpoint, timer, started, ModelArtifactNotFoundError('Model not loaded'))
+    
+    def score_form_submission(self, form_data, timer: RequestStageTimer, model_reference: Optional[str] = None,
+                              routing_key: Optional[str] = None, quantiles: Any = None) -> Tuple[str, Optional[Exception]]:
+        """
+        Validate one form submission and predict it with the selected model.
+        With quantiles (uncertainty mode) the text also shows the outer per-tree quantiles.
+        Returns the text shown on the page and the error, if any, for metrics.
+        """
+        try:
+            # Pin one model snapshot for the whole request so a hot reload cannot split it
+            with timer.measure('model_selection'):
+                loaded_model = self.inference_bridge.select_model(model_reference, routing_key)
+            self.model_request_total.inc((loaded_model.version,))
+            handler = PredictionRequestHandler(loaded_model.features)
+            quantile_levels = None
+            if quantiles is not None:
+                quantile_levels = handler.parse_quantile_levels(quantiles, self.config.MAX_PREDICTION_QUANTILES)
+            
+            if loaded_model.direct_predictor is not None:
+                # Hot path: fill the thread's preallocated buffer, no DataFrame involved
+                with timer.measure('feature_validation'):
+                    feature_buffer = self.inference_bridge.acquire_feature_buffer(len(loaded_model.features))
+                    handler.populate_feature_buffer(form_data, feature_buffer)
+                feature_matrix, feature_columns = feature_buffer, loaded_model.features
+                if quantile_levels is None:
+                    with timer.measure('model_predict'):
+                        predicted_value = self.inference_bridge.generate_direct_prediction(feature_buffer, loaded_model)
+            else:
+                with timer.measure('feature_validation'):
+                    feature_dict = handler.validate_form_features(form_data)
+                with timer.measure('dataframe_build'):
+                    feature_dataframe = handler.construct_feature_frame(feature_dict)
+                feature_matrix = feature_dataframe.to_numpy(dtype=np.float64)
+                feature_columns = list(feature_dataframe.columns)
+                if quantile_levels is None:
+                    with timer.measure('model_predict'):
+                        predicted_value = self.inference_bridge.generate_prediction(feature_dataframe, loaded_model)
+            
+            if quantile_levels is None:
+                formatted_result = f'{predicted_value:,.2f}'
+            else:
+                # The per-tree mean is the point prediction, so one pass yields both
+                with timer.measure('model_predict'):
+                    distribution = self.inference_bridge.generate_prediction_distribution(
+                        feature_matrix, feature_columns, quantile_levels, loaded_model
+                    )
+                formatted_result = f'{distribution.mean[0]:,.2f}'
+                if quantile_levels:
+                    formatted_result += (f' (trees p{quantile_levels[0] * 100:g}-p{quantile_levels[-1] * 100:g}: '
+                                         f'${distribution.quantiles[0, 0]:,.2f} - ${distribution.quantiles[0, -1]:,.2f})')
+            
+            self._log_sampled(f'Prediction successful: ${formatted_result}')
+            return formatted_result, None
+        
+        except (InvalidPredictionRequestError, ModelArtifactNotFoundError) as e:
+            logger.error(f'Prediction request failed: {e}')
+            return f'Error: {str(e)}', e
+    
+    def score_batch_payload(self, payload: Any, timer: RequestStageTimer, model_reference: Optional[str] = None,
+                            routing_key: Optional[str] = None,
+                            quantiles: Any = None) -> Tuple[Dict[str, Any], int, Optional[Exception]]:
+        """
+        Validate and score a parsed JSON batch (None when the body was not valid JSON).
+        An object payload may name a 'model' (overriding model_reference) and request
+        "uncertainty": true with optional "quantiles"; quantiles enables uncertainty too.
+        Returns the response body, the HTTP status and the error, if any, for metrics.
+        """
+        if payload is None:
+            return {'error': 'Request body must be valid JSON'}, 400, InvalidPredictionRequestError('Invalid JSON')
+        if isinstance(payload, dict) and payload.get('model') is not None:
+            model_reference = str(payload['model'])
+        if isinstance(payload, dict) and payload.get('quantiles') is not None:
+            quantiles = payload['quantiles']
+        elif isinstance(payload, dict) and payload.get('uncertainty'):
+            quantiles = quantiles or self.config.PREDICTION_QUANTILES
+        distribution = None
+        
+        try:
+            with timer.measure('model_selection'):
+                loaded_model = self.inference_bridge.select_model(model_reference, routing_key)
+            self.model_request_total.inc((loaded_model.version,))
+            handler = PredictionRequestHandler(loaded_model.features)
+            with timer.measure('feature_validation'):
+                batch = handler.validate_batch_payload(payload, self.config.MAX_BATCH_ROWS)
+                if quantiles is not None:
+                    quantile_levels = handler.parse_quantile_levels(quantiles, self.config.MAX_PREDICTION_QUANTILES)
+            with timer.measure('model_predict'):
+                if quantiles is None:
+                    predictions = self.inference_bridge.generate_batch_predictions(
+                        batch.feature_matrix, batch.feature_columns, loaded_model
+                    )
+                else:
+                    distribution = self.inference_bridge.generate_prediction_distribution(
+                        batch.feature_matrix, batch.feature_columns, quantile_levels, loaded_model
+                    )
+                    predictions = distribution.mean
+        except BatchSizeExceededError as e:
+            return {'error': str(e)}, 413, e
+        except InvalidPredictionRequestError as e:
+            logger.error(f'Batch prediction request failed: {e}')
+            return {'error': str(e)}, 400, e
+        except UnknownModelError as e:
+            return {'error': str(e)}, 404, e
+        except ModelArtifactNotFoundError as e:
+            return {'error': str(e)}, 503, e
+        
+        with timer.measure('response_render'):
+            # Scatter predictions back to their original positions; failed rows stay null
+            results = [None] * batch.total_rows
+            for row, value in zip(batch.row_indices.tolist(), predictions.tolist()):
+                results[row] = value
+            
+            response_body = {
+                'predictions': results,
+                'errors': batch.row_errors,
+                'rows_received': batch.total_rows,
+                'rows_predicted': int(len(batch.row_indices)),
+                'model_version': loaded_model.version
+            }
+            if distribution is not None:
+                uncertainty = [None] * batch.total_rows
+                for row, row_summary in zip(batch.row_indices.tolist(), distribution.describe_rows()):
+                    uncertainty[row] = row_summary
+                response_body['uncertainty'] = uncertainty
+        
+        self._log_sampled(f'Batch prediction: {len(batch.row_indices)}/{batch.total_rows} rows scored')
+        return response_body, 200, None
+    
+    def requested_quantiles(self, uncertainty_flag: Optional[str], quantiles: Optional[str]) -> Optional[str]:
+        """Raw quantile levels when the query string asks for uncertainty, else None (point predictions)"""
+        if quantiles:
+            return quantiles
+        if (uncertainty_flag or '').lower() in ('1', 'true', 'yes'):
+            return self.config.PREDICTION_QUANTILES
+        return None
+    
+    def describe_service_status(self) -> Dict[str, Any]:
+        """Model readiness, version and cache/coalescing counters for status endpoints"""
+        return {
+            'ready': self.inference_bridge.is_ready,
+            'model_version': self.inference_bridge.model_version,
+            'inference_engine': self.config.INFERENCE_ENGINE,
+            'direct_inference': self.inference_bridge.supports_direct_inference,
+            'prediction_cache': self.inference_bridge.prediction_cache.statistics(),
+            'coalescing': self.inference_bridge.coalescer.statistics() if self.inference_bridge.coalescer else None,
+            'resident_models': [
+                entry['model_id'] for entry in self.inference_bridge.describe_resident_models()['resident_models']
+            ]
+        }
+    
     def _initialize_flask_app(self):
         """Create and configure Flask application instance"""
         static_folder, template_folder = self.frontend_locator.locate_frontend_assets()
@@ -210,6 +1227,15 @@ class CornerstoneApiServer:
         if not self.inference_bridge.load_inference_artifacts():
             logger.warning('Model artifacts not available - prediction endpoint will fail')
         
+        # Load the registry models that aliases and traffic splits route to
+        try:
+            self.inference_bridge.refresh_registry_routing()
+        except Exception as e:
+            logger.error(f'Failed to read model registry routing: {e}')
+        
+        # Watch for retrained artifacts; a model appearing later is picked up too
+        self.inference_bridge.start_reload_monitor(self.config.MODEL_RELOAD_INTERVAL_SECONDS)
+        
         # Register route handlers
         self._register_routes()
     
@@ -232,32 +1258,118 @@ class CornerstoneApiServer:
             Custom prediction endpoint following distinctive naming pattern.
             Validates requests and executes inference through abstraction layer.
             """
+            started = time.perf_counter()
+            timer = RequestStageTimer()
             if not self.inference_bridge.is_ready:
+                self.record_unavailable_request('predict', timer, started)
                 flash('Model service unavailable. Please run model training first.')
                 return redirect(url_for('serve_frontend'))
             
-            try:
-                # Initialize request handler and validate data
-                handler = PredictionRequestHandler(self.inference_bridge.model_features)
-                feature_dataframe = handler.validate_and_construct_features(request.form)
-                
-                # Execute prediction
-                predicted_value = self.inference_bridge.generate_prediction(feature_dataframe)
-                formatted_result = f'{predicted_value:,.2f}'
-                
-                logger.info(f'Prediction successful: ${formatted_result}')
-                
-            except (InvalidPredictionRequestError, ModelArtifactNotFoundError) as e:
-                formatted_result = f'Error: {str(e)}'
-                logger.error(f'Prediction request failed: {e}')
+            with timer.measure('form_parsing'):
+                form_data = request.form
+            formatted_result, prediction_error = self.score_form_submission(
+                form_data, timer, request.args.get('model') or request.headers.get(self.MODEL_HEADER),
+                request.headers.get(self.ROUTING_KEY_HEADER),
+                self.requested_quantiles(request.args.get('uncertainty'), request.args.get('quantiles'))
+            )
             
             # Return result through template rendering or SPA response
-            if self.app.template_folder is None:
-                return render_template('index.html', result=formatted_result)
-            return render_template('index.html', result=formatted_result)
+            with timer.measure('template_render'):
+                response = make_response(render_template('index.html', result=formatted_result))
+            
+            self.record_request('predict', timer, started, prediction_error, 0 if prediction_error else 1)
+            if self.config.SERVER_TIMING_ENABLED:
+                response.headers['Server-Timing'] = timer.server_timing_header()
+            return response
+        
+        @self.app.route('/cornerstone-predict/batch', methods=['POST'])
+        def predict_property_batch():
+            """
+            Batch JSON prediction endpoint.
+            Scores every valid row with one vectorized predict and reports per-row errors.
+            """
+            started = time.perf_counter()
+            timer = RequestStageTimer()
+            if not self.inference_bridge.is_ready:
+                self.record_unavailable_request('batch', timer, started)
+                return jsonify({'error': 'Model service unavailable. Please run model training first.'}), 503
+            
+            with timer.measure('payload_parsing'):
+                payload = request.get_json(silent=True)
+            body, status, prediction_error = self.score_batch_payload(
+                payload, timer, request.args.get('model') or request.headers.get(self.MODEL_HEADER),
+                request.headers.get(self.ROUTING_KEY_HEADER),
+                self.requested_quantiles(request.args.get('uncertainty'), request.args.get('quantiles'))
+            )
+            with timer.measure('response_render'):
+                response = jsonify(body)
+            response.status_code = status
+            if body.get('model_version'):
+                response.headers[self.MODEL_HEADER] = body['model_version']
+            
+            self.record_request('batch', timer, started, prediction_error, body.get('rows_predicted', 0))
+            if self.config.SERVER_TIMING_ENABLED:
+                response.headers['Server-Timing'] = timer.server_timing_header()
+            return response
+        
+        @self.app.route('/cornerstone-status', methods=['GET'])
+        def report_service_status():
+            """Operational snapshot: model readiness, version, prediction cache and coalescing counters"""
+            return jsonify(self.describe_service_status())
+        
+        @self.app.route('/metrics', methods=['GET'])
+        def export_metrics():
+            """Prometheus scrape endpoint (text exposition format)"""
+            return Response(self.metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+        
+        @self.app.route('/cornerstone-admin/model', methods=['GET'])
+        def report_active_model():
+            """Admin endpoint: active model version, artifact and load timing"""
+            return jsonify(self._describe_active_model())
+        
+        @self.app.route('/cornerstone-admin/model/reload', methods=['POST'])
+        def trigger_model_reload():
+            """Admin endpoint: check the artifact now and hot-swap it if it changed"""
+            force = request.args.get('force', '').lower() in ('1', 'true', 'yes')
+            reloaded = self.inference_bridge.reload_if_changed(force=force)
+            self.inference_bridge.refresh_registry_routing()
+            return jsonify({'reloaded': reloaded, **self._describe_active_model()})
+        
+        @self.app.route('/cornerstone-admin/models', methods=['GET'])
+        def report_resident_models():
+            """Admin endpoint: resident registry models, aliases, traffic splits and memory budget"""
+            return jsonify(self.inference_bridge.describe_resident_models())
+    
+    def _describe_active_model(self) -> Dict[str, Any]:
+        """Summarize the active model snapshot and reload history for admin endpoints"""
+        loaded_model = self.inference_bridge.active_model
+        reload_history = dict(self.inference_bridge.reload_history)
+        if reload_history['last_attempt_at'] is not None:
+            reload_history['last_attempt_at'] = datetime.fromtimestamp(
+                reload_history['last_attempt_at'], timezone.utc
+            ).isoformat()
+        
+        if loaded_model is None:
+            return {'model_version': None, 'reload': reload_history}
+        
+        return {
+            'model_version': loaded_model.version,
+            'artifact_path': loaded_model.artifact_path,
+            'loaded_at': datetime.fromtimestamp(loaded_model.loaded_at, timezone.utc).isoformat(),
+            'load_duration_ms': round(loaded_model.load_duration_seconds * 1000.0, 3),
+            'feature_count': len(loaded_model.features),
+            'direct_inference': loaded_model.direct_predictor is not None,
+            'reload': reload_history
+        }
     
     def run(self, debug: bool = True, port: int = 5002):
-        """Launch the Cornerstone API server"""
+        """Launch the Cornerstone API server (Flask server, or the asyncio server in 'asgi' mode)"""
+        if self.config.SERVING_MODE == 'asgi':
+            # Imported on demand so WSGI deployments never load the async front-end
+            from cornerstone_asgi import CornerstoneAsgiApplication, serve_asgi_application
+            serve_asgi_application(CornerstoneAsgiApplication(self), port=port)
+            return
+        
         logger.info(f'Starting Cornerstone API server on port {port}')
         self.app.run(debug=debug, port=port)
 
@@ -265,7 +1377,7 @@ class CornerstoneApiServer:
 # ==================== APPLICATION INITIALIZATION ====================
 # Initialize the Cornerstone application service
 base_directory = os.path.dirname(__file__)
-cornerstone_service = CornerstoneApiServer(base_directory)
+cornerstone_service = CornerstoneApiServer(base_directory, CornerstoneServiceConfig.from_environment())
 app = cornerstone_service.app
 
 
@@ -0,0 +1,693 @@
+"""
+Cornerstone Async Serving
+=========================
+asyncio (ASGI 3) front-end for the Cornerstone prediction service.
+
+Under the Flask server every connection holds a worker thread, so slow clients and
+large batch uploads tie up workers while their bytes trickle in. Here connections
+and uploads wait on one event loop. Only validation, forest evaluation and page
+rendering run on a bounded thread pool. They go through the same CornerstoneApiServer
+request logic, InferenceServiceBridge and PredictionRequestHandler as the WSGI routes.
+
+Usage:
+    python cornerstone_asgi.py [--host 127.0.0.1] [--port 5002]
+    CORNERSTONE_SERVING_MODE=asgi python app.py
+    uvicorn cornerstone_asgi:build_asgi_application --factory
+
+Components:
+- InFlightRequestLimiter: Admission control (503 + Retry-After when saturated) and
+  draining of in-flight requests at shutdown
+- CornerstoneAsgiApplication: ASGI application serving /, /cornerstone-predict,
+  /cornerstone-predict/batch, /cornerstone-status, /metrics and static assets
+- AsyncHttpServer: Dependency-free HTTP/1.1 keep-alive server for the application,
+  with per-read client timeouts and graceful SIGINT/SIGTERM shutdown
+"""
+
+import os
+import io
+import json
+import signal
+import asyncio
+import argparse
+import logging
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, parse_qs
+from flask import render_template
+from werkzeug.formparser import parse_form_data
+from werkzeug.security import safe_join
+
+from service_metrics import MetricsRegistry, RequestStageTimer
+
+logger = logging.getLogger(__name__)
+
+# (name, value) header pairs as ASGI carries them: lower-case latin-1 bytes
+Headers = List[Tuple[bytes, bytes]]
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client goes away before its request body has arrived"""
+    pass
+
+
+class RequestBodyTooLargeError(Exception):
+    """Raised when a request body exceeds the configured size limit"""
+    pass
+
+
+# ==================== ADMISSION CONTROL ====================
+class InFlightRequestLimiter:
+    """
+    Counts requests being served and turns new ones away past a fixed limit.
+    Only the event loop thread touches it, so plain attributes need no locking.
+    Draining stops admission and waits until every admitted request has finished.
+    """
+    
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max(int(max_in_flight), 1)
+        self.in_flight = 0
+        self.rejected = 0
+        self.accepting = True
+        self._idle = asyncio.Event()
+        self._idle.set()
+    
+    def try_acquire(self) -> bool:
+        """Admit one request, or count a rejection when saturated or draining"""
+        if not self.accepting or self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self._idle.clear()
+        return True
+    
+    def release(self):
+        """Mark one admitted request as finished"""
+        self.in_flight -= 1
+        if not self.in_flight:
+            self._idle.set()
+    
+    async def drain(self, timeout_seconds: float) -> bool:
+        """Stop admitting and wait for in-flight requests; False if the timeout ran out"""
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout_seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+# ==================== ASGI APPLICATION ====================
+class CornerstoneAsgiApplication:
+    """
+    ASGI 3 application wrapping a CornerstoneApiServer.
+    The wrapped server owns the model, config, metrics and templates. This class only
+    moves bytes: it reads bodies on the event loop and hands the blocking request logic
+    to a bounded executor. Responses match the Flask routes, including Server-Timing
+    headers and /metrics accounting.
+    """
+    
+    def __init__(self, api_server):
+        self.api_server = api_server
+        self.config = api_server.config
+        self.flask_app = api_server.app
+        self.limiter = InFlightRequestLimiter(self.config.ASYNC_MAX_IN_FLIGHT)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._shut_down = False
+        self._register_metrics()
+    
+    def _register_metrics(self):
+        """Expose admission state on the wrapped server's /metrics registry"""
+        in_flight = self.api_server.metrics.gauge('async_in_flight_requests', 'Requests admitted and not yet answered')
+        rejected = self.api_server.metrics.counter(
+            'async_rejected_requests_total', 'Requests refused with 503 because the server was saturated or draining'
+        )
+        
+        def collect_admission_state():
+            in_flight.set(self.limiter.in_flight)
+            rejected.set_total(self.limiter.rejected)
+        
+        self.api_server.metrics.register_collector(collect_admission_state)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for CPU-bound work, created at startup or on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(self.config.ASYNC_EXECUTOR_WORKERS, 1), thread_name_prefix='cornerstone-predict'
+            )
+        return self._executor
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """ASGI entry point"""
+        if scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+    
+    # ---------- Lifespan ----------
+    
+    async def _handle_lifespan(self, receive: Callable, send: Callable):
+        """Create the executor on startup; drain and release it on shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._get_executor()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def shutdown(self):
+        """Refuse new requests, let in-flight predictions finish, then stop background work"""
+        if self._shut_down:
+            return
+        self._shut_down = True
+        
+        logger.info(f'Draining {self.limiter.in_flight} in-flight requests')
+        drained = await self.limiter.drain(self.config.ASYNC_SHUTDOWN_GRACE_SECONDS)
+        if not drained:
+            logger.warning(f'Shutdown grace period elapsed with {self.limiter.in_flight} requests still running')
+        
+        self.api_server.inference_bridge.stop_reload_monitor()
+        if self._executor is not None:
+            self._executor.shutdown(wait=drained)
+    
+    # ---------- Routing ----------
+    
+    async def _handle_http(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """Dispatch one HTTP request; status and metrics stay reachable under saturation"""
+        method, path = scope['method'], scope['path']
+        
+        if path == '/metrics' and method in ('GET', 'HEAD'):
+            return await self._send_response(
+                send, 200, self.api_server.metrics.render().encode('utf-8'), MetricsRegistry.CONTENT_TYPE, method=method
+            )
+        if path == '/cornerstone-status' and method in ('GET', 'HEAD'):
+            return await self._send_json(send, 200, self.api_server.describe_service_status(), method=method)
+        
+        if path == '/':
+            route, allowed = self._serve_frontend, ('GET', 'HEAD')
+        elif path == '/cornerstone-predict':
+            route, allowed = self._predict_form, ('POST',)
+        elif path == '/cornerstone-predict/batch':
+            route, allowed = self._predict_batch, ('POST',)
+        else:
+            route, allowed = self._serve_static_asset, ('GET', 'HEAD')
+        
+        if method not in allowed:
+            return await self._send_json(send, 405, {'error': 'Method not allowed'},
+                                         [(b'allow', ', '.join(allowed).encode('latin-1'))])
+        
+        if not self.limiter.try_acquire():
+            return await self._send_json(
+                send, 503, {'error': 'Server is at capacity, retry shortly'},
+                [(b'retry-after', str(self.config.ASYNC_RETRY_AFTER_SECONDS).encode('latin-1'))]
+            )
+        try:
+            await route(scope, receive, send)
+        except ClientDisconnectedError:
+            pass
+        except RequestBodyTooLargeError:
+            await self._send_json(send, 413, {'error': f'Request body exceeds {self.config.ASYNC_MAX_BODY_BYTES} bytes'})
+        finally:
+            self.limiter.release()
+    
+    # ---------- Endpoints ----------
+    
+    async def _serve_frontend(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """Same page as the Flask '/' route: the SPA build or the rendered template"""
+        if self.flask_app.template_folder is None:
+            return await self._send_static_file(send, os.path.join(self.flask_app.static_folder, 'index.html'),
+                                                scope['method'])
+        
+        model_features = self.api_server.inference_bridge.model_features or []
+        page = await self._run_blocking(self._render_page, cols=model_features)
+        await self._send_response(send, 200, page, 'text/html; charset=utf-8', method=scope['method'])
+    
+    async def _predict_form(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """Form prediction rendered into the page, like the Flask /cornerstone-predict route"""
+        started = time.perf_counter()
+        timer = RequestStageTimer()
+        if not self.api_server.inference_bridge.is_ready:
+            self.api_server.record_unavailable_request('predict', timer, started)
+            return await self._send_response(send, 302, b'', 'text/plain; charset=utf-8', [(b'location', b'/')])
+        
+        body = await self._read_body(scope, receive)
+        with timer.measure('form_parsing'):
+            form_data = self._parse_form(scope, body)
+        
+        page, prediction_error = await self._run_blocking(
+            self._score_and_render_form, form_data, timer, *self._request_options(scope)
+        )
+        self.api_server.record_request('predict', timer, started, prediction_error, 0 if prediction_error else 1)
+        await self._send_response(send, 200, page, 'text/html; charset=utf-8', self._timing_headers(timer))
+    
+    async def _predict_batch(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """JSON batch prediction, like the Flask /cornerstone-predict/batch route"""
+        started = time.perf_counter()
+        timer = RequestStageTimer()
+        if not self.api_server.inference_bridge.is_ready:
+            self.api_server.record_unavailable_request('batch', timer, started)
+            return await self._send_json(send, 503, {'error': 'Model service unavailable. Please run model training first.'})
+        
+        body = await self._read_body(scope, receive)
+        encoded, status, prediction_rows, model_version, prediction_error = await self._run_blocking(
+            self._score_batch_body, self._is_json_request(scope), body, timer, *self._request_options(scope)
+        )
+        self.api_server.record_request('batch', timer, started, prediction_error, prediction_rows)
+        response_headers = self._timing_headers(timer)
+        if model_version:
+            response_headers.append((self.api_server.MODEL_HEADER.lower().encode('latin-1'), model_version.encode('latin-1')))
+        await self._send_response(send, status, encoded, 'application/json', response_headers)
+    
+    async def _serve_static_asset(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        """Files under the Flask app's static URL path; anything else is a 404"""
+        static_prefix = (self.flask_app.static_url_path or '').rstrip('/') + '/'
+        static_folder = self.flask_app.static_folder
+        file_path = None
+        if static_folder and scope['path'].startswith(static_prefix):
+            file_path = safe_join(static_folder, scope['path'][len(static_prefix):])
+        
+        if file_path is None or not os.path.isfile(file_path):
+            return await self._send_json(send, 404, {'error': 'Not found'})
+        await self._send_static_file(send, file_path, scope['method'])
+    
+    # ---------- Blocking work (runs on the executor) ----------
+    
+    async def _run_blocking(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the bounded executor.
+        If the request is cancelled, wait for the call anyway so the in-flight count
+        (and shutdown draining) covers every prediction still running.
+        """
+        future = asyncio.get_running_loop().run_in_executor(self._get_executor(), partial(function, *args, **kwargs))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+    
+    def _render_page(self, **context) -> bytes:
+        """Render index.html through the Flask app so url_for and template config match"""
+        with self.flask_app.test_request_context('/'):
+            return render_template('index.html', **context).encode('utf-8')
+    
+    def _score_and_render_form(self, form_data, timer: RequestStageTimer, model_reference: Optional[str],
+                               routing_key: Optional[str], quantiles: Optional[str]) -> Tuple[bytes, Optional[Exception]]:
+        """Predict one form submission and render the result page"""
+        formatted_result, prediction_error = self.api_server.score_form_submission(
+            form_data, timer, model_reference, routing_key, quantiles
+        )
+        with timer.measure('template_render'):
+            page = self._render_page(result=formatted_result)
+        return page, prediction_error
+    
+    def _score_batch_body(self, is_json: bool, body: bytes, timer: RequestStageTimer, model_reference: Optional[str],
+                          routing_key: Optional[str],
+                          quantiles: Optional[str]) -> Tuple[bytes, int, int, Optional[str], Optional[Exception]]:
+        """Decode, score and encode a batch request; decoding large bodies stays off the loop too"""
+        with timer.measure('payload_parsing'):
+            payload = None
+            if is_json:
+                with suppress(ValueError):
+                    payload = json.loads(body)
+        
+        response_body, status, prediction_error = self.api_server.score_batch_payload(
+            payload, timer, model_reference, routing_key, quantiles
+        )
+        with timer.measure('response_render'):
+            encoded = json.dumps(response_body).encode('utf-8')
+        return (encoded, status, response_body.get('rows_predicted', 0),
+                response_body.get('model_version'), prediction_error)
+    
+    # ---------- Request and response helpers ----------
+    
+    @staticmethod
+    def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+        """Value of a request header, or None"""
+        for header_name, value in scope['headers']:
+            if header_name == name:
+                return value.decode('latin-1')
+        return None
+    
+    def _request_options(self, scope: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Requested model (query argument, then header), routing key and uncertainty
+        quantiles, read the same way as the Flask routes read them.
+        """
+        query = {name: values[0] for name, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+        model_header = self.api_server.MODEL_HEADER.lower().encode('latin-1')
+        routing_key_header = self.api_server.ROUTING_KEY_HEADER.lower().encode('latin-1')
+        return (
+            query.get('model') or self._header(scope, model_header),
+            self._header(scope, routing_key_header),
+            self.api_server.requested_quantiles(query.get('uncertainty'), query.get('quantiles'))
+        )
+    
+    def _is_json_request(self, scope: Dict[str, Any]) -> bool:
+        """Same rule as Flask's request.is_json"""
+        mimetype = (self._header(scope, b'content-type') or '').split(';', 1)[0].strip().lower()
+        return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+    
+    async def _read_body(self, scope: Dict[str, Any], receive: Callable) -> bytes:
+        """Collect the request body on the event loop, enforcing the size limit"""
+        size_limit = self.config.ASYNC_MAX_BODY_BYTES
+        declared_length = self._header(scope, b'content-length')
+        if declared_length is not None and declared_length.isdigit() and int(declared_length) > size_limit:
+            raise RequestBodyTooLargeError(declared_length)
+        
+        chunks, received = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise ClientDisconnectedError()
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if received > size_limit:
+                raise RequestBodyTooLargeError(received)
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+    
+    def _parse_form(self, scope: Dict[str, Any], body: bytes):
+        """Parse urlencoded or multipart form data with Werkzeug, exactly as request.form does"""
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'CONTENT_TYPE': self._header(scope, b'content-type') or '',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body)
+        }
+        _, form_data, _ = parse_form_data(environ)
+        return form_data
+    
+    def _timing_headers(self, timer: RequestStageTimer) -> Headers:
+        """Server-Timing header when enabled in the service config"""
+        if not self.config.SERVER_TIMING_ENABLED:
+            return []
+        return [(b'server-timing', timer.server_timing_header().encode('latin-1'))]
+    
+    async def _send_static_file(self, send: Callable, file_path: str, method: str):
+        """Read a file on the executor and send it with a guessed content type"""
+        if not os.path.isfile(file_path):
+            return await self._send_json(send, 404, {'error': 'Not found'})
+        
+        def read_file() -> bytes:
+            with open(file_path, 'rb') as static_file:
+                return static_file.read()
+        
+        content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+        await self._send_response(send, 200, await self._run_blocking(read_file), content_type, method=method)
+    
+    async def _send_json(self, send: Callable, status: int, body: Any,
+                         extra_headers: Iterable[Tuple[bytes, bytes]] = (), method: str = 'GET'):
+        """Send a JSON response"""
+        await self._send_response(send, status, json.dumps(body).encode('utf-8'), 'application/json', extra_headers, method)
+    
+    @staticmethod
+    async def _send_response(send: Callable, status: int, body: bytes, content_type: str,
+                             extra_headers: Iterable[Tuple[bytes, bytes]] = (), method: str = 'GET'):
+        """Send a complete response; HEAD requests get the headers only"""
+        headers = [(b'content-type', content_type.encode('latin-1')),
+                   (b'content-length', str(len(body)).encode('latin-1'))]
+        headers.extend(extra_headers)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if method == 'HEAD' else body})
+
+
+# ==================== BUILT-IN HTTP SERVER ====================
+class AsyncHttpServer:
+    """
+    Minimal HTTP/1.1 server hosting an ASGI application on one event loop.
+    Supports keep-alive and Content-Length or chunked request bodies. Every read and
+    write is bounded by client_timeout_seconds, so a stalled client costs an idle
+    coroutine, never a thread. On SIGINT/SIGTERM it stops accepting connections, runs
+    the lifespan shutdown (which drains in-flight requests), then closes idle
+    keep-alive connections.
+    """
+    
+    # Upper bound on the request line plus headers
+    MAX_HEADER_BYTES = 64 * 1024
+    
+    def __init__(self, application: Callable, host: str = '127.0.0.1', port: int = 5002,
+                 client_timeout_seconds: float = 15.0, max_body_bytes: int = 16 * 1024 * 1024):
+        self.application = application
+        self.host = host
+        self.port = port
+        self.client_timeout_seconds = client_timeout_seconds
+        self.max_body_bytes = max_body_bytes
+        self._connections: Dict[asyncio.Task, bool] = {}
+        self._stopping = False
+        self._stop_requested: Optional[asyncio.Event] = None
+        self._lifespan_inbox: Optional[asyncio.Queue] = None
+        self._lifespan_outbox: Optional[asyncio.Queue] = None
+        self._lifespan_task: Optional[asyncio.Task] = None
+    
+    async def serve(self, on_ready: Optional[Callable[[int], None]] = None):
+        """Serve until stop() or a termination signal, then shut down gracefully"""
+        loop = asyncio.get_running_loop()
+        self._stop_requested = asyncio.Event()
+        await self._lifespan_event('startup')
+        
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=self.MAX_HEADER_BYTES)
+        self.port = server.sockets[0].getsockname()[1]
+        for termination_signal in (signal.SIGINT, signal.SIGTERM):
+            with suppress(NotImplementedError, RuntimeError):
+                loop.add_signal_handler(termination_signal, self.stop)
+        
+        logger.info(f'Cornerstone ASGI server listening on http://{self.host}:{self.port}')
+        if on_ready is not None:
+            on_ready(self.port)
+        
+        await self._stop_requested.wait()
+        logger.info('Shutdown requested: closing listener and draining in-flight requests')
+        server.close()
+        self._stopping = True
+        await self._lifespan_event('shutdown')
+        
+        # Busy connections finish their current response and then close themselves
+        for connection, busy in list(self._connections.items()):
+            if not busy:
+                connection.cancel()
+        if self._connections:
+            await asyncio.wait(list(self._connections), timeout=self.client_timeout_seconds)
+        await server.wait_closed()
+        logger.info('Cornerstone ASGI server stopped')
+    
+    def stop(self):
+        """Request a graceful shutdown (safe to call from signal handlers on the loop)"""
+        if self._stop_requested is not None:
+            self._stop_requested.set()
+    
+    async def _lifespan_event(self, event: str):
+        """Deliver one lifespan event to the application and wait for its acknowledgement"""
+        if self._lifespan_inbox is None:
+            self._lifespan_inbox, self._lifespan_outbox = asyncio.Queue(), asyncio.Queue()
+            scope = {'type': 'lifespan', 'asgi': {'version': '3.0', 'spec_version': '2.0'}}
+            self._lifespan_task = asyncio.create_task(self.application(scope, self._lifespan_inbox.get, self._lifespan_outbox.put))
+        
+        await self._lifespan_inbox.put({'type': f'lifespan.{event}'})
+        reply = await self._lifespan_outbox.get()
+        if reply['type'].endswith('.failed'):
+            raise RuntimeError(f"Lifespan {event} failed: {reply.get('message', '')}")
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until it closes, times out or the server stops"""
+        connection = asyncio.current_task()
+        self._connections[connection] = False
+        try:
+            while not self._stopping:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.client_timeout_seconds)
+                except asyncio.LimitOverrunError:
+                    await self._write_error(writer, 431)
+                    return
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                
+                self._connections[connection] = True
+                try:
+                    keep_alive = await self._serve_request(head, reader, writer)
+                finally:
+                    self._connections[connection] = False
+                if not keep_alive:
+                    return
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.pop(connection, None)
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+    
+    async def _serve_request(self, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Parse one request, run the application on it and write the response; returns keep-alive"""
+        try:
+            request_line, *header_lines = head[:-4].decode('latin-1').split('\r\n')
+            method, target, version = request_line.split(' ')
+            headers: Headers = []
+            for line in header_lines:
+                name, separator, value = line.partition(':')
+                if not separator:
+                    raise ValueError(f'Malformed header line {line!r}')
+                headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+        except ValueError:
+            await self._write_error(writer, 400)
+            return False
+        
+        header_values = dict(headers)
+        connection_option = header_values.get(b'connection', b'').lower()
+        if version == 'HTTP/1.1':
+            keep_alive = connection_option != b'close'
+        else:
+            keep_alive = connection_option == b'keep-alive'
+        
+        try:
+            if b'chunked' in header_values.get(b'transfer-encoding', b'').lower():
+                body = await self._read_chunked_body(reader)
+            else:
+                content_length = int(header_values.get(b'content-length', b'0'))
+                if content_length < 0:
+                    raise ValueError(content_length)
+                if content_length > self.max_body_bytes:
+                    raise RequestBodyTooLargeError(content_length)
+                body = await asyncio.wait_for(reader.readexactly(content_length), self.client_timeout_seconds)
+        except RequestBodyTooLargeError:
+            await self._write_error(writer, 413)
+            return False
+        except ValueError:
+            await self._write_error(writer, 400)
+            return False
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return False
+        
+        path, _, query = target.partition('?')
+        peer, local = writer.get_extra_info('peername'), writer.get_extra_info('sockname')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0', 'spec_version': '2.3'},
+            'http_version': version.partition('/')[2] or '1.1',
+            'method': method.upper(),
+            'scheme': 'http',
+            'path': unquote(path),
+            'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'client': tuple(peer[:2]) if peer else None,
+            'server': tuple(local[:2]) if local else None
+        }
+        
+        response_complete = asyncio.Event()
+        request_messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        response = {'status': None, 'headers': [], 'body': []}
+        
+        async def receive() -> Dict[str, Any]:
+            if request_messages:
+                return request_messages.pop()
+            await response_complete.wait()
+            return {'type': 'http.disconnect'}
+        
+        async def send(message: Dict[str, Any]):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = list(message.get('headers', []))
+            elif message['type'] == 'http.response.body':
+                response['body'].append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    response_complete.set()
+        
+        try:
+            await self.application(scope, receive, send)
+        except Exception as e:
+            logger.exception(f'ASGI application error on {method} {path}: {e}')
+            if not response_complete.is_set():
+                await self._write_error(writer, 500)
+                return False
+        
+        if response['status'] is None or not response_complete.is_set():
+            await self._write_error(writer, 500)
+            return False
+        
+        keep_alive = keep_alive and not self._stopping
+        return await self._write_response(writer, response['status'], response['headers'],
+                                          b''.join(response['body']), keep_alive)
+    
+    async def _read_chunked_body(self, reader: asyncio.StreamReader) -> bytes:
+        """Decode a chunked request body, enforcing the size limit"""
+        chunks, received = [], 0
+        while True:
+            size_line = await asyncio.wait_for(reader.readuntil(b'\r\n'), self.client_timeout_seconds)
+            chunk_size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if chunk_size == 0:
+                # Skip optional trailers up to the terminating blank line
+                while await asyncio.wait_for(reader.readuntil(b'\r\n'), self.client_timeout_seconds) != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            
+            received += chunk_size
+            if received > self.max_body_bytes:
+                raise RequestBodyTooLargeError(received)
+            chunk = await asyncio.wait_for(reader.readexactly(chunk_size + 2), self.client_timeout_seconds)
+            chunks.append(chunk[:-2])
+    
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, headers: Headers,
+                              body: bytes, keep_alive: bool) -> bool:
+        """Write status line, headers and body; returns whether the connection stays open"""
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        
+        lines = [f'HTTP/1.1 {status} {reason}'.encode('latin-1')]
+        for name, value in headers:
+            if name.lower() not in (b'content-length', b'connection'):
+                lines.append(name + b': ' + value)
+        lines.append(b'content-length: ' + str(len(body)).encode('latin-1'))
+        lines.append(b'connection: ' + (b'keep-alive' if keep_alive else b'close'))
+        
+        try:
+            writer.write(b'\r\n'.join(lines) + b'\r\n\r\n' + body)
+            await asyncio.wait_for(writer.drain(), self.client_timeout_seconds)
+        except (asyncio.TimeoutError, ConnectionError):
+            return False
+        return keep_alive
+    
+    async def _write_error(self, writer: asyncio.StreamWriter, status: int):
+        """Answer a request the server itself rejects, then close the connection"""
+        body = json.dumps({'error': HTTPStatus(status).phrase}).encode('utf-8')
+        await self._write_response(writer, status, [(b'content-type', b'application/json')], body, keep_alive=False)
+
+
+# ==================== ENTRY POINTS ====================
+def serve_asgi_application(application: CornerstoneAsgiApplication, host: str = '127.0.0.1', port: int = 5002):
+    """Run the application on the built-in server until SIGINT/SIGTERM"""
+    config = application.config
+    server = AsyncHttpServer(application, host, port, config.ASYNC_CLIENT_TIMEOUT_SECONDS, config.ASYNC_MAX_BODY_BYTES)
+    asyncio.run(server.serve())
+
+
+def build_asgi_application() -> CornerstoneAsgiApplication:
+    """ASGI factory for external servers (e.g. uvicorn --factory) around the module-level service"""
+    from app import cornerstone_service
+    return CornerstoneAsgiApplication(cornerstone_service)
+
+
+def main(argv: List[str] = None):
+    """Serve the Cornerstone API with the built-in asyncio server"""
+    parser = argparse.ArgumentParser(description='Cornerstone asyncio (ASGI) server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5002)
+    args = parser.parse_args(argv)
+    
+    serve_asgi_application(build_asgi_application(), args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1411 @@
+"""
+Cornerstone Performance Benchmarks
+==================================
+Self-contained benchmarks for the Cornerstone training and inference stack.
+
+Every benchmark trains on synthetic data following the CORNERSTONE_FEATURES schema,
+so no Kaggle CSV is required. Results are printed and optionally written as JSON
+for comparison between commits.
+
+Usage:
+    python cornerstone_benchmarks.py engines [--output engines.json]
+    python cornerstone_benchmarks.py training-engines [--rows 10000 30000 100000] [--output training.json]
+    python cornerstone_benchmarks.py compaction [--tolerance 0.01] [--output compaction.json]
+    python cornerstone_benchmarks.py lattice [--shapes 10:5 30:4 200:none] [--output lattice.json]
+    python cornerstone_benchmarks.py startup [--workers 4] [--output startup.json]
+    python cornerstone_benchmarks.py ingestion [--rows 2000000] [--output ingestion.json]
+    python cornerstone_benchmarks.py dataset-cache [--rows 3000000] [--output cache.json]
+    python cornerstone_benchmarks.py incremental [--days 5] [--output incremental.json]
+    python cornerstone_benchmarks.py serving [--concurrency 1 4 16] [--output serving.json]
+    python cornerstone_benchmarks.py coalescing [--settings 8:1 32:2] [--output coalescing.json]
+    python cornerstone_benchmarks.py uncertainty [--max-overhead 2.0] [--output uncertainty.json]
+    python cornerstone_benchmarks.py bulk-scoring [--workers 1 2 4] [--output bulk_scoring.json]
+"""
+
+import os
+import sys
+import copy
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.parse
+from importlib import metadata
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from model import (CornerstoneModelConfig, DatasetOrchestrator, PredictorEnsembleBuilder, ModelArtifactRegistry,
+                   compute_regression_metrics)
+from inference_engine import (DirectForestPredictor, CompiledForestEngine, PredictionDistribution, PredictionLattice,
+                              pipeline_tree_outputs)
+from model_compaction import ForestCompactor
+from cornerstone_bulk_scoring import BulkScoringRunner
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== SYNTHETIC DATA ====================
+def generate_synthetic_housing_frame(row_count: int, seed: int = 11) -> pd.DataFrame:
+    """Generate a frame with the Cornerstone feature schema and a plausible SalePrice"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'OverallQual': rng.integers(1, 11, row_count),
+        'GrLivArea': rng.integers(400, 4500, row_count),
+        'YearBuilt': rng.integers(1872, 2011, row_count),
+        'TotalBsmtSF': rng.integers(0, 3000, row_count).astype(np.float64),
+        'FullBath': rng.integers(0, 4, row_count),
+        'BedroomAbvGr': rng.integers(0, 8, row_count),
+        'GarageCars': rng.integers(0, 5, row_count).astype(np.float64),
+    })
+    
+    # Sparse gaps in the same columns that are nullable in the Kaggle data
+    frame.loc[rng.random(row_count) < 0.02, 'TotalBsmtSF'] = np.nan
+    frame.loc[rng.random(row_count) < 0.02, 'GarageCars'] = np.nan
+    
+    frame['SalePrice'] = (
+        frame['OverallQual'] * 21000
+        + frame['GrLivArea'] * 55
+        + (frame['YearBuilt'] - 1870) * 350
+        + frame['TotalBsmtSF'].fillna(0) * 25
+        + frame['GarageCars'].fillna(0) * 9000
+        + rng.normal(0, 18000, row_count)
+    ).round()
+    return frame
+
+
+def train_synthetic_pipeline(row_count: int, config: CornerstoneModelConfig = None):
+    """Train an imputer + forest pipeline on synthetic data exactly as the training engine does"""
+    config = config or CornerstoneModelConfig()
+    frame = generate_synthetic_housing_frame(row_count, config.SEED_VALUE)
+    X_train = frame[config.CORNERSTONE_FEATURES]
+    y_train = frame[config.TARGET_COLUMN]
+    
+    trainer = PredictorEnsembleBuilder(config)
+    trainer.construct_ensemble(X_train.fillna(X_train.median()), y_train)
+    trainer.build_inference_pipeline(X_train)
+    return trainer.inference_pipeline, list(config.CORNERSTONE_FEATURES)
+
+
+# ==================== MEASUREMENT HELPERS ====================
+def summarize_latencies(samples: Sequence[float]) -> Dict[str, float]:
+    """Reduce latency samples (seconds) to percentile statistics in milliseconds"""
+    milliseconds = np.asarray(samples, dtype=np.float64) * 1000.0
+    return {
+        'samples': int(len(milliseconds)),
+        'mean_ms': float(milliseconds.mean()),
+        'p50_ms': float(np.percentile(milliseconds, 50)),
+        'p95_ms': float(np.percentile(milliseconds, 95)),
+        'p99_ms': float(np.percentile(milliseconds, 99)),
+    }
+
+
+def time_repeated(operation: Callable[[], object], repeats: int, warmup: int = 3) -> List[float]:
+    """Time an operation repeatedly after a short warmup, returning seconds per call"""
+    for _ in range(warmup):
+        operation()
+    
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def repeats_for_batch(batch_size: int) -> int:
+    """Scale repetitions down for large batches so each benchmark stays bounded"""
+    if batch_size <= 1:
+        return 300
+    if batch_size <= 256:
+        return 100
+    return 10
+
+
+# ==================== INFERENCE ENGINE BENCHMARK ====================
+def benchmark_inference_engines(batch_sizes: Tuple[int, ...] = (1, 64, 10000),
+                                train_rows: int = 1460) -> Dict:
+    """Compare sklearn Pipeline.predict, the direct buffer path and the compiled engine"""
+    pipeline, features = train_synthetic_pipeline(train_rows)
+    direct_predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+    compiled_engine = CompiledForestEngine.from_direct_predictor(direct_predictor)
+    
+    probe_frame = generate_synthetic_housing_frame(max(batch_sizes), seed=97)[features]
+    probe_matrix = probe_frame.to_numpy(dtype=np.float64)
+    
+    results = {
+        'benchmark': 'inference_engines',
+        'train_rows': train_rows,
+        'tree_count': compiled_engine.tree_count,
+        'node_count': compiled_engine.node_count,
+        'max_depth': compiled_engine.max_depth,
+        'batches': []
+    }
+    
+    for batch_size in batch_sizes:
+        batch_frame = probe_frame.iloc[:batch_size]
+        batch_matrix = probe_matrix[:batch_size]
+        repeats = repeats_for_batch(batch_size)
+        
+        reference = np.asarray(pipeline.predict(batch_frame), dtype=np.float64)
+        compiled = compiled_engine.predict_buffer(batch_matrix.copy())
+        
+        results['batches'].append({
+            'batch_size': batch_size,
+            'max_abs_difference': float(np.max(np.abs(reference - compiled))),
+            'sklearn_pipeline': summarize_latencies(
+                time_repeated(lambda: pipeline.predict(batch_frame), repeats)
+            ),
+            'direct_predictor': summarize_latencies(
+                time_repeated(lambda: direct_predictor.predict_buffer(batch_matrix.copy()), repeats)
+            ),
+            'compiled_engine': summarize_latencies(
+                time_repeated(lambda: compiled_engine.predict_buffer(batch_matrix.copy()), repeats)
+            ),
+        })
+    
+    return results
+
+
+def print_engine_results(results: Dict):
+    """Render the engine benchmark as a compact latency table"""
+    print(f"Forest: {results['tree_count']} trees, {results['node_count']} nodes, depth {results['max_depth']}")
+    print(f"{'batch':>8} {'engine':>18} {'p50 ms':>10} {'p99 ms':>10}")
+    for batch in results['batches']:
+        for engine_name in ('sklearn_pipeline', 'direct_predictor', 'compiled_engine'):
+            stats = batch[engine_name]
+            print(f"{batch['batch_size']:>8} {engine_name:>18} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f}")
+        print(f"{'':>8} {'max |diff|':>18} {batch['max_abs_difference']:>10.3g}")
+
+
+# ==================== UNCERTAINTY BENCHMARK ====================
+def benchmark_uncertainty(batch_sizes: Tuple[int, ...] = (1, 64, 10000), quantile_levels: Tuple[float, ...] = (0.1, 0.9),
+                          max_overhead: float = 2.0, train_rows: int = 1460) -> Dict:
+    """
+    Cost of per-tree mean/std/quantiles relative to a plain point prediction on each
+    engine. A batch passes when its median latency stays within max_overhead times
+    the plain predict of the same engine.
+    """
+    pipeline, features = train_synthetic_pipeline(train_rows)
+    direct_predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+    compiled_engine = CompiledForestEngine.from_direct_predictor(direct_predictor)
+    probe_frame = generate_synthetic_housing_frame(max(batch_sizes), seed=97)[features]
+    probe_matrix = probe_frame.to_numpy(dtype=np.float64)
+    
+    results = {
+        'benchmark': 'uncertainty',
+        'train_rows': train_rows,
+        'tree_count': compiled_engine.tree_count,
+        'quantile_levels': list(quantile_levels),
+        'max_overhead': max_overhead,
+        'batches': []
+    }
+    
+    for batch_size in batch_sizes:
+        batch_frame = probe_frame.iloc[:batch_size]
+        batch_matrix = probe_matrix[:batch_size]
+        repeats = repeats_for_batch(batch_size)
+        
+        operations = {
+            'sklearn_pipeline': (
+                lambda: pipeline.predict(batch_frame),
+                lambda: PredictionDistribution.from_tree_outputs(pipeline_tree_outputs(pipeline, batch_frame), quantile_levels)
+            ),
+            'direct_predictor': (
+                lambda: direct_predictor.predict_buffer(batch_matrix.copy()),
+                lambda: PredictionDistribution.from_tree_outputs(
+                    direct_predictor.predict_tree_outputs(batch_matrix.copy()), quantile_levels
+                )
+            ),
+            'compiled_engine': (
+                lambda: compiled_engine.predict_buffer(batch_matrix.copy()),
+                lambda: PredictionDistribution.from_tree_outputs(
+                    compiled_engine.predict_tree_outputs(batch_matrix.copy()), quantile_levels
+                )
+            ),
+        }
+        
+        batch_results = {'batch_size': batch_size}
+        for engine_name, (point_operation, distribution_operation) in operations.items():
+            point_stats = summarize_latencies(time_repeated(point_operation, repeats))
+            distribution_stats = summarize_latencies(time_repeated(distribution_operation, repeats))
+            overhead = distribution_stats['p50_ms'] / point_stats['p50_ms']
+            batch_results[engine_name] = {
+                'point': point_stats,
+                'uncertainty': distribution_stats,
+                'overhead': overhead,
+                'within_budget': overhead <= max_overhead,
+                # The per-tree mean must reproduce the point prediction exactly
+                'mean_matches_point': bool(np.array_equal(
+                    np.asarray(point_operation(), dtype=np.float64), distribution_operation().mean
+                ))
+            }
+        results['batches'].append(batch_results)
+    
+    results['within_budget'] = all(
+        batch[engine_name]['within_budget'] for batch in results['batches'] for engine_name in operations
+    )
+    return results
+
+
+def print_uncertainty_results(results: Dict):
+    """Render point vs uncertainty latency and the overhead multiple per engine and batch size"""
+    print(f"Forest: {results['tree_count']} trees, quantiles {results['quantile_levels']}, "
+          f"budget {results['max_overhead']:g}x plain predict")
+    print(f"{'batch':>8} {'engine':>18} {'point p50':>10} {'uncert p50':>11} {'overhead':>9} {'mean==point':>12}")
+    for batch in results['batches']:
+        for engine_name in ('sklearn_pipeline', 'direct_predictor', 'compiled_engine'):
+            stats = batch[engine_name]
+            print(f"{batch['batch_size']:>8} {engine_name:>18} {stats['point']['p50_ms']:>10.3f} "
+                  f"{stats['uncertainty']['p50_ms']:>11.3f} {stats['overhead']:>8.2f}x "
+                  f"{str(stats['mean_matches_point']):>12}")
+    print('PASS' if results['within_budget'] else 'FAIL: uncertainty overhead exceeds the budget')
+
+
+# ==================== TRAINING ENGINE COMPARISON ====================
+def fit_and_measure_engine(config: CornerstoneModelConfig, X_train: pd.DataFrame, X_test: pd.DataFrame,
+                           y_train: pd.Series, y_test: pd.Series, work_directory: str) -> Dict:
+    """Fit one ensemble engine and report fit time, served predict latency, artifact size and holdout RMSE"""
+    trainer = PredictorEnsembleBuilder(config)
+    started = time.perf_counter()
+    trainer.construct_ensemble(X_train, y_train, X_test, y_test)
+    fit_seconds = time.perf_counter() - started
+    trainer.build_inference_pipeline(X_train)
+    pipeline, features = trainer.inference_pipeline, list(config.CORNERSTONE_FEATURES)
+    
+    artifact_path = os.path.join(work_directory, f'{config.ENSEMBLE_ENGINE}.pkl')
+    joblib.dump(pipeline, artifact_path)
+    
+    # Forests are served from the compiled engine; anything else through Pipeline.predict
+    direct_predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+    if direct_predictor is not None:
+        compiled_engine = CompiledForestEngine.from_direct_predictor(direct_predictor)
+        serving_path = 'compiled_engine'
+        predict = lambda frame: compiled_engine.predict_buffer(frame.to_numpy(dtype=np.float64))
+    else:
+        serving_path = 'sklearn_pipeline'
+        predict = lambda frame: pipeline.predict(frame)
+    
+    single_row, batch = X_test.iloc[:1], X_test.iloc[:10000]
+    measurement = {
+        'engine': config.ENSEMBLE_ENGINE,
+        'ensemble_size': trainer.ensemble_size(),
+        'fit_seconds': fit_seconds,
+        'model_mb': os.path.getsize(artifact_path) / 1e6,
+        'rmse': compute_regression_metrics(y_test, pipeline.predict(X_test))['rmse'],
+        'serving_path': serving_path,
+        'predict_single_row': summarize_latencies(time_repeated(lambda: predict(single_row), repeats_for_batch(1))),
+        'predict_batch': summarize_latencies(time_repeated(lambda: predict(batch), repeats_for_batch(len(batch)))),
+        'predict_batch_rows': len(batch)
+    }
+    os.remove(artifact_path)
+    return measurement
+
+
+def benchmark_training_engines(row_counts: Sequence[int] = (10000, 30000, 100000), forest_trees: int = 200,
+                               engines: Sequence[str] = ('forest', 'boosted')) -> Dict:
+    """Random forest vs histogram gradient boosting on growing synthetic datasets"""
+    base_config = CornerstoneModelConfig(TREE_COUNT=forest_trees)
+    runs = []
+    with tempfile.TemporaryDirectory(prefix='cornerstone-training-engines-') as work_directory:
+        for row_count in row_counts:
+            frame = generate_synthetic_housing_frame(row_count, base_config.SEED_VALUE)
+            X = frame[base_config.CORNERSTONE_FEATURES]
+            X_train, X_test, y_train, y_test = train_test_split(
+                X.fillna(X.median()), frame[base_config.TARGET_COLUMN],
+                test_size=base_config.TEST_PROPORTION, random_state=base_config.SEED_VALUE
+            )
+            for engine in engines:
+                logger.info(f'Fitting {engine} on {len(X_train)} rows')
+                measurement = fit_and_measure_engine(
+                    replace(base_config, ENSEMBLE_ENGINE=engine), X_train, X_test, y_train, y_test, work_directory
+                )
+                runs.append({'rows': row_count, 'train_rows': len(X_train), **measurement})
+    
+    return {
+        'benchmark': 'training_engines',
+        'environment': describe_benchmark_environment(),
+        'forest_trees': forest_trees,
+        'runs': runs
+    }
+
+
+def print_training_engine_results(results: Dict):
+    """Render fit time, predict latency, size and accuracy per dataset size and engine"""
+    print(f"{'rows':>9} {'engine':>8} {'trees':>6} {'fit s':>9} {'1-row ms':>9} {'10k ms':>9} "
+          f"{'model MB':>9} {'RMSE':>9}")
+    for run in results['runs']:
+        print(f"{run['rows']:>9} {run['engine']:>8} {run['ensemble_size']:>6} {run['fit_seconds']:>9.2f} "
+              f"{run['predict_single_row']['p50_ms']:>9.3f} {run['predict_batch']['p50_ms']:>9.2f} "
+              f"{run['model_mb']:>9.2f} {run['rmse']:>9,.0f}")
+
+
+# ==================== COMPACTION BENCHMARK ====================
+def benchmark_compaction(train_rows: int = 20000, tolerance: float = 0.01, leaf_merge_dollars: float = 500.0,
+                         max_depth: int = None, unseen_rows: int = 20000) -> Dict:
+    """Size, latency and accuracy of a compacted forest against the original, plus RMSE on unseen rows"""
+    config = CornerstoneModelConfig(COMPACTION_ENABLED=True, COMPACTION_TOLERANCE=tolerance,
+                                    COMPACTION_LEAF_MERGE_DOLLARS=leaf_merge_dollars, COMPACTION_MAX_DEPTH=max_depth)
+    frame = generate_synthetic_housing_frame(train_rows, config.SEED_VALUE)
+    X = frame[config.CORNERSTONE_FEATURES]
+    X_train, X_validation, y_train, y_validation = train_test_split(
+        X.fillna(X.median()), frame[config.TARGET_COLUMN],
+        test_size=config.TEST_PROPORTION, random_state=config.SEED_VALUE
+    )
+    trainer = PredictorEnsembleBuilder(config)
+    trainer.construct_ensemble(X_train, y_train)
+    trainer.build_inference_pipeline(X_train)
+    
+    compactor = ForestCompactor(config)
+    compactor.compact(trainer.inference_pipeline, X_validation, y_validation)
+    compacted_pipeline = compactor.candidate_pipeline
+    
+    # Tree selection saw the validation rows; fresh rows show what the compaction really costs.
+    # The candidate is measured even when training would have kept the original forest
+    unseen = generate_synthetic_housing_frame(unseen_rows, seed=97)
+    unseen_features = unseen[config.CORNERSTONE_FEATURES]
+    report = compactor.compaction_report
+    for name, pipeline in (('original', trainer.inference_pipeline), ('compacted', compacted_pipeline)):
+        report[name]['unseen_rmse'] = compute_regression_metrics(
+            unseen[config.TARGET_COLUMN], pipeline.predict(unseen_features)
+        )['rmse']
+    
+    return {
+        'benchmark': 'compaction',
+        'environment': describe_benchmark_environment(),
+        'train_rows': len(X_train),
+        'unseen_rows': unseen_rows,
+        **{key: value for key, value in report.items() if key != 'kept_tree_positions'}
+    }
+
+
+def print_compaction_results(results: Dict):
+    """Render the original and compacted model side by side"""
+    print(f"tolerance {results['tolerance']:.1%}, leaf merge ${results['leaf_merge_dollars']:,.0f}, "
+          f"max depth {results['max_depth']}; {results['train_rows']} training rows; "
+          f"{'within' if results['within_tolerance'] else 'outside'} tolerance")
+    rows = (('trees', 'd'), ('nodes', 'd'), ('max_depth', 'd'), ('pipeline_mb', '.2f'), ('engine_mb', '.2f'),
+            ('single_row_ms', '.3f'), ('batch_ms', '.2f'), ('rmse', ',.0f'), ('unseen_rmse', ',.0f'))
+    print(f"{'':>14} {'original':>12} {'compacted':>12}")
+    for key, spec in rows:
+        print(f"{key:>14} {results['original'][key]:>12{spec}} {results['compacted'][key]:>12{spec}}")
+
+
+# ==================== PREDICTION LATTICE BENCHMARK ====================
+def lattice_probe_matrix(engine: CompiledForestEngine, base_matrix: np.ndarray, seed: int = 5) -> np.ndarray:
+    """Unseen rows plus rows moved exactly onto, just above and just below every split threshold, and NaN rows"""
+    rng = np.random.default_rng(seed)
+    probes = [base_matrix]
+    for feature, thresholds in enumerate(engine.split_thresholds()):
+        for neighbour in (None, np.inf, -np.inf):
+            edge_values = thresholds if neighbour is None else np.nextafter(thresholds, np.float32(neighbour))
+            edge_rows = base_matrix[rng.integers(len(base_matrix), size=len(thresholds))].copy()
+            edge_rows[:, feature] = edge_values
+            probes.append(edge_rows)
+    missing_rows = base_matrix[:200].copy()
+    missing_rows[rng.random(missing_rows.shape) < 0.3] = np.nan
+    probes.append(missing_rows)
+    return np.vstack(probes)
+
+
+def parse_lattice_shape(text: str) -> Tuple[int, Any]:
+    """'TREES:DEPTH' -> (tree count, max depth or None for 'none')"""
+    trees, _, depth = text.partition(':')
+    return int(trees), None if depth in ('', 'none') else int(depth)
+
+
+def benchmark_prediction_lattice(shapes: Sequence[Tuple[int, Any]] = ((10, 5), (30, 4), (200, None)),
+                                 train_rows: int = 1460, max_cells: int = 4000000) -> Dict:
+    """
+    Lattice size, build time and lookup latency against tree traversal for forests of
+    several (trees, max depth) shapes. A lattice must reproduce the traversal bit for
+    bit on unseen rows and at every threshold edge.
+    """
+    runs = []
+    frame = generate_synthetic_housing_frame(train_rows, seed=11)
+    unseen = generate_synthetic_housing_frame(10000, seed=97)
+    for tree_count, max_depth in shapes:
+        config = CornerstoneModelConfig(TREE_COUNT=tree_count, MAX_TREE_DEPTH=max_depth)
+        features = list(config.CORNERSTONE_FEATURES)
+        X = frame[features]
+        trainer = PredictorEnsembleBuilder(config)
+        trainer.construct_ensemble(X.fillna(X.median()), frame[config.TARGET_COLUMN])
+        trainer.build_inference_pipeline(X)
+        engine = CompiledForestEngine.from_direct_predictor(
+            DirectForestPredictor.from_pipeline(trainer.inference_pipeline, features)
+        )
+        
+        started = time.perf_counter()
+        attached = engine.attach_lattice(max_cells)
+        run = {
+            'trees': tree_count,
+            'max_depth': max_depth,
+            'cells': PredictionLattice.count_cells(engine.split_thresholds()),
+            'lattice': attached,
+            'rmse': compute_regression_metrics(
+                unseen[config.TARGET_COLUMN], trainer.inference_pipeline.predict(unseen[features])
+            )['rmse']
+        }
+        if attached:
+            lattice = engine.lattice
+            run['build_seconds'] = time.perf_counter() - started
+            run['distinct_predictions'] = len(lattice.cell_values)
+            run['lattice_mb'] = lattice.nbytes / 1e6
+            
+            probe_matrix = lattice_probe_matrix(engine, unseen[features].to_numpy(dtype=np.float64))
+            lattice_predictions = engine.predict_buffer(probe_matrix.copy())
+            engine.lattice = None
+            traversal_predictions = engine.predict_buffer(probe_matrix.copy())
+            run['probe_rows'] = len(probe_matrix)
+            run['mismatches'] = int(np.sum(lattice_predictions != traversal_predictions))
+            
+            for batch_size in (1, 10000):
+                batch = probe_matrix[:batch_size]
+                repeats = repeats_for_batch(batch_size)
+                run[f'traversal_{batch_size}'] = summarize_latencies(
+                    time_repeated(lambda: engine.predict_buffer(batch.copy()), repeats))
+                run[f'lattice_{batch_size}'] = summarize_latencies(
+                    time_repeated(lambda: lattice.predict_buffer(batch.copy()), repeats))
+        runs.append(run)
+    
+    return {
+        'benchmark': 'prediction_lattice',
+        'environment': describe_benchmark_environment(),
+        'train_rows': train_rows,
+        'max_cells': max_cells,
+        'runs': runs,
+        'exact': all(run.get('mismatches', 0) == 0 for run in runs)
+    }
+
+
+def print_prediction_lattice_results(results: Dict):
+    """Render lattice size and lookup vs traversal latency per forest shape"""
+    print(f"Cell budget {results['max_cells']:,}; {results['train_rows']} training rows")
+    print(f"{'trees':>6} {'depth':>6} {'cells':>10} {'RMSE':>9} {'build s':>8} {'MB':>7} "
+          f"{'walk 1 ms':>10} {'lut 1 ms':>9} {'walk 10k':>9} {'lut 10k':>8} {'mismatch':>9}")
+    for run in results['runs']:
+        prefix = f"{run['trees']:>6} {str(run['max_depth']):>6} {run['cells']:>10.3g} {run['rmse']:>9,.0f}"
+        if not run['lattice']:
+            print(f"{prefix}   over budget - tree traversal kept")
+            continue
+        print(f"{prefix} {run['build_seconds']:>8.2f} {run['lattice_mb']:>7.2f} "
+              f"{run['traversal_1']['p50_ms']:>10.3f} {run['lattice_1']['p50_ms']:>9.3f} "
+              f"{run['traversal_10000']['p50_ms']:>9.2f} {run['lattice_10000']['p50_ms']:>8.2f} {run['mismatches']:>9}")
+
+
+# ==================== STARTUP BENCHMARK ====================
+# Runs in a fresh interpreter so that import costs (sklearn for unpickling, pandas,
+# Flask) are measured exactly as a newly forked serving worker pays them
+STARTUP_WORKER_SOURCE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().post('/cornerstone-predict/batch', json=[{
+    'OverallQual': 7, 'GrLivArea': 1710, 'YearBuilt': 2003, 'TotalBsmtSF': 856,
+    'FullBath': 2, 'BedroomAbvGr': 3, 'GarageCars': 2
+}])
+first_prediction = time.perf_counter()
+print(json.dumps({
+    'status_code': response.status_code,
+    'import_seconds': imported - started,
+    'first_prediction_seconds': first_prediction - started,
+    'sklearn_imported': 'sklearn' in sys.modules,
+}), flush=True)
+sys.stdin.read()
+"""
+
+
+def write_benchmark_artifacts(artifact_directory: str, train_rows: int):
+    """Train on synthetic data and persist every artifact format the service can load"""
+    config = CornerstoneModelConfig()
+    pipeline, features = train_synthetic_pipeline(train_rows, config)
+    registry = ModelArtifactRegistry(artifact_directory, config)
+    registry.persist_inference_pipeline(pipeline)
+    registry.persist_feature_metadata(features)
+    registry.persist_compiled_engine(pipeline, features)
+
+
+def read_process_memory(pid: int) -> Dict[str, float]:
+    """
+    Resident memory of a live process in MB (Linux smaps_rollup).
+    PSS splits shared pages between the processes mapping them, so it shows how
+    much of each worker's RSS is really its own.
+    """
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as smaps_file:
+            for line in smaps_file:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Clean', 'Private_Dirty'):
+                    memory[key] = int(value.split()[0]) / 1024.0
+    except OSError:
+        return {}
+    
+    memory['Uss'] = memory.get('Private_Clean', 0.0) + memory.get('Private_Dirty', 0.0)
+    return {f'{key.lower()}_mb': value for key, value in memory.items()}
+
+
+def measure_worker_startup(artifact_directory: str, inference_engine: str, worker_count: int) -> Dict:
+    """Start worker_count interpreters concurrently and measure time and memory to first prediction"""
+    environment = dict(
+        os.environ,
+        CORNERSTONE_ARTIFACT_DIRECTORY=artifact_directory,
+        CORNERSTONE_INFERENCE_ENGINE=inference_engine,
+        CORNERSTONE_MODEL_RELOAD_INTERVAL_SECONDS='0',
+        PYTHONWARNINGS='ignore',
+    )
+    repository_directory = os.path.dirname(os.path.abspath(__file__))
+    
+    workers, reports = [], []
+    for _ in range(worker_count):
+        spawned_at = time.perf_counter()
+        worker = subprocess.Popen(
+            [sys.executable, '-c', STARTUP_WORKER_SOURCE],
+            cwd=repository_directory, env=environment, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        workers.append((worker, spawned_at))
+    
+    try:
+        for worker, spawned_at in workers:
+            report = json.loads(worker.stdout.readline())
+            report['spawn_to_first_prediction_seconds'] = time.perf_counter() - spawned_at
+            reports.append(report)
+        
+        # Sample memory only once every worker holds its model, so sharing is visible
+        for report, (worker, _) in zip(reports, workers):
+            report.update(read_process_memory(worker.pid))
+    finally:
+        for worker, _ in workers:
+            worker.stdin.close()
+            worker.wait(timeout=30)
+    
+    summary = {'inference_engine': inference_engine, 'workers': worker_count, 'per_worker': reports}
+    for metric in ('import_seconds', 'first_prediction_seconds', 'rss_mb', 'pss_mb', 'uss_mb'):
+        values = [report[metric] for report in reports if metric in report]
+        if values:
+            summary[f'median_{metric}'] = float(np.median(values))
+    return summary
+
+
+def benchmark_worker_startup(worker_count: int = 4, train_rows: int = 1460) -> Dict:
+    """Compare joblib pipeline and memory-mapped engine start-up across concurrent workers"""
+    with tempfile.TemporaryDirectory(prefix='cornerstone-startup-') as artifact_directory:
+        write_benchmark_artifacts(artifact_directory, train_rows)
+        pipeline_size = os.path.getsize(os.path.join(artifact_directory, 'pipeline.pkl'))
+        engine = CompiledForestEngine.load(os.path.join(artifact_directory, 'forest_engine'))
+        
+        return {
+            'benchmark': 'worker_startup',
+            'train_rows': train_rows,
+            'pipeline_pickle_mb': pipeline_size / 1e6,
+            'engine_buffers_mb': engine.nbytes / 1e6,
+            'formats': [
+                measure_worker_startup(artifact_directory, 'pipeline', worker_count),
+                measure_worker_startup(artifact_directory, 'compiled', worker_count),
+            ]
+        }
+
+
+def print_startup_results(results: Dict):
+    """Render the start-up benchmark as a per-format table"""
+    print(f"pipeline.pkl {results['pipeline_pickle_mb']:.1f} MB, "
+          f"engine buffers {results['engine_buffers_mb']:.1f} MB")
+    print(f"{'format':>10} {'import s':>10} {'first pred s':>13} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9}")
+    for summary in results['formats']:
+        print(f"{summary['inference_engine']:>10} "
+              f"{summary.get('median_import_seconds', float('nan')):>10.3f} "
+              f"{summary.get('median_first_prediction_seconds', float('nan')):>13.3f} "
+              f"{summary.get('median_rss_mb', float('nan')):>9.1f} "
+              f"{summary.get('median_pss_mb', float('nan')):>9.1f} "
+              f"{summary.get('median_uss_mb', float('nan')):>9.1f}")
+
+
+# ==================== INGESTION BENCHMARK ====================
+# Each ingestion mode runs in its own interpreter so its peak RSS is measured in isolation
+INGESTION_WORKER_SOURCE = """
+import json, os, sys, threading, time
+import numpy as np
+from model import CornerstoneModelConfig, DatasetOrchestrator
+
+# ru_maxrss already holds the import-time peak, so sample current RSS instead
+page_mb = os.sysconf('SC_PAGE_SIZE') / 1024.0 / 1024.0
+def current_rss_mb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * page_mb
+samples, finished = [current_rss_mb()], threading.Event()
+def sample_rss():
+    while not finished.wait(0.002):
+        samples.append(current_rss_mb())
+sampler = threading.Thread(target=sample_rss, daemon=True)
+sampler.start()
+
+config = CornerstoneModelConfig(INGESTION_MODE=sys.argv[2], INGESTION_CHUNK_ROWS=int(sys.argv[3]))
+started = time.perf_counter()
+X_train, X_test, y_train, y_test = DatasetOrchestrator(sys.argv[1], config).prepare_training_partitions()
+elapsed = time.perf_counter() - started
+finished.set()
+sampler.join()
+print(json.dumps({
+    'ingestion_mode': sys.argv[2],
+    'seconds': elapsed,
+    'baseline_rss_mb': samples[0],
+    'peak_rss_mb': max(samples),
+    'peak_increase_mb': max(samples) - samples[0],
+    'training_rows': len(X_train),
+    'validation_rows': len(X_test),
+    'partition_mb': sum(int(np.sum(part.memory_usage(deep=True))) for part in (X_train, X_test, y_train, y_test)) / 1e6,
+}), flush=True)
+"""
+
+# Kaggle's train.csv has 81 columns, 43 of them categorical strings
+FILLER_NUMERIC_COLUMNS = 29
+FILLER_CATEGORICAL_COLUMNS = 43
+
+
+def write_wide_training_csv(dataset_path: str, row_count: int, seed: int = 11, chunk_rows: int = 200000):
+    """Write a synthetic train.csv with the Kaggle column count, chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    categories = np.array(['RL', 'RM', 'FV', 'Pave', 'Gd', 'TA', 'Ex', 'Fa', 'NA', 'Normal'])
+    for offset in range(0, row_count, chunk_rows):
+        size = min(chunk_rows, row_count - offset)
+        frame = generate_synthetic_housing_frame(size, seed + offset)
+        frame.insert(0, 'Id', np.arange(offset + 1, offset + size + 1))
+        for index in range(FILLER_NUMERIC_COLUMNS):
+            frame[f'Numeric{index}'] = rng.integers(0, 1000, size)
+        for index in range(FILLER_CATEGORICAL_COLUMNS):
+            frame[f'Category{index}'] = categories[rng.integers(0, categories.size, size)]
+        frame.to_csv(dataset_path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+
+
+def measure_ingestion(data_directory: str, ingestion_mode: str, chunk_rows: int) -> Dict:
+    """Run one ingestion mode in a fresh interpreter and collect its peak memory"""
+    repository_directory = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, '-c', INGESTION_WORKER_SOURCE, data_directory, ingestion_mode, str(chunk_rows)],
+        cwd=repository_directory, env=dict(os.environ, PYTHONWARNINGS='ignore'),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def benchmark_ingestion(row_count: int = 2000000, chunk_rows: int = 250000) -> Dict:
+    """Compare peak memory and time of in-memory and streaming ingestion on a wide CSV"""
+    with tempfile.TemporaryDirectory(prefix='cornerstone-ingestion-') as data_directory:
+        dataset_path = os.path.join(data_directory, 'train.csv')
+        write_wide_training_csv(dataset_path, row_count)
+        
+        return {
+            'benchmark': 'ingestion',
+            'rows': row_count,
+            'chunk_rows': chunk_rows,
+            'csv_mb': os.path.getsize(dataset_path) / 1e6,
+            'modes': [
+                measure_ingestion(data_directory, 'memory', chunk_rows),
+                measure_ingestion(data_directory, 'streaming', chunk_rows),
+            ]
+        }
+
+
+def print_ingestion_results(results: Dict):
+    """Render the ingestion benchmark as a per-mode table"""
+    print(f"train.csv {results['rows']} rows, {results['csv_mb']:.1f} MB")
+    print(f"{'mode':>10} {'seconds':>9} {'peak +MB':>10} {'partitions MB':>14}")
+    for mode in results['modes']:
+        print(f"{mode['ingestion_mode']:>10} {mode['seconds']:>9.2f} "
+              f"{mode['peak_increase_mb']:>10.1f} {mode['partition_mb']:>14.1f}")
+
+
+# ==================== DATASET CACHE BENCHMARK ====================
+def time_training_data_load(data_directory: str, cache_enabled: bool) -> float:
+    """Seconds for load_training_data plus the model-column copy that reads every value"""
+    orchestrator = DatasetOrchestrator(data_directory, CornerstoneModelConfig(DATASET_CACHE_ENABLED=cache_enabled))
+    started = time.perf_counter()
+    orchestrator.load_training_data()
+    orchestrator.extract_model_features()
+    return time.perf_counter() - started
+
+
+def benchmark_dataset_cache(row_count: int = 3000000, repeats: int = 3) -> Dict:
+    """Compare parsing train.csv from text with building and then hitting the columnar cache"""
+    with tempfile.TemporaryDirectory(prefix='cornerstone-dataset-cache-') as data_directory:
+        write_wide_training_csv(os.path.join(data_directory, 'train.csv'), row_count)
+        
+        csv_seconds = [time_training_data_load(data_directory, cache_enabled=False) for _ in range(repeats)]
+        build_seconds = time_training_data_load(data_directory, cache_enabled=True)
+        hit_seconds = [time_training_data_load(data_directory, cache_enabled=True) for _ in range(repeats)]
+        
+        cache_directory = os.path.join(data_directory, CornerstoneModelConfig().DATASET_CACHE_DIRECTORY)
+        cache_bytes = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(cache_directory) for name in names
+        )
+        
+        return {
+            'benchmark': 'dataset_cache',
+            'rows': row_count,
+            'csv_mb': os.path.getsize(os.path.join(data_directory, 'train.csv')) / 1e6,
+            'cache_mb': cache_bytes / 1e6,
+            'csv_parse_seconds': float(np.median(csv_seconds)),
+            'cache_build_seconds': build_seconds,
+            'cache_hit_seconds': float(np.median(hit_seconds)),
+        }
+
+
+def print_dataset_cache_results(results: Dict):
+    """Render the dataset cache benchmark"""
+    print(f"train.csv {results['rows']} rows, {results['csv_mb']:.1f} MB; cache {results['cache_mb']:.1f} MB")
+    print(f"{'cold CSV parse':>16} {results['csv_parse_seconds']:>8.3f} s")
+    print(f"{'cache build':>16} {results['cache_build_seconds']:>8.3f} s")
+    print(f"{'cache hit':>16} {results['cache_hit_seconds']:>8.3f} s "
+          f"({results['csv_parse_seconds'] / results['cache_hit_seconds']:.0f}x faster)")
+
+
+# ==================== INCREMENTAL REFRESH BENCHMARK ====================
+def generate_drifting_sales(row_count: int, day: int, daily_drift: float, seed: int) -> pd.DataFrame:
+    """Synthetic sales closed on a given day, with prices inflating by daily_drift per day"""
+    frame = generate_synthetic_housing_frame(row_count, seed)
+    frame['SalePrice'] = (frame['SalePrice'] * (1.0 + daily_drift * day)).round()
+    return frame
+
+
+def benchmark_incremental_refresh(history_rows: int = 20000, days: int = 5, daily_rows: int = 500,
+                                  daily_drift: float = 0.01, tree_count: int = 200, incremental_trees: int = 20) -> Dict:
+    """
+    Simulate daily refreshes: every day a full rebuild on all sales so far competes with
+    warm-started rolling and append updates. All models are scored on a fresh sample
+    of that day's market, so accuracy drift against the full rebuild is visible per day.
+    """
+    config = CornerstoneModelConfig(TREE_COUNT=tree_count, INCREMENTAL_TREE_COUNT=incremental_trees)
+    features, target = list(config.CORNERSTONE_FEATURES), config.TARGET_COLUMN
+    
+    def rebuild(frame: pd.DataFrame):
+        trainer = PredictorEnsembleBuilder(config)
+        X = frame[features]
+        trainer.construct_ensemble(X.fillna(X.median()), frame[target])
+        trainer.build_inference_pipeline(X)
+        return trainer.inference_pipeline
+    
+    sales = [generate_drifting_sales(history_rows, 0, daily_drift, seed=config.SEED_VALUE)]
+    base_pipeline = rebuild(sales[0])
+    incremental_pipelines = {strategy: copy.deepcopy(base_pipeline) for strategy in ('rolling', 'append')}
+    
+    results = {
+        'benchmark': 'incremental_refresh',
+        'history_rows': history_rows,
+        'daily_rows': daily_rows,
+        'daily_drift': daily_drift,
+        'tree_count': tree_count,
+        'incremental_trees': incremental_trees,
+        'days': []
+    }
+    
+    for day in range(1, days + 1):
+        batch = generate_drifting_sales(daily_rows, day, daily_drift, seed=1000 + day)
+        evaluation = generate_drifting_sales(2000, day, daily_drift, seed=5000 + day)
+        sales.append(batch)
+        
+        started = time.perf_counter()
+        full_pipeline = rebuild(pd.concat(sales, ignore_index=True))
+        full_seconds = time.perf_counter() - started
+        full_metrics = compute_regression_metrics(evaluation[target], full_pipeline.predict(evaluation[features]))
+        day_report = {'day': day, 'full_rebuild': {'seconds': full_seconds, **full_metrics}}
+        
+        for strategy, pipeline in incremental_pipelines.items():
+            medians = pd.Series(pipeline.named_steps['imputation_layer'].statistics_, index=features)
+            trainer = PredictorEnsembleBuilder(replace(config, INCREMENTAL_STRATEGY=strategy))
+            
+            started = time.perf_counter()
+            trainer.extend_ensemble(pipeline, batch[features].fillna(medians), batch[target], day)
+            seconds = time.perf_counter() - started
+            
+            metrics = compute_regression_metrics(evaluation[target], pipeline.predict(evaluation[features]))
+            day_report[strategy] = {
+                'seconds': seconds,
+                'forest_size': len(pipeline.named_steps['ensemble_predictor'].estimators_),
+                'rmse_drift_pct': 100.0 * (metrics['rmse'] - full_metrics['rmse']) / full_metrics['rmse'],
+                **metrics
+            }
+        results['days'].append(day_report)
+    
+    return results
+
+
+def print_incremental_results(results: Dict):
+    """Render per-day refresh cost and accuracy drift against a full rebuild"""
+    print(f"history {results['history_rows']} rows, +{results['daily_rows']} rows/day, "
+          f"{results['daily_drift']:.1%} daily price drift, {results['incremental_trees']} trees per refresh")
+    print(f"{'day':>4} {'mode':>13} {'seconds':>9} {'RMSE':>10} {'vs full':>9}")
+    for day in results['days']:
+        full = day['full_rebuild']
+        print(f"{day['day']:>4} {'full rebuild':>13} {full['seconds']:>9.2f} {full['rmse']:>10,.0f}")
+        for strategy in ('rolling', 'append'):
+            stats = day[strategy]
+            print(f"{'':>4} {strategy:>13} {stats['seconds']:>9.2f} {stats['rmse']:>10,.0f} "
+                  f"{stats['rmse_drift_pct']:>+8.1f}%")
+
+
+# ==================== SERVING BENCHMARK ====================
+# Stage names emitted by /cornerstone-predict in its Server-Timing header
+SERVING_STAGES = ('form_parsing', 'feature_validation', 'dataframe_build', 'model_predict', 'template_render')
+
+# Service configurations compared by the serving benchmark
+SERVING_VARIANTS = {
+    'dataframe': {'INFERENCE_ENGINE': 'pipeline', 'DIRECT_INFERENCE_ENABLED': False},
+    'direct': {'INFERENCE_ENGINE': 'pipeline', 'DIRECT_INFERENCE_ENABLED': True},
+    'compiled': {'INFERENCE_ENGINE': 'compiled'},
+}
+
+# Real HTTP server in its own interpreter, so the load generator does not share its GIL.
+# HTTP/1.1 keeps client connections alive between requests like a production proxy would
+SERVING_WORKER_SOURCE = """
+import logging
+from werkzeug.serving import make_server, WSGIRequestHandler
+import app
+logging.disable(logging.INFO)
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    def log_request(self, *args, **kwargs):
+        pass
+server = make_server('127.0.0.1', 0, app.app, threaded=True, request_handler=KeepAliveRequestHandler)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+# The same service behind the asyncio front-end and its built-in HTTP/1.1 server
+ASGI_SERVING_WORKER_SOURCE = """
+import asyncio
+import logging
+import app
+from cornerstone_asgi import CornerstoneAsgiApplication, AsyncHttpServer
+logging.disable(logging.INFO)
+server = AsyncHttpServer(CornerstoneAsgiApplication(app.cornerstone_service), '127.0.0.1', 0)
+asyncio.run(server.serve(lambda port: print(port, flush=True)))
+"""
+
+# Server process source per HTTP transport
+SERVING_WORKER_SOURCES = {'wsgi_server': SERVING_WORKER_SOURCE, 'asgi_server': ASGI_SERVING_WORKER_SOURCE}
+
+
+def serving_config_overrides(artifact_directory: str, variant: str,
+                             extra_overrides: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Service configuration for one benchmark variant: no cache, no reload, timing on"""
+    return {
+        'ARTIFACT_DIRECTORY': artifact_directory,
+        'MODEL_RELOAD_INTERVAL_SECONDS': 0.0,
+        'PREDICTION_CACHE_SIZE': 0,
+        'SERVER_TIMING_ENABLED': True,
+        **SERVING_VARIANTS[variant],
+        **(extra_overrides or {})
+    }
+
+
+def generate_form_payloads(count: int, seed: int = 23) -> List[Dict[str, str]]:
+    """Distinct form submissions drawn from the synthetic feature distribution"""
+    frame = generate_synthetic_housing_frame(count, seed).drop(columns=['SalePrice'])
+    
+    # A missing value is an omitted field, as an empty form input would be rejected
+    return [
+        {feature: f'{value:g}' for feature, value in row.items() if not pd.isna(value)}
+        for row in frame.to_dict(orient='records')
+    ]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Parse 'stage;dur=1.23, ...' into stage -> milliseconds"""
+    durations = {}
+    for entry in filter(None, (part.strip() for part in header.split(','))):
+        name, _, parameters = entry.partition(';')
+        for parameter in parameters.split(';'):
+            key, _, value = parameter.partition('=')
+            if key.strip() == 'dur':
+                durations[name.strip()] = float(value)
+    return durations
+
+
+def drive_load(sender_factory: Callable[[], Callable[[Dict[str, str]], Tuple[int, str]]],
+               payloads: List[Dict[str, str]], concurrency: int, request_count: int, warmup: int = 20) -> Dict:
+    """
+    Issue request_count predictions from concurrency closed-loop client threads.
+    Each thread builds its own sender (test client or keep-alive connection).
+    """
+    for payload in payloads[:warmup]:
+        sender_factory()(payload)
+    
+    request_numbers = itertools.count()
+    latencies, stage_samples, failures = [], {stage: [] for stage in SERVING_STAGES + ('unattributed',)}, []
+    
+    def client_loop():
+        send = sender_factory()
+        for request_number in iter(lambda: next(request_numbers), None):
+            if request_number >= request_count:
+                return
+            started = time.perf_counter()
+            status, timing_header = send(payloads[request_number % len(payloads)])
+            elapsed = time.perf_counter() - started
+            
+            if status != 200:
+                failures.append(status)
+                continue
+            latencies.append(elapsed)
+            stages = parse_server_timing(timing_header)
+            for stage, milliseconds in stages.items():
+                stage_samples.setdefault(stage, []).append(milliseconds / 1000.0)
+            
+            # Routing, WSGI, HTTP and client time the route itself does not see
+            stage_samples['unattributed'].append(max(elapsed - sum(stages.values()) / 1000.0, 0.0))
+    
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    wall_seconds = time.perf_counter() - started
+    
+    return {
+        'concurrency': concurrency,
+        'requests': request_count,
+        'errors': len(failures),
+        'wall_seconds': wall_seconds,
+        'requests_per_second': len(latencies) / wall_seconds,
+        'latency': summarize_latencies(latencies),
+        'stages': {stage: summarize_latencies(samples) for stage, samples in stage_samples.items() if samples}
+    }
+
+
+def flask_test_client_sender(flask_app) -> Callable[[], Callable[[Dict[str, str]], Tuple[int, str]]]:
+    """Senders posting through Flask's in-process test client"""
+    def factory():
+        client = flask_app.test_client()
+        
+        def send(payload: Dict[str, str]) -> Tuple[int, str]:
+            response = client.post('/cornerstone-predict', data=payload)
+            return response.status_code, response.headers.get('Server-Timing', '')
+        return send
+    return factory
+
+
+def http_sender_factory(port: int) -> Callable[[], Callable[[Dict[str, str]], Tuple[int, str]]]:
+    """Senders posting over one persistent HTTP connection per client thread"""
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    
+    def factory():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        
+        def send(payload: Dict[str, str]) -> Tuple[int, str]:
+            connection.request('POST', '/cornerstone-predict', urllib.parse.urlencode(payload), headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader('Server-Timing', '')
+        return send
+    return factory
+
+
+def benchmark_test_client(artifact_directory: str, variant: str, payloads: List[Dict[str, str]],
+                          concurrency_levels: Sequence[int], request_count: int) -> List[Dict]:
+    """Drive an in-process app instance through the Flask test client"""
+    # app builds its module-level service on import; keep that instance inert
+    os.environ.setdefault('CORNERSTONE_MODEL_RELOAD_INTERVAL_SECONDS', '0')
+    from app import CornerstoneApiServer, CornerstoneServiceConfig
+    
+    config = CornerstoneServiceConfig(**serving_config_overrides(artifact_directory, variant))
+    service = CornerstoneApiServer(os.path.dirname(os.path.abspath(__file__)), config)
+    
+    logging.disable(logging.INFO)
+    try:
+        return [
+            {'transport': 'test_client', 'variant': variant,
+             **drive_load(flask_test_client_sender(service.app), payloads, concurrency, request_count)}
+            for concurrency in concurrency_levels
+        ]
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def start_serving_worker(artifact_directory: str, variant: str, extra_overrides: Dict[str, Any] = None,
+                         transport: str = 'wsgi_server') -> Tuple[subprocess.Popen, int]:
+    """Launch the transport's server process with the variant's configuration; returns (process, port)"""
+    environment = dict(os.environ, PYTHONWARNINGS='ignore')
+    for name, value in serving_config_overrides(artifact_directory, variant, extra_overrides).items():
+        environment[f'CORNERSTONE_{name}'] = str(value)
+    
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVING_WORKER_SOURCES[transport]],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=environment, text=True,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    return server, int(server.stdout.readline())
+
+
+def benchmark_http_server(artifact_directory: str, variant: str, payloads: List[Dict[str, str]],
+                          concurrency_levels: Sequence[int], request_count: int,
+                          transport: str = 'wsgi_server') -> List[Dict]:
+    """Drive a threaded WSGI or asyncio server running in a separate interpreter"""
+    server, port = start_serving_worker(artifact_directory, variant, transport=transport)
+    try:
+        return [
+            {'transport': transport, 'variant': variant,
+             **drive_load(http_sender_factory(port), payloads, concurrency, request_count)}
+            for concurrency in concurrency_levels
+        ]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def describe_benchmark_environment() -> Dict[str, Any]:
+    """Commit and library versions, so saved results can be compared across commits"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    versions = {}
+    for package in ('flask', 'werkzeug', 'scikit-learn', 'numpy', 'pandas'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions
+    }
+
+
+def benchmark_serving(concurrency_levels: Sequence[int] = (1, 4, 16), request_count: int = 500,
+                      variants: Sequence[str] = ('dataframe', 'direct', 'compiled'),
+                      transports: Sequence[str] = ('test_client', 'wsgi_server', 'asgi_server'),
+                      train_rows: int = 1460) -> Dict:
+    """Latency, throughput and per-stage breakdown of /cornerstone-predict"""
+    payloads = generate_form_payloads(max(request_count, 1000))
+    runs = []
+    
+    with tempfile.TemporaryDirectory(prefix='cornerstone-serving-') as artifact_directory:
+        write_benchmark_artifacts(artifact_directory, train_rows)
+        for variant in variants:
+            if 'test_client' in transports:
+                runs.extend(benchmark_test_client(artifact_directory, variant, payloads, concurrency_levels, request_count))
+            for transport in ('wsgi_server', 'asgi_server'):
+                if transport in transports:
+                    runs.extend(benchmark_http_server(artifact_directory, variant, payloads, concurrency_levels,
+                                                      request_count, transport))
+    
+    return {
+        'benchmark': 'serving',
+        'environment': describe_benchmark_environment(),
+        'train_rows': train_rows,
+        'runs': runs
+    }
+
+
+def print_serving_results(results: Dict):
+    """Render throughput, latency percentiles and median stage costs per run"""
+    stage_columns = SERVING_STAGES + ('unattributed',)
+    print(f"{'transport':>12} {'variant':>10} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  "
+          + ' '.join(f'{stage[:10]:>10}' for stage in stage_columns))
+    for run in results['runs']:
+        stage_medians = ' '.join(
+            f"{run['stages'][stage]['p50_ms']:>10.3f}" if stage in run['stages'] else f"{'-':>10}"
+            for stage in stage_columns
+        )
+        print(f"{run['transport']:>12} {run['variant']:>10} {run['concurrency']:>5} "
+              f"{run['requests_per_second']:>8.0f} {run['latency']['p50_ms']:>8.2f} "
+              f"{run['latency']['p95_ms']:>8.2f} {run['latency']['p99_ms']:>8.2f}  {stage_medians}")
+
+
+# ==================== COALESCING BENCHMARK ====================
+def scrape_metric_totals(port: int, metric_names: Sequence[str]) -> Dict[str, float]:
+    """Sum every labelled sample of the named metrics from the server's /metrics page"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request('GET', '/metrics')
+        exposition = connection.getresponse().read().decode('utf-8')
+    finally:
+        connection.close()
+    
+    totals = {name: 0.0 for name in metric_names}
+    for line in exposition.splitlines():
+        if line.startswith('#') or not line.strip():
+            continue
+        sample_name, _, value = line.rpartition(' ')
+        metric_name = sample_name.split('{', 1)[0]
+        if metric_name in totals:
+            totals[metric_name] += float(value)
+    return totals
+
+
+def parse_coalescing_setting(text: str) -> Tuple[int, float]:
+    """'ROWS:MILLISECONDS' -> (max batch rows, max wait seconds)"""
+    rows, _, milliseconds = text.partition(':')
+    return int(rows), float(milliseconds or 0.0) / 1000.0
+
+
+def benchmark_coalescing(concurrency_levels: Sequence[int] = (1, 8, 32, 64), request_count: int = 1000,
+                         settings: Sequence[Tuple[int, float]] = ((8, 0.001), (32, 0.002)),
+                         variant: str = 'direct', train_rows: int = 1460) -> Dict:
+    """
+    Throughput and tail latency of /cornerstone-predict with micro-batching off and on.
+    Every setting runs in a fresh WSGI worker; the mean flushed batch size per level
+    comes from the worker's own /metrics counters.
+    """
+    payloads = generate_form_payloads(max(request_count, 1000))
+    batch_metrics = ('cornerstone_coalesced_batches_total', 'cornerstone_coalesced_rows_total')
+    runs = []
+    
+    with tempfile.TemporaryDirectory(prefix='cornerstone-coalescing-') as artifact_directory:
+        write_benchmark_artifacts(artifact_directory, train_rows)
+        for max_batch_rows, max_wait_seconds in [(0, 0.0)] + list(settings):
+            coalescing_enabled = max_batch_rows > 0
+            overrides = {'COALESCING_ENABLED': coalescing_enabled}
+            if coalescing_enabled:
+                overrides.update(COALESCE_MAX_BATCH_ROWS=max_batch_rows, COALESCE_MAX_WAIT_SECONDS=max_wait_seconds)
+            
+            server, port = start_serving_worker(artifact_directory, variant, overrides)
+            try:
+                for concurrency in concurrency_levels:
+                    before = scrape_metric_totals(port, batch_metrics)
+                    run = drive_load(http_sender_factory(port), payloads, concurrency, request_count)
+                    after = scrape_metric_totals(port, batch_metrics)
+                    
+                    batches = after[batch_metrics[0]] - before[batch_metrics[0]]
+                    runs.append({
+                        'variant': variant,
+                        'coalescing': coalescing_enabled,
+                        'max_batch_rows': max_batch_rows if coalescing_enabled else None,
+                        'max_wait_ms': max_wait_seconds * 1000.0 if coalescing_enabled else None,
+                        'mean_batch_rows': (after[batch_metrics[1]] - before[batch_metrics[1]]) / batches if batches else 1.0,
+                        **run
+                    })
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    
+    return {
+        'benchmark': 'coalescing',
+        'environment': describe_benchmark_environment(),
+        'train_rows': train_rows,
+        'runs': runs
+    }
+
+
+def print_coalescing_results(results: Dict):
+    """Render throughput, tail latency and mean batch size per setting and concurrency"""
+    print(f"{'setting':>12} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'predict p50':>12} {'batch rows':>11}")
+    for run in results['runs']:
+        setting = f"{run['max_batch_rows']}/{run['max_wait_ms']:g}ms" if run['coalescing'] else 'off'
+        predict_median = run['stages'].get('model_predict', {}).get('p50_ms', float('nan'))
+        print(f"{setting:>12} {run['concurrency']:>5} {run['requests_per_second']:>8.0f} "
+              f"{run['latency']['p50_ms']:>8.2f} {run['latency']['p95_ms']:>8.2f} {run['latency']['p99_ms']:>8.2f} "
+              f"{predict_median:>12.3f} {run['mean_batch_rows']:>11.1f}")
+
+
+# ==================== BULK SCORING ====================
+def benchmark_bulk_scoring(worker_counts: Sequence[int] = (1, 2, 4), row_count: int = 1000000,
+                           chunk_rows: int = 50000, train_rows: int = 1460) -> Dict:
+    """Offline scoring throughput of one wide CSV per process-pool size"""
+    with tempfile.TemporaryDirectory(prefix='cornerstone-bulk-scoring-') as work_directory:
+        write_benchmark_artifacts(work_directory, train_rows)
+        input_path = os.path.join(work_directory, 'score.csv')
+        write_wide_training_csv(input_path, row_count)
+        
+        runs = []
+        for worker_count in worker_counts:
+            runner = BulkScoringRunner(input_path, os.path.join(work_directory, f'scored-{worker_count}.csv'),
+                                       work_directory, chunk_rows=chunk_rows, workers=worker_count)
+            report = runner.run(overwrite=True)
+            runs.append({key: report[key] for key in ('workers', 'rows_scored', 'wall_seconds', 'rows_per_second')})
+        
+        return {
+            'benchmark': 'bulk_scoring',
+            'environment': describe_benchmark_environment(),
+            'rows': row_count,
+            'input_mb': os.path.getsize(input_path) / 1e6,
+            'chunk_rows': chunk_rows,
+            'runs': runs
+        }
+
+
+def print_bulk_scoring_results(results: Dict):
+    """Render rows per second and speed-up over the smallest pool"""
+    print(f"score.csv {results['rows']} rows, {results['input_mb']:.1f} MB, "
+          f"{results['environment']['cpu_count']} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>10} {'speed-up':>9}")
+    baseline = results['runs'][0]['rows_per_second']
+    for run in results['runs']:
+        print(f"{run['workers']:>8} {run['wall_seconds']:>9.2f} {run['rows_per_second']:>10,.0f} "
+              f"{run['rows_per_second'] / baseline:>8.2f}x")
+
+
+# ==================== COMMAND LINE ====================
+def write_results(results: Dict, output_path: str):
+    """Persist benchmark results as machine-readable JSON"""
+    if not output_path:
+        return
+    with open(output_path, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    logger.info(f'Benchmark results written to {output_path}')
+
+
+def main(argv: List[str] = None):
+    """Parse the command line and run the requested benchmark"""
+    parser = argparse.ArgumentParser(description='Cornerstone performance benchmarks')
+    subcommands = parser.add_subparsers(dest='benchmark', required=True)
+    
+    engines = subcommands.add_parser('engines', help='sklearn vs direct vs compiled forest latency')
+    engines.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 64, 10000])
+    engines.add_argument('--train-rows', type=int, default=1460)
+    engines.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    training_engines = subcommands.add_parser('training-engines', help='forest vs histogram boosting fit/predict/size/RMSE')
+    training_engines.add_argument('--rows', type=int, nargs='+', default=[10000, 30000, 100000])
+    training_engines.add_argument('--forest-trees', type=int, default=200)
+    training_engines.add_argument('--engines', nargs='+', choices=['forest', 'boosted'], default=['forest', 'boosted'])
+    training_engines.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    compaction = subcommands.add_parser('compaction', help='pruned + subset + quantized forest vs the original')
+    compaction.add_argument('--train-rows', type=int, default=20000)
+    compaction.add_argument('--tolerance', type=float, default=0.01)
+    compaction.add_argument('--leaf-merge-dollars', type=float, default=500.0)
+    compaction.add_argument('--max-depth', type=int, default=None)
+    compaction.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    lattice = subcommands.add_parser('lattice', help='precomputed prediction lattice vs tree traversal')
+    lattice.add_argument('--shapes', type=parse_lattice_shape, nargs='+', default=[(10, 5), (30, 4), (200, None)],
+                         help='Forest shapes as trees:max_depth (none = unlimited depth)')
+    lattice.add_argument('--train-rows', type=int, default=1460)
+    lattice.add_argument('--max-cells', type=int, default=4000000)
+    lattice.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    startup = subcommands.add_parser('startup', help='import-to-first-prediction time and RSS per worker')
+    startup.add_argument('--workers', type=int, default=4)
+    startup.add_argument('--train-rows', type=int, default=1460)
+    startup.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    ingestion = subcommands.add_parser('ingestion', help='peak memory of in-memory vs streaming CSV ingestion')
+    ingestion.add_argument('--rows', type=int, default=2000000)
+    ingestion.add_argument('--chunk-rows', type=int, default=250000)
+    ingestion.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    dataset_cache = subcommands.add_parser('dataset-cache', help='CSV parse vs columnar cache hit load time')
+    dataset_cache.add_argument('--rows', type=int, default=3000000)
+    dataset_cache.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    incremental = subcommands.add_parser('incremental', help='warm-start refresh vs full rebuild time and accuracy')
+    incremental.add_argument('--history-rows', type=int, default=20000)
+    incremental.add_argument('--days', type=int, default=5)
+    incremental.add_argument('--daily-rows', type=int, default=500)
+    incremental.add_argument('--daily-drift', type=float, default=0.01)
+    incremental.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    serving = subcommands.add_parser('serving', help='/cornerstone-predict latency, throughput and stage breakdown')
+    serving.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    serving.add_argument('--requests', type=int, default=500, help='Requests per concurrency level')
+    serving.add_argument('--variants', nargs='+', choices=sorted(SERVING_VARIANTS), default=['dataframe', 'direct', 'compiled'])
+    serving.add_argument('--transports', nargs='+', choices=['test_client', 'wsgi_server', 'asgi_server'],
+                         default=['test_client', 'wsgi_server', 'asgi_server'])
+    serving.add_argument('--train-rows', type=int, default=1460)
+    serving.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    coalescing = subcommands.add_parser('coalescing', help='micro-batching throughput vs tail latency by concurrency')
+    coalescing.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+    coalescing.add_argument('--requests', type=int, default=1000, help='Requests per concurrency level')
+    coalescing.add_argument('--settings', type=parse_coalescing_setting, nargs='+', default=[(8, 0.001), (32, 0.002)],
+                            help='ROWS:MILLISECONDS coalescing thresholds to compare against coalescing off')
+    coalescing.add_argument('--variant', choices=sorted(SERVING_VARIANTS), default='direct')
+    coalescing.add_argument('--train-rows', type=int, default=1460)
+    coalescing.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    uncertainty = subcommands.add_parser('uncertainty', help='per-tree mean/std/quantiles overhead vs point predict')
+    uncertainty.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 64, 10000])
+    uncertainty.add_argument('--quantiles', type=float, nargs='+', default=[0.1, 0.9])
+    uncertainty.add_argument('--max-overhead', type=float, default=2.0,
+                             help='Allowed uncertainty latency as a multiple of plain predict')
+    uncertainty.add_argument('--train-rows', type=int, default=1460)
+    uncertainty.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    bulk_scoring = subcommands.add_parser('bulk-scoring', help='offline CSV scoring rows/s by worker count')
+    bulk_scoring.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    bulk_scoring.add_argument('--rows', type=int, default=1000000)
+    bulk_scoring.add_argument('--chunk-rows', type=int, default=50000)
+    bulk_scoring.add_argument('--train-rows', type=int, default=1460)
+    bulk_scoring.add_argument('--output', default=None, help='Optional JSON results path')
+    
+    args = parser.parse_args(argv)
+    
+    if args.benchmark == 'engines':
+        results = benchmark_inference_engines(tuple(args.batch_sizes), args.train_rows)
+        print_engine_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'training-engines':
+        results = benchmark_training_engines(tuple(args.rows), args.forest_trees, args.engines)
+        print_training_engine_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'compaction':
+        results = benchmark_compaction(args.train_rows, args.tolerance, args.leaf_merge_dollars, args.max_depth)
+        print_compaction_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'lattice':
+        results = benchmark_prediction_lattice(tuple(args.shapes), args.train_rows, args.max_cells)
+        print_prediction_lattice_results(results)
+        write_results(results, args.output)
+        if not results['exact']:
+            sys.exit(1)
+    elif args.benchmark == 'startup':
+        results = benchmark_worker_startup(args.workers, args.train_rows)
+        print_startup_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'ingestion':
+        results = benchmark_ingestion(args.rows, args.chunk_rows)
+        print_ingestion_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'dataset-cache':
+        results = benchmark_dataset_cache(args.rows)
+        print_dataset_cache_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'incremental':
+        results = benchmark_incremental_refresh(args.history_rows, args.days, args.daily_rows, args.daily_drift)
+        print_incremental_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'serving':
+        results = benchmark_serving(tuple(args.concurrency), args.requests, args.variants,
+                                    args.transports, args.train_rows)
+        print_serving_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'coalescing':
+        results = benchmark_coalescing(tuple(args.concurrency), args.requests, args.settings,
+                                       args.variant, args.train_rows)
+        print_coalescing_results(results)
+        write_results(results, args.output)
+    elif args.benchmark == 'uncertainty':
+        results = benchmark_uncertainty(tuple(args.batch_sizes), tuple(args.quantiles), args.max_overhead, args.train_rows)
+        print_uncertainty_results(results)
+        write_results(results, args.output)
+        if not results['within_budget']:
+            sys.exit(1)
+    elif args.benchmark == 'bulk-scoring':
+        results = benchmark_bulk_scoring(tuple(args.workers), args.rows, args.chunk_rows, args.train_rows)
+        print_bulk_scoring_results(results)
+        write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""
+Cornerstone Bulk Scoring
+========================
+Offline scoring of large CSV or Parquet files with the trained Cornerstone model.
+
+The input is streamed in chunks and only the id column and the model columns
+(model_columns.pkl) are parsed. Chunks fan out to a process pool whose workers
+all map the same compiled forest_engine/ read-only, so N workers share one
+page-cache copy of the trees. Predictions are appended to the output CSV in input
+order as soon as each chunk finishes, so memory stays bounded by the chunks in
+flight whatever the file size.
+
+After every chunk the run records its position in a small progress file next to
+the output. An interrupted run restarted with the same arguments truncates any
+partially written chunk and continues from the last completed one.
+
+Usage:
+    python cornerstone_bulk_scoring.py test.csv predictions.csv [--workers 4] [--chunk-rows 50000]
+    python cornerstone_bulk_scoring.py listings.parquet predictions.csv --id-column Id
+
+Components:
+- ScoringModelSource: Locates the compiled engine (compiling one from pipeline.pkl
+  when absent) and loads it in each worker
+- ScoringCheckpoint: Progress file that makes an interrupted run resumable
+- BulkScoringRunner: Chunked reader, bounded process-pool fan-out and ordered
+  incremental writer
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference_engine import DirectForestPredictor, CompiledForestEngine
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== MODEL SOURCE ====================
+# Each worker process loads the model once, through the pool initializer, instead of
+# receiving it pickled with every chunk
+_SCORING_WORKER_MODEL: Dict[str, Any] = {}
+
+
+def _exit_with_parent(parent_pid: int, poll_seconds: float = 1.0):
+    """Stop a worker whose parent died without shutting the pool down (e.g. kill -9)"""
+    while os.getppid() == parent_pid:
+        time.sleep(poll_seconds)
+    os._exit(1)
+
+
+def _initialize_scoring_worker(model_kind: str, model_path: str, features: List[str]):
+    """Process pool initializer: map the engine (or unpickle the pipeline) into worker globals"""
+    # Forked workers share the parent's pipe handles, so they would never see it disappear
+    threading.Thread(target=_exit_with_parent, args=(os.getppid(),), daemon=True).start()
+    
+    if model_kind == 'engine':
+        _SCORING_WORKER_MODEL['engine'] = CompiledForestEngine.load(model_path)
+    else:
+        _SCORING_WORKER_MODEL['pipeline'] = joblib.load(model_path)
+        _SCORING_WORKER_MODEL['features'] = features
+
+
+def _score_feature_chunk(feature_matrix: np.ndarray) -> np.ndarray:
+    """Predict one chunk of rows laid out in model column order"""
+    engine = _SCORING_WORKER_MODEL.get('engine')
+    if engine is not None:
+        return engine.predict_buffer(feature_matrix)
+    
+    input_dataframe = pd.DataFrame(feature_matrix, columns=_SCORING_WORKER_MODEL['features'])
+    return np.asarray(_SCORING_WORKER_MODEL['pipeline'].predict(input_dataframe), dtype=np.float64)
+
+
+class ScoringModelSource:
+    """
+    The model artifacts of one directory, prepared for sharing across processes.
+    forest_engine/ is used as is. Without one, the pipeline is compiled into a
+    temporary engine for the run; pipelines the engine cannot represent are
+    unpickled by every worker instead (correct, but not shared).
+    """
+    
+    def __init__(self, model_directory: str):
+        self.model_directory = model_directory
+        self.features: List[str] = []
+        self.model_kind = 'engine'
+        self.model_path = ''
+        self.model_version = ''
+        self._temporary_directory: Optional[str] = None
+    
+    def prepare(self) -> 'ScoringModelSource':
+        """Resolve the artifact to load, compiling a temporary engine if necessary"""
+        engine_path = os.path.join(self.model_directory, 'forest_engine')
+        pipeline_path = os.path.join(self.model_directory, 'pipeline.pkl')
+        features_path = os.path.join(self.model_directory, 'model_columns.pkl')
+        
+        if os.path.isdir(engine_path):
+            self.model_path = engine_path
+        else:
+            if not os.path.exists(pipeline_path):
+                raise FileNotFoundError(f'No forest_engine/ or pipeline.pkl in {self.model_directory}')
+            pipeline = joblib.load(pipeline_path)
+            features = joblib.load(features_path) if os.path.exists(features_path) else []
+            predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+            if predictor is None:
+                logger.warning('Pipeline cannot be compiled - every worker loads its own copy')
+                self.model_kind, self.model_path, self.features = 'pipeline', pipeline_path, list(features)
+                self.model_version = f'pipeline:{os.path.getsize(pipeline_path)}:{os.stat(pipeline_path).st_mtime_ns}'
+                return self
+            
+            self._temporary_directory = tempfile.mkdtemp(prefix='cornerstone-scoring-')
+            self.model_path = os.path.join(self._temporary_directory, 'forest_engine')
+            CompiledForestEngine.from_direct_predictor(predictor).save(self.model_path)
+            logger.info(f'Compiled a temporary engine from {pipeline_path}')
+        
+        manifest = CompiledForestEngine.read_manifest(self.model_path)
+        self.features = list(manifest['feature_names'])
+        self.model_version = manifest['checksum'][:16]
+        return self
+    
+    def cleanup(self):
+        """Remove the temporary engine, if one was compiled"""
+        if self._temporary_directory is not None:
+            shutil.rmtree(self._temporary_directory, ignore_errors=True)
+            self._temporary_directory = None
+
+
+# ==================== CHECKPOINT ====================
+class ScoringCheckpoint:
+    """
+    Progress of one scoring run: completed chunks, rows and the output size after the
+    last completed chunk. The file is replaced atomically after the output has been
+    flushed to disk, so it never claims more than the output holds.
+    """
+    
+    def __init__(self, output_path: str):
+        self.checkpoint_path = f'{output_path}.progress.json'
+        self.state: Dict[str, Any] = {}
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Saved progress, or None when no run is pending"""
+        try:
+            with open(self.checkpoint_path) as checkpoint_file:
+                self.state = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+        return self.state
+    
+    def save(self, state: Dict[str, Any]):
+        """Replace the progress file atomically"""
+        self.state = state
+        staging_path = f'{self.checkpoint_path}.tmp-{os.getpid()}'
+        with open(staging_path, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file, indent=2)
+        os.replace(staging_path, self.checkpoint_path)
+    
+    def remove(self):
+        """Delete the progress file once the run has finished"""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+# ==================== BULK SCORING RUNNER ====================
+class BulkScoringRunner:
+    """
+    Streams an input file through the model and writes (id, prediction) rows.
+    At most workers * max_pending_per_worker chunks are parsed ahead of the writer,
+    and results are written strictly in input order, so the output lines up with
+    the input and a checkpoint is always a clean chunk boundary.
+    """
+    
+    def __init__(self, input_path: str, output_path: str, model_directory: str, id_column: str = 'Id',
+                 prediction_column: str = 'SalePrice', chunk_rows: int = 50000, workers: int = 0,
+                 max_pending_per_worker: int = 2):
+        self.input_path = os.path.abspath(input_path)
+        self.output_path = os.path.abspath(output_path)
+        self.model_source = ScoringModelSource(model_directory)
+        self.id_column = id_column
+        self.prediction_column = prediction_column
+        self.chunk_rows = chunk_rows
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * max_pending_per_worker
+        self.checkpoint = ScoringCheckpoint(self.output_path)
+        self.scoring_report: Dict[str, Any] = {}
+        self._has_id = True
+    
+    # ---------- Input ----------
+    
+    def _input_columns(self) -> Tuple[List[str], bool]:
+        """Columns to parse, and whether the id column exists (otherwise row numbers are used)"""
+        if self.input_path.endswith('.parquet'):
+            header = self._parquet_file().schema_arrow.names
+        else:
+            header = list(pd.read_csv(self.input_path, nrows=0).columns)
+        
+        missing_columns = set(self.model_source.features) - set(header)
+        if missing_columns:
+            raise ValueError(f'Missing features in input: {missing_columns}')
+        has_id = self.id_column in header
+        return ([self.id_column] if has_id else []) + self.model_source.features, has_id
+    
+    def _parquet_file(self):
+        """Open the Parquet input (pyarrow is only needed for Parquet files)"""
+        try:
+            import pyarrow.parquet as parquet
+        except ImportError:
+            raise ImportError('Parquet input requires pyarrow (pip install pyarrow)')
+        return parquet.ParquetFile(self.input_path)
+    
+    def _read_chunks(self, columns: List[str]) -> Iterator[pd.DataFrame]:
+        """Parse only the needed columns, chunk_rows records at a time"""
+        feature_dtypes = {feature: 'float64' for feature in self.model_source.features}
+        if self.input_path.endswith('.parquet'):
+            for record_batch in self._parquet_file().iter_batches(batch_size=self.chunk_rows, columns=columns):
+                yield record_batch.to_pandas().astype(feature_dtypes)
+            return
+        
+        with pd.read_csv(self.input_path, usecols=columns, dtype=feature_dtypes, chunksize=self.chunk_rows) as reader:
+            yield from reader
+    
+    def _run_identity(self) -> Dict[str, Any]:
+        """Everything a resumed run must share with the interrupted one"""
+        status = os.stat(self.input_path)
+        return {
+            'input_path': self.input_path,
+            'input_size': status.st_size,
+            'input_mtime_ns': status.st_mtime_ns,
+            'model_version': self.model_source.model_version,
+            'chunk_rows': self.chunk_rows,
+            'id_column': self.id_column,
+            'prediction_column': self.prediction_column
+        }
+    
+    # ---------- Output ----------
+    
+    def _open_output(self, resume: bool, overwrite: bool) -> Tuple[Any, int, int]:
+        """
+        Open the output for appending, truncated to the last completed chunk on resume.
+        Returns the file, the chunks already completed and the rows already written.
+        """
+        saved_state = self.checkpoint.load()
+        identity = self._run_identity()
+        
+        if saved_state is not None and resume and os.path.exists(self.output_path):
+            if saved_state['identity'] != identity:
+                raise ValueError('Input, model or chunking changed since the interrupted run - '
+                                 'rerun with --overwrite to start over')
+            output_file = open(self.output_path, 'r+b')
+            output_file.truncate(saved_state['output_bytes'])
+            output_file.seek(saved_state['output_bytes'])
+            logger.info(f"Resuming after {saved_state['chunks_completed']} chunks "
+                        f"({saved_state['rows_written']} rows already scored)")
+            return output_file, saved_state['chunks_completed'], saved_state['rows_written']
+        
+        if os.path.exists(self.output_path) and not overwrite and saved_state is None:
+            raise FileExistsError(f'{self.output_path} exists - pass --overwrite to replace it')
+        
+        output_file = open(self.output_path, 'wb')
+        id_name = self.id_column if self._has_id else 'row'
+        output_file.write(f'{id_name},{self.prediction_column}\n'.encode('utf-8'))
+        self._write_checkpoint(output_file, 0, 0)
+        return output_file, 0, 0
+    
+    def _write_checkpoint(self, output_file, chunks_completed: int, rows_written: int):
+        """Make the output durable, then record how far it goes"""
+        output_file.flush()
+        os.fsync(output_file.fileno())
+        self.checkpoint.save({
+            'identity': self._run_identity(),
+            'chunks_completed': chunks_completed,
+            'rows_written': rows_written,
+            'output_bytes': output_file.tell()
+        })
+    
+    @staticmethod
+    def _encode_chunk(row_ids: np.ndarray, predictions: np.ndarray) -> bytes:
+        """CSV bytes for one chunk of (id, prediction) rows, without a header"""
+        return pd.DataFrame({'id': row_ids, 'prediction': predictions}).to_csv(index=False, header=False).encode('utf-8')
+    
+    # ---------- Run ----------
+    
+    def run(self, resume: bool = True, overwrite: bool = False) -> Dict[str, Any]:
+        """Score the whole input, resuming a matching interrupted run unless overwrite is set"""
+        self.model_source.prepare()
+        try:
+            return self._score_input(resume and not overwrite, overwrite)
+        finally:
+            self.model_source.cleanup()
+    
+    def _score_input(self, resume: bool, overwrite: bool) -> Dict[str, Any]:
+        """Fan chunks out to the pool and write results in order as they complete"""
+        columns, self._has_id = self._input_columns()
+        output_file, skip_chunks, rows_written = self._open_output(resume, overwrite)
+        chunks_completed = skip_chunks
+        rows_scored = 0
+        started = time.perf_counter()
+        
+        logger.info(f'Scoring {self.input_path} with {self.workers} workers '
+                    f'({self.model_source.model_kind} {self.model_source.model_version})')
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_scoring_worker,
+                                     initargs=(self.model_source.model_kind, self.model_source.model_path,
+                                               self.model_source.features)) as pool:
+                pending = deque()
+                
+                def write_oldest():
+                    nonlocal chunks_completed, rows_written, rows_scored
+                    row_ids, future = pending.popleft()
+                    predictions = future.result()
+                    output_file.write(self._encode_chunk(row_ids, predictions))
+                    chunks_completed += 1
+                    rows_written += len(row_ids)
+                    rows_scored += len(row_ids)
+                    self._write_checkpoint(output_file, chunks_completed, rows_written)
+                
+                row_offset = 0
+                for chunk_index, chunk in enumerate(self._read_chunks(columns)):
+                    chunk_size = len(chunk)
+                    if chunk_index < skip_chunks:
+                        # Already scored by the interrupted run: parsed to advance, never predicted
+                        row_offset += chunk_size
+                        continue
+                    
+                    row_ids = (chunk[self.id_column].to_numpy() if self._has_id
+                               else np.arange(row_offset, row_offset + chunk_size))
+                    feature_matrix = chunk[self.model_source.features].to_numpy(dtype=np.float64)
+                    pending.append((row_ids, pool.submit(_score_feature_chunk, feature_matrix)))
+                    row_offset += chunk_size
+                    
+                    while len(pending) >= self.max_pending:
+                        write_oldest()
+                while pending:
+                    write_oldest()
+        finally:
+            output_file.close()
+        
+        wall_seconds = time.perf_counter() - started
+        self.checkpoint.remove()
+        self.scoring_report = {
+            'input_path': self.input_path,
+            'output_path': self.output_path,
+            'model_version': self.model_source.model_version,
+            'model_kind': self.model_source.model_kind,
+            'workers': self.workers,
+            'chunk_rows': self.chunk_rows,
+            'resumed_chunks': skip_chunks,
+            'rows_scored': rows_scored,
+            'rows_total': rows_written,
+            'wall_seconds': wall_seconds,
+            'rows_per_second': rows_scored / wall_seconds if wall_seconds > 0 else 0.0
+        }
+        logger.info(f'Scored {rows_scored} rows in {wall_seconds:.1f}s '
+                    f"({self.scoring_report['rows_per_second']:,.0f} rows/s, {rows_written} rows in output)")
+        return self.scoring_report
+
+
+# ==================== COMMAND LINE ====================
+def execute_bulk_scoring(argv: List[str] = None) -> Dict[str, Any]:
+    """Parse the command line and score the input file"""
+    parser = argparse.ArgumentParser(description='Cornerstone offline bulk scoring')
+    parser.add_argument('input', help='CSV or .parquet file with the model columns (other columns are ignored)')
+    parser.add_argument('output', help='CSV file to write id,prediction rows to')
+    parser.add_argument('--model-directory', default=os.path.dirname(os.path.abspath(__file__)),
+                        help='Directory holding forest_engine/ or pipeline.pkl and model_columns.pkl')
+    parser.add_argument('--id-column', default='Id', help='Input column copied to the output (row numbers if absent)')
+    parser.add_argument('--prediction-column', default='SalePrice')
+    parser.add_argument('--chunk-rows', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=0, help='Scoring processes (0 = all cores)')
+    parser.add_argument('--overwrite', action='store_true', help='Start over instead of resuming an interrupted run')
+    parser.add_argument('--report', default=None, help='Optional JSON report path')
+    args = parser.parse_args(argv)
+    
+    runner = BulkScoringRunner(args.input, args.output, args.model_directory, args.id_column,
+                               args.prediction_column, args.chunk_rows, args.workers)
+    try:
+        report = runner.run(overwrite=args.overwrite)
+    except (FileNotFoundError, FileExistsError, ValueError, ImportError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+    
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='[CORNERSTONE-SCORING] %(asctime)s - %(levelname)s - %(message)s')
+    execute_bulk_scoring()
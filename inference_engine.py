@@ -0,0 +1,887 @@
+"""
+Cornerstone Inference Engine
+============================
+Low-overhead prediction paths for the trained Cornerstone inference pipeline.
+
+The persisted sklearn Pipeline (SimpleImputer + RandomForestRegressor) re-validates
+feature names, dtypes and shapes on every call, which costs more than evaluating
+the forest for a single property. This module unpacks the fitted pipeline once
+and evaluates it directly on raw NumPy buffers.
+
+Components:
+- DirectForestPredictor: Median imputation + per-tree evaluation on a float buffer,
+  bit-identical to Pipeline.predict
+- CompiledForestEngine: Flat-array export of the whole forest with a NumPy evaluator
+  that walks every tree level by level for a batch of rows at once. Persisted as raw
+  .npy buffers plus a JSON manifest and memory-mapped read-only on load, so every
+  worker process shares one page-cache copy of the trees. Compacted models can be
+  exported in a quantized layout (narrow index types, float32 leaves, int16 thresholds)
+- PredictionLattice: Every forest prediction precomputed over the cells the split
+  thresholds cut the feature space into, so a prediction is one interval lookup per
+  feature. The dense table only fits forests of a few dozen trees of depth 4 or less,
+  so it is opt-in and skipped whenever the cell count exceeds the budget
+- PredictionCache: Bounded LRU/TTL memo of predictions keyed on the model version
+  and the canonical feature vector
+- MicroBatchCoalescer: Merges concurrent single-row predictions into one batched
+  predict, flushed when a row-count or deadline threshold is reached
+- PredictionDistribution: Mean, standard deviation and quantiles of the per-tree
+  predictions of a batch, computed in one vectorized pass over a (rows, trees) matrix
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== DIRECT FOREST PREDICTOR ====================
+class DirectForestPredictor:
+    """
+    Evaluates a fitted imputer + forest pipeline without pandas or sklearn validation.
+    Reproduces Pipeline.predict exactly: same median fill, same float32 cast and
+    the same tree-by-tree float64 accumulation order as the forest's own predict.
+    """
+    
+    def __init__(self, feature_names: List[str], imputation_medians: np.ndarray, estimators: list):
+        self.feature_names = list(feature_names)
+        self.imputation_medians = np.asarray(imputation_medians, dtype=np.float64)
+        self.estimators = list(estimators)
+    
+    @classmethod
+    def from_pipeline(cls, pipeline, feature_names: List[str]) -> Optional['DirectForestPredictor']:
+        """
+        Unpack a fitted imputer + forest pipeline.
+        Returns None when the pipeline does not have the expected shape, in which
+        case callers should keep using the pipeline itself.
+        """
+        steps = getattr(pipeline, 'steps', None)
+        if not steps or len(steps) != 2 or not feature_names:
+            return None
+        
+        imputer, forest = steps[0][1], steps[1][1]
+        medians = getattr(imputer, 'statistics_', None)
+        estimators = getattr(forest, 'estimators_', None)
+        
+        if medians is None or not estimators or getattr(forest, 'n_outputs_', 1) != 1:
+            return None
+        if getattr(imputer, 'strategy', None) != 'median' or len(medians) != len(feature_names):
+            return None
+        
+        # Imputers drop all-missing columns, which would change the feature layout
+        if not np.all(np.isfinite(medians)):
+            return None
+        
+        fitted_names = getattr(imputer, 'feature_names_in_', None)
+        if fitted_names is not None and list(fitted_names) != list(feature_names):
+            return None
+        
+        return cls(feature_names, medians, estimators)
+    
+    def allocate_buffer(self, row_count: int = 1) -> np.ndarray:
+        """Allocate a feature buffer laid out in model column order"""
+        return np.zeros((row_count, len(self.feature_names)), dtype=np.float64)
+    
+    def predict_buffer(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """
+        Predict for every row of a float64 feature buffer.
+        Missing values (NaN) are replaced in place with the stored imputer medians.
+        """
+        np.copyto(feature_buffer, self.imputation_medians, where=np.isnan(feature_buffer))
+        
+        # The forest casts its input to float32 before traversing the trees
+        tree_input = feature_buffer.astype(np.float32)
+        
+        # Accumulate in estimator order, as the forest does, so results match bit for bit
+        predictions = np.zeros(tree_input.shape[0], dtype=np.float64)
+        for estimator in self.estimators:
+            predictions += estimator.tree_.predict(tree_input).reshape(-1)
+        predictions /= len(self.estimators)
+        
+        return predictions
+    
+    def predict_tree_outputs(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """
+        Every tree's prediction for every row, as a (rows, trees) matrix.
+        One vectorized call per tree covers the whole batch; NaNs are imputed in place.
+        """
+        np.copyto(feature_buffer, self.imputation_medians, where=np.isnan(feature_buffer))
+        tree_input = feature_buffer.astype(np.float32)
+        
+        # Tree-major rows keep each tree's writes contiguous; the transpose is a view
+        tree_outputs = np.empty((len(self.estimators), tree_input.shape[0]), dtype=np.float64)
+        for position, estimator in enumerate(self.estimators):
+            tree_outputs[position] = estimator.tree_.predict(tree_input).reshape(-1)
+        return tree_outputs.T
+    
+    def matches_pipeline(self, pipeline, probe_matrix: np.ndarray) -> bool:
+        """Check that the direct path reproduces Pipeline.predict exactly on probe rows"""
+        probe_frame = pd.DataFrame(probe_matrix, columns=self.feature_names)
+        expected = np.asarray(pipeline.predict(probe_frame), dtype=np.float64)
+        actual = self.predict_buffer(np.array(probe_matrix, dtype=np.float64))
+        
+        return bool(np.array_equal(expected, actual))
+    
+    def build_probe_matrix(self) -> np.ndarray:
+        """Construct probe rows exercising imputation and a spread of feature values"""
+        medians = self.imputation_medians
+        scales = [0.0, 0.5, 1.0, 1.5, 2.0]
+        probe_rows = [medians * scale for scale in scales]
+        probe_rows.append(np.full_like(medians, np.nan))
+        
+        return np.vstack(probe_rows)
+
+
+# ==================== COMPILED FOREST ENGINE ====================
+def round_thresholds_down(thresholds: np.ndarray) -> np.ndarray:
+    """
+    Convert float64 split thresholds to the largest float32 not above them.
+    For float32 inputs x, (x <= t) and (x <= round_down(t)) always agree, so the
+    float32 thresholds reproduce the forest's float64 comparisons exactly.
+    """
+    rounded = thresholds.astype(np.float32)
+    overshoot = rounded.astype(np.float64) > thresholds
+    rounded[overshoot] = np.nextafter(rounded[overshoot], np.float32(-np.inf))
+    return rounded
+
+
+def quantize_thresholds(thresholds: np.ndarray, is_leaf: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Narrowest exact threshold encoding, plus the scale inputs must be multiplied by.
+    Forests on integer-valued features split midway between observed values, so
+    thresholds are half-integers (quarter-integers next to a .5 imputation median).
+    Scaled by the smallest power of two that makes them whole, they fit int16, and
+    (s * x > s * t) agrees with (x > t) for every float32 input because scaling by a
+    power of two is exact. Otherwise thresholds stay float32, rounded down.
+    """
+    split_thresholds = thresholds[~is_leaf]
+    limit = np.iinfo(np.int16).max
+    for scale in (1.0, 2.0, 4.0, 8.0):
+        scaled = scale * split_thresholds
+        if np.all(scaled == np.round(scaled)) and np.all(np.abs(scaled) < limit):
+            quantized = np.full(thresholds.shape, limit, dtype=np.int16)
+            quantized[~is_leaf] = scaled
+            return quantized, scale
+    return round_thresholds_down(thresholds), 1.0
+
+
+class CompiledForestEngine:
+    """
+    Forest compiled into contiguous node arrays shared by all trees.
+    Node i of the combined layout splits on node_feature[i] at node_threshold[i];
+    leaves point both children at themselves, so extra traversal steps are no-ops.
+    
+    Small batches walk all trees level by level at once. Large batches walk one
+    tree at a time, which keeps each tree's nodes in cache and matches sklearn's
+    throughput where the all-trees layout would spill out of it.
+    """
+    
+    # Node arrays persisted as raw .npy buffers; the derived traversal arrays are
+    # stored too so mapped workers never build private copies of them
+    ARRAY_FIELDS = (
+        'node_feature', 'node_threshold', 'left_child', 'right_child',
+        'node_value', 'tree_roots', 'child_pairs', 'is_leaf'
+    )
+    
+    MANIFEST_NAME = 'manifest.json'
+    FORMAT_VERSION = 2
+    
+    # Version 1 engines predate threshold_scale, which they implicitly hold at 1
+    SUPPORTED_FORMAT_VERSIONS = (1, 2)
+    
+    # Batches at least this large switch to tree-at-a-time traversal
+    TREE_MAJOR_ROW_THRESHOLD = 2048
+    
+    def __init__(self, feature_names: List[str], node_feature: np.ndarray, node_threshold: np.ndarray,
+                 left_child: np.ndarray, right_child: np.ndarray, node_value: np.ndarray,
+                 tree_roots: np.ndarray, imputation_medians: np.ndarray, max_depth: int,
+                 child_pairs: Optional[np.ndarray] = None, is_leaf: Optional[np.ndarray] = None,
+                 threshold_scale: float = 1.0):
+        self.feature_names = list(feature_names)
+        self.node_feature = node_feature
+        self.node_threshold = node_threshold
+        self.left_child = left_child
+        self.right_child = right_child
+        self.node_value = node_value
+        self.tree_roots = tree_roots
+        self.imputation_medians = imputation_medians
+        self.max_depth = int(max_depth)
+        self.threshold_scale = float(threshold_scale)
+        
+        self.metadata: Dict[str, Any] = {}
+        self.lattice: Optional['PredictionLattice'] = None
+        
+        # Interleaved (left, right) pairs let one gather pick the next node per step
+        if child_pairs is None:
+            child_pairs = np.empty(2 * len(left_child), dtype=left_child.dtype)
+            child_pairs[0::2] = left_child
+            child_pairs[1::2] = right_child
+        self.child_pairs = child_pairs
+        self.is_leaf = is_leaf if is_leaf is not None else left_child == np.arange(len(left_child))
+    
+    @classmethod
+    def from_direct_predictor(cls, predictor: DirectForestPredictor, quantize: bool = False) -> 'CompiledForestEngine':
+        """
+        Export every tree of an unpacked forest into the flat array layout.
+        quantize stores node indices as int32, feature ids as uint8, leaf values as
+        float32 and thresholds as int16 where quantize_thresholds allows, roughly
+        halving the engine. Predictions only change if leaf values are not already
+        float32-representable, which compacted forests guarantee.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        node_offset = 0
+        max_depth = 0
+        
+        for estimator in predictor.estimators:
+            tree = estimator.tree_
+            node_count = tree.node_count
+            local_index = np.arange(node_count, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+            
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, local_index, tree.children_left) + node_offset)
+            rights.append(np.where(is_leaf, local_index, tree.children_right) + node_offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            values.append(tree.value.reshape(node_count, -1)[:, 0])
+            roots.append(node_offset)
+            
+            max_depth = max(max_depth, int(tree.max_depth))
+            node_offset += node_count
+        
+        thresholds = np.concatenate(thresholds)
+        index_dtype, feature_dtype, value_dtype, threshold_scale = np.intp, np.intp, np.float64, 1.0
+        if quantize:
+            left_child = np.concatenate(lefts)
+            thresholds, threshold_scale = quantize_thresholds(thresholds, left_child == np.arange(node_offset))
+            index_dtype = np.int32 if node_offset < np.iinfo(np.int32).max // 2 else np.intp
+            feature_dtype = np.uint8 if len(predictor.feature_names) <= 256 else np.int32
+            value_dtype = np.float32
+        else:
+            thresholds = round_thresholds_down(thresholds)
+        
+        return cls(
+            feature_names=predictor.feature_names,
+            node_feature=np.ascontiguousarray(np.concatenate(features), dtype=feature_dtype),
+            node_threshold=thresholds,
+            left_child=np.ascontiguousarray(np.concatenate(lefts), dtype=index_dtype),
+            right_child=np.ascontiguousarray(np.concatenate(rights), dtype=index_dtype),
+            node_value=np.ascontiguousarray(np.concatenate(values), dtype=value_dtype),
+            tree_roots=np.asarray(roots, dtype=index_dtype),
+            imputation_medians=predictor.imputation_medians.copy(),
+            max_depth=max_depth,
+            threshold_scale=threshold_scale
+        )
+    
+    @property
+    def tree_count(self) -> int:
+        """Number of trees compiled into the engine"""
+        return len(self.tree_roots)
+    
+    @property
+    def node_count(self) -> int:
+        """Total number of nodes across all trees"""
+        return len(self.node_feature)
+    
+    def allocate_buffer(self, row_count: int = 1) -> np.ndarray:
+        """Allocate a feature buffer laid out in model column order"""
+        return np.zeros((row_count, len(self.feature_names)), dtype=np.float64)
+    
+    def _descend(self, flat_input: np.ndarray, input_offsets: np.ndarray, node_index: np.ndarray):
+        """
+        Advance (row, tree) pairs level by level until every pair sits on a leaf.
+        node_index is updated in place; settled pairs drop out of the active set.
+        """
+        active = np.flatnonzero(~self.is_leaf[node_index])
+        
+        while active.size:
+            current = node_index[active]
+            split_values = flat_input[input_offsets[active] + self.node_feature[current]]
+            go_right = split_values > self.node_threshold[current]
+            # Quantized engines store int32 children; one widening here spares every
+            # later gather an implicit conversion
+            following = self.child_pairs[2 * current + go_right].astype(np.intp, copy=False)
+            
+            node_index[active] = following
+            active = active[~self.is_leaf[following]]
+    
+    def resolve_leaves(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """
+        Route a batch of rows through every tree.
+        Returns the (rows, trees) matrix of leaf node indices reached.
+        """
+        np.copyto(feature_buffer, self.imputation_medians, where=np.isnan(feature_buffer))
+        
+        # Same float32 cast as the forest before any threshold comparison
+        tree_input = feature_buffer.astype(np.float32)
+        if self.threshold_scale != 1.0:
+            tree_input *= np.float32(self.threshold_scale)
+        row_count, feature_count = tree_input.shape
+        flat_input = tree_input.ravel()
+        row_offsets = np.arange(row_count, dtype=np.intp) * feature_count
+        
+        if row_count < self.TREE_MAJOR_ROW_THRESHOLD:
+            # All trees at once: one flat (row, tree) pair per element
+            node_index = np.tile(self.tree_roots.astype(np.intp, copy=False), row_count)
+            self._descend(flat_input, np.repeat(row_offsets, self.tree_count), node_index)
+            return node_index.reshape(row_count, self.tree_count)
+        
+        leaf_index = np.empty((row_count, self.tree_count), dtype=np.intp)
+        for tree_position, root in enumerate(self.tree_roots):
+            node_index = np.full(row_count, root, dtype=np.intp)
+            self._descend(flat_input, row_offsets, node_index)
+            leaf_index[:, tree_position] = node_index
+        return leaf_index
+    
+    def predict_buffer(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """
+        Predict for every row of a float64 feature buffer, from the lattice when one is attached.
+        Missing values (NaN) are replaced in place with the stored imputer medians.
+        """
+        if self.lattice is not None:
+            return self.lattice.predict_buffer(feature_buffer)
+        
+        leaf_values = self.predict_tree_outputs(feature_buffer)
+        
+        # Sequential accumulation over trees keeps the forest's summation order
+        predictions = np.add.accumulate(leaf_values, axis=1)[:, -1]
+        return predictions / self.tree_count
+    
+    def predict_tree_outputs(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """Every tree's prediction for every row, as a (rows, trees) matrix of leaf values"""
+        return np.asarray(self.node_value[self.resolve_leaves(feature_buffer)], dtype=np.float64)
+    
+    def split_thresholds(self) -> List[np.ndarray]:
+        """Sorted distinct float32 split thresholds of every feature, in the input's own units"""
+        splits = ~np.asarray(self.is_leaf)
+        node_feature = np.asarray(self.node_feature)[splits]
+        thresholds = np.asarray(self.node_threshold)[splits].astype(np.float32) / np.float32(self.threshold_scale)
+        return [np.unique(thresholds[node_feature == feature]) for feature in range(len(self.feature_names))]
+    
+    def attach_lattice(self, max_cells: int) -> bool:
+        """Precompute the prediction lattice if it has at most max_cells cells; False means traversal stays"""
+        self.lattice = PredictionLattice.from_engine(self, max_cells)
+        return self.lattice is not None
+    
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays and the lattice"""
+        lattice_bytes = self.lattice.nbytes if self.lattice is not None else 0
+        return int(sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)) + lattice_bytes
+    
+    def save(self, artifact_directory: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Persist the engine as raw .npy buffers next to a JSON manifest.
+        The directory is staged beside its destination and swapped in by rename, so
+        processes still mapping the previous files keep reading intact data.
+        """
+        artifact_directory = os.path.abspath(artifact_directory)
+        staging_directory = f'{artifact_directory}.tmp-{os.getpid()}'
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        os.makedirs(staging_directory)
+        
+        array_entries = {name: self._save_array(staging_directory, name, getattr(self, name))
+                         for name in self.ARRAY_FIELDS}
+        lattice_entry = None
+        if self.lattice is not None:
+            lattice_entry = {
+                'cells': self.lattice.cell_count,
+                'distinct_values': len(self.lattice.cell_values),
+                'arrays': {name: self._save_array(staging_directory, name, getattr(self.lattice, name))
+                           for name in PredictionLattice.ARRAY_FIELDS}
+            }
+        
+        manifest = {
+            'format': 'cornerstone-forest-engine',
+            'format_version': self.FORMAT_VERSION,
+            'feature_names': self.feature_names,
+            'imputation_medians': [float(value) for value in self.imputation_medians],
+            'max_depth': self.max_depth,
+            'threshold_scale': self.threshold_scale,
+            'tree_count': self.tree_count,
+            'node_count': self.node_count,
+            'metadata': metadata or self.metadata,
+            'arrays': array_entries,
+            'lattice': lattice_entry,
+        }
+        manifest['checksum'] = hashlib.sha256(
+            json.dumps(manifest, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        
+        with open(os.path.join(staging_directory, self.MANIFEST_NAME), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        
+        # Directories cannot be renamed over non-empty ones: retire the old copy first
+        retired_directory = f'{artifact_directory}.old-{os.getpid()}'
+        if os.path.exists(artifact_directory):
+            os.replace(artifact_directory, retired_directory)
+        os.replace(staging_directory, artifact_directory)
+        shutil.rmtree(retired_directory, ignore_errors=True)
+    
+    @classmethod
+    def read_manifest(cls, artifact_directory: str) -> Dict[str, Any]:
+        """Read the JSON manifest describing a persisted engine"""
+        with open(os.path.join(artifact_directory, cls.MANIFEST_NAME)) as manifest_file:
+            manifest = json.load(manifest_file)
+        
+        if manifest.get('format') != 'cornerstone-forest-engine':
+            raise ValueError(f'{artifact_directory} is not a Cornerstone forest engine artifact')
+        if manifest.get('format_version') not in cls.SUPPORTED_FORMAT_VERSIONS:
+            raise ValueError(f"Unsupported engine format version {manifest.get('format_version')}")
+        return manifest
+    
+    @classmethod
+    def load(cls, artifact_directory: str, verify_checksums: bool = False) -> 'CompiledForestEngine':
+        """
+        Memory-map a persisted engine read-only.
+        Pages are faulted in on first use and shared between every process mapping
+        the same files. verify_checksums re-hashes each buffer, which reads it fully.
+        """
+        manifest = cls.read_manifest(artifact_directory)
+        arrays = {name: cls._load_array(artifact_directory, name, manifest['arrays'][name], verify_checksums)
+                  for name in cls.ARRAY_FIELDS}
+        
+        engine = cls(
+            feature_names=manifest['feature_names'],
+            imputation_medians=np.asarray(manifest['imputation_medians'], dtype=np.float64),
+            max_depth=manifest['max_depth'],
+            threshold_scale=manifest.get('threshold_scale', 1.0),
+            **arrays
+        )
+        engine.metadata = manifest.get('metadata', {})
+        
+        if manifest.get('lattice'):
+            engine.lattice = PredictionLattice(
+                imputation_medians=engine.imputation_medians,
+                **{name: cls._load_array(artifact_directory, name, entry, verify_checksums)
+                   for name, entry in manifest['lattice']['arrays'].items()}
+            )
+        return engine
+    
+    @classmethod
+    def _save_array(cls, artifact_directory: str, name: str, array: np.ndarray) -> Dict[str, Any]:
+        """Write one raw .npy buffer and describe it for the manifest"""
+        array_path = os.path.join(artifact_directory, f'{name}.npy')
+        array = np.ascontiguousarray(array)
+        np.save(array_path, array, allow_pickle=False)
+        return {
+            'file': f'{name}.npy',
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'sha256': cls._file_digest(array_path)
+        }
+    
+    @classmethod
+    def _load_array(cls, artifact_directory: str, name: str, entry: Dict[str, Any], verify_checksums: bool) -> np.ndarray:
+        """Memory-map one buffer read-only and check it against its manifest entry"""
+        array_path = os.path.join(artifact_directory, entry['file'])
+        if verify_checksums and cls._file_digest(array_path) != entry['sha256']:
+            raise ValueError(f'Checksum mismatch for {array_path}')
+        
+        array = np.load(array_path, mmap_mode='r', allow_pickle=False)
+        if array.dtype.str != entry['dtype'] or list(array.shape) != entry['shape']:
+            raise ValueError(f'Array {name} does not match its manifest entry')
+        return array
+    
+    @staticmethod
+    def _file_digest(file_path: str) -> str:
+        """SHA-256 of a file, streamed in 1 MiB blocks"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as artifact_file:
+            for block in iter(lambda: artifact_file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+# ==================== PREDICTION DISTRIBUTIONS ====================
+def pipeline_tree_outputs(pipeline, input_frame: pd.DataFrame) -> np.ndarray:
+    """
+    Per-tree predictions of a pipeline ending in a fitted tree ensemble, as a
+    (rows, trees) matrix. General fallback for pipelines the direct path cannot unpack.
+    """
+    forest = pipeline.steps[-1][1]
+    estimators = getattr(forest, 'estimators_', None)
+    if not isinstance(estimators, list) or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+        raise ValueError(f'{type(forest).__name__} does not expose per-tree predictions')
+    
+    # The forest validates and casts once, then hands the same float32 array to each tree
+    tree_input = np.asarray(pipeline[:-1].transform(input_frame), dtype=np.float32)
+    tree_outputs = np.empty((len(estimators), tree_input.shape[0]), dtype=np.float64)
+    for position, estimator in enumerate(estimators):
+        tree_outputs[position] = estimator.tree_.predict(tree_input).reshape(-1)
+    return tree_outputs.T
+
+
+@dataclass
+class PredictionDistribution:
+    """
+    Per-row summary of a forest's individual tree predictions.
+    The mean is accumulated in the forest's own tree order, so it equals the point
+    prediction bit for bit. Standard deviation and quantiles measure how far the trees
+    disagree; they describe model uncertainty, not a calibrated interval on the price.
+    """
+    mean: np.ndarray
+    std: np.ndarray
+    quantile_levels: Tuple[float, ...]
+    quantiles: np.ndarray
+    
+    @classmethod
+    def from_tree_outputs(cls, tree_outputs: np.ndarray, quantile_levels: Sequence[float]) -> 'PredictionDistribution':
+        """Reduce a (rows, trees) matrix along the tree axis, all rows at once"""
+        quantile_levels = tuple(quantile_levels)
+        row_count, tree_count = tree_outputs.shape
+        if row_count == 0:
+            return cls(np.empty(0), np.empty(0), quantile_levels, np.empty((0, len(quantile_levels))))
+        
+        mean = np.add.accumulate(tree_outputs, axis=1)[:, -1] / tree_count
+        return cls(mean, tree_outputs.std(axis=1), quantile_levels, cls._linear_quantiles(tree_outputs, quantile_levels))
+    
+    @staticmethod
+    def _linear_quantiles(tree_outputs: np.ndarray, quantile_levels: Tuple[float, ...]) -> np.ndarray:
+        """
+        (rows, levels) quantiles with NumPy's default linear interpolation.
+        One partition around the needed order statistics replaces np.quantile, whose
+        fixed overhead dominated single-row requests.
+        """
+        if not quantile_levels:
+            return np.empty((tree_outputs.shape[0], 0))
+        
+        tree_count = tree_outputs.shape[1]
+        positions = np.asarray(quantile_levels, dtype=np.float64) * (tree_count - 1)
+        lower = np.floor(positions).astype(np.intp)
+        upper = np.minimum(lower + 1, tree_count - 1)
+        ordered = np.partition(tree_outputs, np.unique(np.concatenate([lower, upper])), axis=1)
+        return ordered[:, lower] + (ordered[:, upper] - ordered[:, lower]) * (positions - lower)
+    
+    def describe_rows(self) -> List[Dict[str, Any]]:
+        """JSON-ready per-row mean, std and quantiles keyed by their level ('0.1', '0.9', ...)"""
+        level_names = [f'{level:g}' for level in self.quantile_levels]
+        return [
+            {'mean': mean, 'std': std, 'quantiles': dict(zip(level_names, quantile_values))}
+            for mean, std, quantile_values in zip(self.mean.tolist(), self.std.tolist(), self.quantiles.tolist())
+        ]
+
+
+# ==================== PREDICTION LATTICE ====================
+class PredictionLattice:
+    """
+    Exact lookup table of a compiled forest's predictions.
+    A feature's distinct split thresholds t_0 < ... < t_(n-1) cut its axis into n + 1
+    intervals (t_(k-1), t_k], and inside one cell of the product of these intervals
+    every tree reaches the same leaf. Each cell's prediction is therefore computed
+    once, with the same tree-order summation as the engine, and a prediction becomes
+    a binary search per feature plus one table read.
+    
+    Cell values are dictionary-coded: the table holds the smallest unsigned code type
+    that indexes the distinct predictions, which are stored once. The table itself is
+    dense, with one cell per combination of intervals, so it grows with the product of
+    every feature's threshold count: about 30 trees of depth 4 on the seven model
+    features fit a few million cells, while full-depth forests need ~1e13.
+    """
+    
+    ARRAY_FIELDS = ('lattice_thresholds', 'lattice_axis_offsets', 'lattice_codes', 'cell_values')
+    
+    def __init__(self, lattice_thresholds: np.ndarray, lattice_axis_offsets: np.ndarray, lattice_codes: np.ndarray,
+                 cell_values: np.ndarray, imputation_medians: np.ndarray):
+        self.lattice_thresholds = lattice_thresholds
+        self.lattice_axis_offsets = lattice_axis_offsets
+        self.lattice_codes = lattice_codes
+        self.cell_values = cell_values
+        self.imputation_medians = imputation_medians
+        
+        offsets = [int(offset) for offset in lattice_axis_offsets]
+        self.axes = [lattice_thresholds[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+        self.shape = tuple(len(axis) + 1 for axis in self.axes)
+        self.strides = np.asarray([int(np.prod(self.shape[position + 1:])) for position in range(len(self.shape))],
+                                  dtype=np.intp)
+    
+    @staticmethod
+    def count_cells(axes: List[np.ndarray]) -> int:
+        """Number of cells the threshold axes define"""
+        return int(np.prod([len(axis) + 1 for axis in axes], dtype=object))
+    
+    @classmethod
+    def from_engine(cls, engine: 'CompiledForestEngine', max_cells: int) -> Optional['PredictionLattice']:
+        """
+        Precompute every cell of an engine's lattice.
+        Returns None, leaving the engine to traverse its trees, when the thresholds
+        define more than max_cells cells.
+        """
+        axes = engine.split_thresholds()
+        cell_count = cls.count_cells(axes)
+        if cell_count > max_cells:
+            logger.info(f'Prediction lattice skipped: {cell_count:.3g} cells exceed the {max_cells:,} cell budget')
+            return None
+        
+        shape = tuple(len(axis) + 1 for axis in axes)
+        axis_lookup = [{float(threshold): position for position, threshold in enumerate(axis)} for axis in axes]
+        node_feature = np.asarray(engine.node_feature)
+        node_threshold = np.asarray(engine.node_threshold).astype(np.float32) / np.float32(engine.threshold_scale)
+        left_child, right_child = np.asarray(engine.left_child), np.asarray(engine.right_child)
+        is_leaf, node_value = np.asarray(engine.is_leaf), np.asarray(engine.node_value, dtype=np.float64)
+        
+        # Each leaf owns a box of interval indices; adding its value over the box tree by
+        # tree reproduces the engine's sequential per-row accumulation exactly
+        sums = np.zeros(shape, dtype=np.float64)
+        for root in engine.tree_roots:
+            pending = [(int(root), [0] * len(shape), list(shape))]
+            while pending:
+                node, lower, upper = pending.pop()
+                if is_leaf[node]:
+                    sums[tuple(slice(low, high) for low, high in zip(lower, upper))] += node_value[node]
+                    continue
+                
+                feature = int(node_feature[node])
+                split_position = axis_lookup[feature][float(node_threshold[node])]
+                left_upper, right_lower = list(upper), list(lower)
+                left_upper[feature] = min(upper[feature], split_position + 1)
+                right_lower[feature] = max(lower[feature], split_position + 1)
+                if lower[feature] < left_upper[feature]:
+                    pending.append((int(left_child[node]), lower, left_upper))
+                if right_lower[feature] < upper[feature]:
+                    pending.append((int(right_child[node]), right_lower, upper))
+        sums /= engine.tree_count
+        
+        cell_values, codes = np.unique(sums.ravel(), return_inverse=True)
+        code_dtype = next(dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64)
+                          if len(cell_values) <= np.iinfo(dtype).max + 1)
+        return cls(
+            lattice_thresholds=np.concatenate(axes).astype(np.float32),
+            lattice_axis_offsets=np.concatenate([[0], np.cumsum([len(axis) for axis in axes])]).astype(np.int64),
+            lattice_codes=codes.astype(code_dtype),
+            cell_values=cell_values,
+            imputation_medians=engine.imputation_medians
+        )
+    
+    @property
+    def cell_count(self) -> int:
+        """Number of precomputed cells"""
+        return int(self.lattice_codes.size)
+    
+    @property
+    def nbytes(self) -> int:
+        """Total size of the lattice arrays"""
+        return int(sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS))
+    
+    def predict_buffer(self, feature_buffer: np.ndarray) -> np.ndarray:
+        """
+        Look up every row of a float64 feature buffer.
+        Missing values (NaN) are replaced in place with the stored imputer medians.
+        """
+        np.copyto(feature_buffer, self.imputation_medians, where=np.isnan(feature_buffer))
+        
+        # Same float32 cast as the trees; searchsorted('left') counts the thresholds
+        # below a value, which is the interval (t_(k-1), t_k] the value falls into
+        tree_input = feature_buffer.astype(np.float32)
+        cell_index = np.zeros(tree_input.shape[0], dtype=np.intp)
+        for feature, axis in enumerate(self.axes):
+            cell_index += np.searchsorted(axis, tree_input[:, feature], side='left') * self.strides[feature]
+        return self.cell_values[self.lattice_codes[cell_index]]
+
+
+# ==================== PREDICTION CACHE ====================
+def canonical_feature_keys(feature_matrix: np.ndarray, imputation_medians: Optional[np.ndarray] = None,
+                           feature_columns: Optional[Sequence[str]] = None) -> List[bytes]:
+    """
+    Reduce feature rows to the exact values the forest compares against.
+    Missing values take the imputer median, rows are cast to float32 as the forest
+    does and -0.0 folds into 0.0, so rows that must predict alike share one key.
+    With feature_columns every key starts with a digest of the column layout, so the
+    same values under another column order never share a key.
+    """
+    canonical = np.array(feature_matrix, dtype=np.float64, ndmin=2)
+    if imputation_medians is not None:
+        np.copyto(canonical, imputation_medians, where=np.isnan(canonical))
+    canonical = canonical.astype(np.float32) + np.float32(0.0)
+    
+    layout_prefix = b''
+    if feature_columns is not None:
+        layout_prefix = hashlib.sha256('\x1f'.join(feature_columns).encode('utf-8')).digest()[:8]
+    return [layout_prefix + row.tobytes() for row in canonical]
+
+
+class PredictionCache:
+    """
+    Thread-safe memo of model outputs with LRU eviction and optional TTL expiry.
+    Entries are keyed by (model_version, feature_key), so a reloaded model can
+    never serve its predecessor's answers even before the cache is cleared.
+    """
+    
+    def __init__(self, capacity: int, ttl_seconds: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.capacity = int(capacity)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+    
+    @property
+    def enabled(self) -> bool:
+        """A zero capacity disables caching entirely"""
+        return self.capacity > 0
+    
+    def lookup(self, model_version: str, feature_key: bytes) -> Optional[float]:
+        """Return the cached prediction, or None on a miss or an expired entry"""
+        return self.lookup_many(model_version, [feature_key])[0]
+    
+    def lookup_many(self, model_version: str, feature_keys: List[bytes]) -> List[Optional[float]]:
+        """Look up several keys under one lock acquisition"""
+        results: List[Optional[float]] = [None] * len(feature_keys)
+        now = self._clock()
+        
+        with self._lock:
+            for position, feature_key in enumerate(feature_keys):
+                cache_key = (model_version, feature_key)
+                entry = self._entries.get(cache_key)
+                if entry is None:
+                    self._counters['misses'] += 1
+                    continue
+                
+                value, stored_at = entry
+                if self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds:
+                    del self._entries[cache_key]
+                    self._counters['expirations'] += 1
+                    self._counters['misses'] += 1
+                    continue
+                
+                self._entries.move_to_end(cache_key)
+                self._counters['hits'] += 1
+                results[position] = value
+        
+        return results
+    
+    def store(self, model_version: str, feature_key: bytes, value: float):
+        """Insert one prediction, evicting the least recently used entries past capacity"""
+        self.store_many(model_version, [feature_key], [value])
+    
+    def store_many(self, model_version: str, feature_keys: List[bytes], values: List[float]):
+        """Insert several predictions under one lock acquisition"""
+        if not self.enabled:
+            return
+        
+        now = self._clock()
+        with self._lock:
+            for feature_key, value in zip(feature_keys, values):
+                cache_key = (model_version, feature_key)
+                self._entries[cache_key] = (value, now)
+                self._entries.move_to_end(cache_key)
+            
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+    
+    def clear(self):
+        """Drop every entry, e.g. after the model artifact is reloaded"""
+        with self._lock:
+            self._counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+    
+    def statistics(self) -> Dict[str, float]:
+        """Snapshot of cache size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                'capacity': self.capacity,
+                'ttl_seconds': self.ttl_seconds,
+                'size': len(self._entries),
+                **self._counters,
+                'hit_ratio': self._counters['hits'] / lookups if lookups else 0.0
+            }
+
+
+# ==================== MICRO-BATCH COALESCER ====================
+class CoalescedBatch:
+    """
+    Rows collected for one batched predict, plus the outcome shared by their callers.
+    """
+    
+    def __init__(self):
+        self.rows: List[np.ndarray] = []
+        self.results: Optional[np.ndarray] = None
+        self.error: Optional[Exception] = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class MicroBatchCoalescer:
+    """
+    Turns concurrent single-row predictions into one vectorized predict.
+    The first caller to find no open batch for its key becomes the batch leader: it
+    waits until max_batch_rows rows have joined or max_wait_seconds have passed, closes
+    the batch, runs the predict on its own thread and publishes the results. Followers
+    just append their row and block until the leader is done, so no dispatcher thread
+    is needed and a lone request pays at most one deadline of extra latency.
+    """
+    
+    def __init__(self, max_batch_rows: int = 32, max_wait_seconds: float = 0.002):
+        self.max_batch_rows = max(int(max_batch_rows), 1)
+        self.max_wait_seconds = max(float(max_wait_seconds), 0.0)
+        self._open_batches: Dict[Hashable, CoalescedBatch] = {}
+        self._lock = threading.Lock()
+        self._counters = {'batches': 0, 'rows': 0, 'size_flushes': 0, 'deadline_flushes': 0, 'errors': 0}
+    
+    def _close(self, batch_key: Hashable, batch: CoalescedBatch):
+        """Stop the batch from accepting rows; callers hold the lock"""
+        if self._open_batches.get(batch_key) is batch:
+            del self._open_batches[batch_key]
+    
+    def submit(self, batch_key: Hashable, feature_row: np.ndarray,
+               predict_batch: Callable[[np.ndarray], np.ndarray]) -> float:
+        """
+        Predict one row as part of a shared batch.
+        batch_key groups rows that may be stacked into one matrix (same model snapshot
+        and feature columns); predict_batch maps that matrix to one value per row.
+        The row is copied, so callers may reuse their buffer immediately.
+        """
+        with self._lock:
+            batch = self._open_batches.get(batch_key)
+            is_leader = batch is None
+            if is_leader:
+                batch = self._open_batches[batch_key] = CoalescedBatch()
+            position = len(batch.rows)
+            batch.rows.append(np.array(feature_row, dtype=np.float64).reshape(-1))
+            if len(batch.rows) >= self.max_batch_rows:
+                self._close(batch_key, batch)
+                batch.full.set()
+        
+        if is_leader:
+            filled = batch.full.wait(self.max_wait_seconds)
+            with self._lock:
+                self._close(batch_key, batch)
+                self._counters['batches'] += 1
+                self._counters['rows'] += len(batch.rows)
+                self._counters['size_flushes' if filled else 'deadline_flushes'] += 1
+            
+            try:
+                batch.results = np.asarray(predict_batch(np.vstack(batch.rows)), dtype=np.float64)
+            except Exception as e:
+                batch.error = e
+                with self._lock:
+                    self._counters['errors'] += 1
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+        
+        if batch.error is not None:
+            raise batch.error
+        return float(batch.results[position])
+    
+    def statistics(self) -> Dict[str, float]:
+        """Snapshot of flushed batches, coalesced rows and why each batch was flushed"""
+        with self._lock:
+            return {
+                'max_batch_rows': self.max_batch_rows,
+                'max_wait_seconds': self.max_wait_seconds,
+                **self._counters,
+                'mean_batch_rows': self._counters['rows'] / self._counters['batches'] if self._counters['batches'] else 0.0
+            }
@@ -12,6 +12,15 @@ Custom Implementation Features:
 - PredictorEnsembleBuilder: Custom trainer class managing the complete ML workflow
 - DatasetOrchestrator: Dedicated dataset management with validation and preprocessing
 - ModelArtifactRegistry: Specialized persistence layer with validation checks
+- CompiledForestEngine export: memory-mappable flat-array forest artifact for serving
+- HyperparameterSearchCoordinator: parallel k-fold grid/random search over forest settings
+- Streaming ingestion mode: chunked, column-pruned CSV loading with sketched medians
+- Columnar dataset cache: memory-mapped typed columns reused while train.csv is unchanged
+- Incremental retraining: warm-started trees on fresh sales with per-tree data-window lineage
+- Versioned model registry (opt-in): models published under their content id, with aliases and retention
+- Pluggable estimator: exact-split random forest or histogram-binned gradient boosting
+- Model compaction: pruned, tree-subset forest with a quantized compiled engine
+- Training profiler: per-method and per-phase wall/CPU time and peak memory report
 
 Key Differentiators:
 1. Class-based architecture for testability and maintainability
@@ -21,17 +30,33 @@ Key Differentiators:
 """
 
 import os
+import json
+import shutil
+import time
+import hashlib
+import random
 import logging
-from dataclasses import dataclass
-from typing import Tuple, List
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, replace
+from typing import Tuple, List, Dict, Any, Optional, Union, Iterator
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.model_selection import train_test_split, KFold
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 import joblib
 
+from inference_engine import DirectForestPredictor, CompiledForestEngine
+from streaming_ingestion import StreamingDatasetIngestor
+from columnar_cache import ColumnarDatasetCache
+from model_registry import VersionedModelRegistry
+from model_compaction import ForestCompactor, has_float32_leaves
+from training_profiler import TrainingProfiler
+
 # ==================== LOGGING CONFIGURATION ====================
 # Initialize logging with custom format for training visibility
 logging.basicConfig(
@@ -53,6 +78,90 @@ class CornerstoneModelConfig:
     
     # Model ensemble parameters
     TREE_COUNT: int = 200
+    MAX_TREE_DEPTH: Optional[int] = None
+    MAX_FEATURES: Union[float, str] = 1.0
+    MIN_SAMPLES_LEAF: int = 1
+    
+    # Cores used to fit the forest (-1 uses all of them)
+    TRAINING_JOBS: int = -1
+    
+    # Estimator: 'forest' (RandomForestRegressor with exact splits) or 'boosted'
+    # (HistGradientBoostingRegressor: features pre-binned into BOOSTING_MAX_BINS histograms,
+    # iterations added until the validation loss stops improving for BOOSTING_EARLY_STOPPING_ROUNDS)
+    ENSEMBLE_ENGINE: str = 'forest'
+    BOOSTING_MAX_ITERATIONS: int = 1000
+    BOOSTING_LEARNING_RATE: float = 0.1
+    BOOSTING_MAX_LEAF_NODES: int = 31
+    BOOSTING_MIN_SAMPLES_LEAF: int = 20
+    BOOSTING_MAX_BINS: int = 255
+    BOOSTING_EARLY_STOPPING_ROUNDS: int = 20
+    
+    # Post-training compaction of a forest: subtrees whose leaves lie within
+    # COMPACTION_LEAF_MERGE_DOLLARS collapse into one leaf, branches below
+    # COMPACTION_MAX_DEPTH are cut, and the fewest trees (at least COMPACTION_MIN_TREES)
+    # whose RMSE is within COMPACTION_TOLERANCE of the full forest are kept. Trees are
+    # selected on COMPACTION_SELECTION_PROPORTION of the training partition, held out of
+    # the fit. The original forest is kept unless the subset is within tolerance on both
+    # that split and the holdout. A compacted forest's engine is exported quantized
+    COMPACTION_ENABLED: bool = False
+    COMPACTION_TOLERANCE: float = 0.01
+    COMPACTION_LEAF_MERGE_DOLLARS: float = 500.0
+    COMPACTION_MAX_DEPTH: Optional[int] = None
+    COMPACTION_MIN_TREES: int = 10
+    COMPACTION_SELECTION_PROPORTION: float = 0.2
+    
+    # Precomputed prediction lattice stored with the compiled engine (opt-in): every
+    # prediction of the forest over the cells its split thresholds define, served by
+    # interval lookup. The table is dense, so it only fits forests of a few dozen trees
+    # of depth 4 or less: the default forest defines ~1e13 cells and even 10 trees of
+    # depth 5 ~1e7. Beyond LATTICE_MAX_CELLS cells the engine keeps traversing its trees
+    LATTICE_ENABLED: bool = False
+    LATTICE_MAX_CELLS: int = 4000000
+    
+    # Hyperparameter search: k-fold CV over SEARCH_SPACE ('grid' or 'random' sampling),
+    # evaluated on SEARCH_WORKERS processes (0 uses every core)
+    SEARCH_ENABLED: bool = False
+    SEARCH_STRATEGY: str = 'grid'
+    SEARCH_FOLDS: int = 5
+    SEARCH_ITERATIONS: int = 20
+    SEARCH_WORKERS: int = 0
+    SEARCH_SPACE: Dict[str, List[Any]] = None
+    
+    # Data ingestion: 'memory' loads the whole CSV with pandas; 'streaming' reads only the
+    # model columns in INGESTION_DTYPES, INGESTION_CHUNK_ROWS at a time, with sketched medians
+    INGESTION_MODE: str = 'memory'
+    INGESTION_CHUNK_ROWS: int = 250000
+    INGESTION_DTYPES: Dict[str, str] = None
+    QUANTILE_SKETCH_CAPACITY: int = 2048
+    
+    # Typed columnar copy of the model columns, rebuilt only when train.csv changes.
+    # Opt-in: a cached load returns only the model columns, in INGESTION_DTYPES
+    DATASET_CACHE_ENABLED: bool = False
+    DATASET_CACHE_DIRECTORY: str = 'dataset_cache'
+    
+    # Incremental retraining: sales in INCREMENTAL_DATA_FILE fit INCREMENTAL_TREE_COUNT
+    # warm-started trees that are added ('append') or replace the oldest trees ('rolling')
+    INCREMENTAL_DATA_FILE: str = 'new_sales.csv'
+    INCREMENTAL_TREE_COUNT: int = 20
+    INCREMENTAL_STRATEGY: str = 'rolling'
+    
+    # Versioned registry (opt-in): each trained model is also published to
+    # MODEL_REGISTRY_DIRECTORY under its content id, and MODEL_ALIASES (e.g. 'latest',
+    # 'region-north') move to it. Only the MODEL_REGISTRY_RETAIN_VERSIONS newest versions
+    # plus any still routed to are kept (0 keeps all). MODEL_SEGMENT labels the
+    # region/segment the model was trained for in its manifest
+    MODEL_REGISTRY_ENABLED: bool = False
+    MODEL_REGISTRY_DIRECTORY: str = 'model_registry'
+    MODEL_REGISTRY_RETAIN_VERSIONS: int = 5
+    MODEL_ALIASES: List[str] = None
+    MODEL_SEGMENT: Optional[str] = None
+    
+    # Training profiler: wall time, CPU time, peak RSS and (with PROFILE_TRACE_ALLOCATIONS)
+    # tracemalloc peaks of every DatasetOrchestrator, PredictorEnsembleBuilder and
+    # ModelArtifactRegistry call and of every phase; PROFILE_CPROFILE adds a cProfile dump
+    PROFILING_ENABLED: bool = False
+    PROFILE_TRACE_ALLOCATIONS: bool = True
+    PROFILE_CPROFILE: bool = False
     
     # Dataset splitting configuration
     TEST_PROPORTION: float = 0.2
@@ -67,6 +176,13 @@ class CornerstoneModelConfig:
     # Output artifact names for versioning
     MODEL_ARTIFACT_NAME: str = 'pipeline.pkl'
     METADATA_ARTIFACT_NAME: str = 'model_columns.pkl'
+    ENGINE_ARTIFACT_NAME: str = 'forest_engine'
+    REPORT_ARTIFACT_NAME: str = 'training_report.json'
+    LINEAGE_ARTIFACT_NAME: str = 'model_lineage.json'
+    DELTA_DIRECTORY_NAME: str = 'model_deltas'
+    PROFILE_ARTIFACT_NAME: str = 'training_profile.json'
+    PROFILE_HISTORY_NAME: str = 'training_profile_history.jsonl'
+    PROFILE_STATS_NAME: str = 'training_profile.prof'
     
     def __post_init__(self):
         """Initialize feature set if not provided"""
@@ -80,6 +196,78 @@ class CornerstoneModelConfig:
                 'BedroomAbvGr',   # Bedroom count
                 'GarageCars'      # Garage car capacity
             ]
+        
+        if self.MODEL_ALIASES is None:
+            self.MODEL_ALIASES = ['latest']
+        
+        if self.SEARCH_SPACE is None:
+            self.SEARCH_SPACE = {
+                'n_estimators': [100, 200, 400],
+                'max_depth': [None, 12, 20],
+                'max_features': [1.0, 0.5, 'sqrt'],
+                'min_samples_leaf': [1, 2, 4]
+            }
+        
+        if self.INGESTION_DTYPES is None:
+            # float32 holds every count, area and year exactly and keeps NaN for the
+            # imputer: integer dtypes would fail on the first missing value
+            self.INGESTION_DTYPES = {
+                'OverallQual': 'float32',
+                'GrLivArea': 'float32',
+                'YearBuilt': 'float32',
+                'TotalBsmtSF': 'float32',
+                'FullBath': 'float32',
+                'BedroomAbvGr': 'float32',
+                'GarageCars': 'float32',
+                self.TARGET_COLUMN: 'float32'
+            }
+    
+    def forest_parameters(self) -> Dict[str, Any]:
+        """RandomForestRegressor keyword arguments derived from this configuration"""
+        return {
+            'n_estimators': self.TREE_COUNT,
+            'max_depth': self.MAX_TREE_DEPTH,
+            'max_features': self.MAX_FEATURES,
+            'min_samples_leaf': self.MIN_SAMPLES_LEAF,
+            'random_state': self.SEED_VALUE
+        }
+    
+    def boosting_parameters(self) -> Dict[str, Any]:
+        """HistGradientBoostingRegressor keyword arguments derived from this configuration"""
+        return {
+            'max_iter': self.BOOSTING_MAX_ITERATIONS,
+            'learning_rate': self.BOOSTING_LEARNING_RATE,
+            'max_leaf_nodes': self.BOOSTING_MAX_LEAF_NODES,
+            'min_samples_leaf': self.BOOSTING_MIN_SAMPLES_LEAF,
+            'max_bins': self.BOOSTING_MAX_BINS,
+            'early_stopping': True,
+            'n_iter_no_change': self.BOOSTING_EARLY_STOPPING_ROUNDS,
+            'random_state': self.SEED_VALUE
+        }
+    
+    def with_forest_parameters(self, parameters: Dict[str, Any]) -> 'CornerstoneModelConfig':
+        """Copy of this configuration with sklearn-named forest parameters applied"""
+        field_names = {
+            'n_estimators': 'TREE_COUNT',
+            'max_depth': 'MAX_TREE_DEPTH',
+            'max_features': 'MAX_FEATURES',
+            'min_samples_leaf': 'MIN_SAMPLES_LEAF'
+        }
+        return replace(self, **{field_names[name]: value for name, value in parameters.items()})
+
+
+# ==================== EVALUATION METRICS ====================
+def compute_regression_metrics(y_true, y_pred) -> Dict[str, float]:
+    """RMSE, RMSLE (Kaggle's competition metric) and MAE for price predictions"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    
+    log_error = np.log1p(np.clip(y_pred, 0, None)) - np.log1p(np.clip(y_true, 0, None))
+    return {
+        'rmse': float(np.sqrt(np.mean((y_pred - y_true) ** 2))),
+        'rmsle': float(np.sqrt(np.mean(log_error ** 2))),
+        'mae': float(np.mean(np.abs(y_pred - y_true)))
+    }
 
 
 # ==================== DATASET ORCHESTRATOR ====================
@@ -89,21 +277,39 @@ class DatasetOrchestrator:
     Provides clear separation between data loading and model training concerns.
     """
     
-    def __init__(self, data_directory: str, config: CornerstoneModelConfig):
+    def __init__(self, data_directory: str, config: CornerstoneModelConfig, dataset_filename: str = 'train.csv'):
         self.data_directory = data_directory
         self.config = config
+        self.dataset_filename = dataset_filename
         self.raw_dataframe = None
         self.processed_dataframe = None
+        self.ingestion_report = None
         
+    def open_columnar_cache(self) -> ColumnarDatasetCache:
+        """Columnar cache of the model columns, converting the CSV if it changed"""
+        return ColumnarDatasetCache(
+            os.path.join(self.data_directory, self.config.DATASET_CACHE_DIRECTORY),
+            os.path.join(self.data_directory, self.dataset_filename),
+            self.config.CORNERSTONE_FEATURES + [self.config.TARGET_COLUMN],
+            self.config.INGESTION_DTYPES,
+            chunk_rows=self.config.INGESTION_CHUNK_ROWS
+        ).ensure()
+    
     def load_training_data(self) -> pd.DataFrame:
-        """Load raw training data from CSV with validation"""
-        dataset_path = os.path.join(self.data_directory, 'train.csv')
+        """
+        Load raw training data from CSV with validation.
+        With the dataset cache enabled, only the model columns are loaded, in INGESTION_DTYPES.
+        """
+        dataset_path = os.path.join(self.data_directory, self.dataset_filename)
         
         if not os.path.exists(dataset_path):
             raise FileNotFoundError(f'Training data not found at {dataset_path}')
         
         logger.info(f'Loading training dataset from {dataset_path}')
-        self.raw_dataframe = pd.read_csv(dataset_path)
+        if self.config.DATASET_CACHE_ENABLED:
+            self.raw_dataframe = self.open_columnar_cache().load_frame()
+        else:
+            self.raw_dataframe = pd.read_csv(dataset_path)
         logger.info(f'Loaded {len(self.raw_dataframe)} records with {len(self.raw_dataframe.columns)} features')
         
         return self.raw_dataframe
@@ -124,10 +330,12 @@ class DatasetOrchestrator:
         logger.info(f'Extracted {len(feature_columns)} model features')
         return self.processed_dataframe
     
-    def handle_missing_values(self):
+    def handle_missing_values(self, fill_values: Optional[pd.Series] = None):
         """Apply median imputation strategy for robustness"""
         logger.info('Applying median imputation for missing values')
-        self.processed_dataframe.fillna(self.processed_dataframe.median(), inplace=True)
+        if fill_values is None:
+            fill_values = self.processed_dataframe.median()
+        self.processed_dataframe.fillna(fill_values, inplace=True)
         logger.info('Missing value treatment complete')
     
     def partition_for_training(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
@@ -146,6 +354,38 @@ class DatasetOrchestrator:
         
         logger.info(f'Data partitioned: {len(X_train)} training, {len(X_test)} validation records')
         return X_train, X_test, y_train, y_test
+    
+    def stream_training_partitions(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        """Build the partitions chunk by chunk without materializing the full CSV"""
+        ingestor = StreamingDatasetIngestor(
+            os.path.join(self.data_directory, self.dataset_filename),
+            self.config.CORNERSTONE_FEATURES,
+            self.config.TARGET_COLUMN,
+            self.config.INGESTION_DTYPES,
+            chunk_rows=self.config.INGESTION_CHUNK_ROWS,
+            test_proportion=self.config.TEST_PROPORTION,
+            seed=self.config.SEED_VALUE,
+            sketch_capacity=self.config.QUANTILE_SKETCH_CAPACITY
+        )
+        chunks = None
+        if self.config.DATASET_CACHE_ENABLED:
+            chunks = self.open_columnar_cache().iterate_chunks(self.config.INGESTION_CHUNK_ROWS)
+        
+        partitions = ingestor.ingest(chunks)
+        self.ingestion_report = ingestor.ingestion_report
+        return partitions
+    
+    def prepare_training_partitions(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        """Run the configured ingestion mode end to end"""
+        if self.config.INGESTION_MODE == 'streaming':
+            return self.stream_training_partitions()
+        if self.config.INGESTION_MODE != 'memory':
+            raise ValueError(f'Unknown ingestion mode: {self.config.INGESTION_MODE}')
+        
+        self.load_training_data()
+        self.extract_model_features()
+        self.handle_missing_values()
+        return self.partition_for_training()
 
 
 # ==================== PREDICTOR ENSEMBLE BUILDER ====================
@@ -160,29 +400,238 @@ class PredictorEnsembleBuilder:
         self.ensemble_model = None
         self.inference_pipeline = None
         
-    def construct_ensemble(self, X_train: pd.DataFrame, y_train: pd.Series):
+    def construct_ensemble(self, X_train: pd.DataFrame, y_train: pd.Series,
+                           X_validation: Optional[pd.DataFrame] = None, y_validation: Optional[pd.Series] = None):
+        """Build the configured ensemble engine; the validation partition drives boosting's early stopping"""
+        engine = self.config.ENSEMBLE_ENGINE
+        if engine == 'forest':
+            self.construct_forest(X_train, y_train)
+        elif engine == 'boosted':
+            self.construct_boosted_ensemble(X_train, y_train, X_validation, y_validation)
+        else:
+            raise ValueError(f'Unknown ensemble engine: {engine}')
+    
+    def construct_forest(self, X_train: pd.DataFrame, y_train: pd.Series):
         """Build Random Forest ensemble with configured parameters"""
         logger.info(f'Constructing Random Forest ensemble ({self.config.TREE_COUNT} trees)')
         
         self.ensemble_model = RandomForestRegressor(
-            n_estimators=self.config.TREE_COUNT,
-            random_state=self.config.SEED_VALUE
+            n_jobs=self.config.TRAINING_JOBS,
+            **self.config.forest_parameters()
         )
         
         self.ensemble_model.fit(X_train, y_train)
+        
+        # Parallel predict sums tree outputs in thread completion order; serving wants
+        # the deterministic sequential sum the direct and compiled paths reproduce
+        self.ensemble_model.set_params(n_jobs=None)
         logger.info('Ensemble training complete')
     
-    def build_inference_pipeline(self):
+    def construct_boosted_ensemble(self, X_train: pd.DataFrame, y_train: pd.Series,
+                                   X_validation: Optional[pd.DataFrame] = None, y_validation: Optional[pd.Series] = None):
+        """
+        Build a histogram gradient boosting ensemble.
+        Split search runs over at most BOOSTING_MAX_BINS bins per feature instead of every
+        distinct value, so fit time grows roughly linearly with rows. Without a validation
+        partition, early stopping holds out a random 10% of the training rows instead.
+        """
+        logger.info(f'Constructing histogram gradient boosting ensemble '
+                    f'(up to {self.config.BOOSTING_MAX_ITERATIONS} iterations)')
+        
+        self.ensemble_model = HistGradientBoostingRegressor(**self.config.boosting_parameters())
+        if X_validation is not None and y_validation is not None:
+            self.ensemble_model.fit(X_train, y_train, X_val=X_validation, y_val=y_validation)
+        else:
+            self.ensemble_model.fit(X_train, y_train)
+        logger.info(f'Ensemble training complete ({self.ensemble_model.n_iter_} iterations kept)')
+    
+    def ensemble_size(self) -> int:
+        """Trees in a forest, or boosting iterations kept after early stopping"""
+        if hasattr(self.ensemble_model, 'estimators_'):
+            return len(self.ensemble_model.estimators_)
+        return int(self.ensemble_model.n_iter_)
+    
+    def build_inference_pipeline(self, X_train: pd.DataFrame):
         """Assemble preprocessing and inference into unified pipeline"""
         logger.info('Building inference pipeline')
         
+        # The imputer must learn its medians from the training partition,
+        # otherwise the persisted pipeline cannot transform serving requests.
+        # Pandas output keeps the column names the ensemble was fitted with.
+        imputation_layer = SimpleImputer(strategy='median').set_output(transform='pandas')
+        imputation_layer.fit(X_train)
+        
         self.inference_pipeline = Pipeline([
-            ('imputation_layer', SimpleImputer(strategy='median')),
+            ('imputation_layer', imputation_layer),
             ('ensemble_predictor', self.ensemble_model)
         ])
         
         # Note: Model is already trained, this step just organizes components
         logger.info('Inference pipeline assembled')
+    
+    def extend_ensemble(self, pipeline: Pipeline, X_new: pd.DataFrame, y_new: pd.Series, window_index: int) -> int:
+        """
+        Fit INCREMENTAL_TREE_COUNT new trees on fresh data into an existing pipeline.
+        warm_start keeps the existing trees and only fits the additional ones; in
+        rolling mode the oldest trees are retired first so the forest size stays fixed.
+        Returns the number of retired trees.
+        """
+        strategy = self.config.INCREMENTAL_STRATEGY
+        if strategy not in ('append', 'rolling'):
+            raise ValueError(f'Unknown incremental strategy: {strategy}')
+        
+        forest = pipeline.named_steps['ensemble_predictor']
+        new_tree_count = self.config.INCREMENTAL_TREE_COUNT
+        retired_count = min(new_tree_count, len(forest.estimators_)) if strategy == 'rolling' else 0
+        
+        logger.info(f'Extending ensemble: {new_tree_count} new trees on {len(X_new)} records, '
+                    f'{retired_count} oldest trees retired')
+        forest.estimators_ = forest.estimators_[retired_count:]
+        
+        # A fresh seed per window, otherwise every refresh would reuse the same bootstrap seeds
+        forest.set_params(
+            warm_start=True,
+            n_estimators=len(forest.estimators_) + new_tree_count,
+            random_state=self.config.SEED_VALUE + window_index,
+            n_jobs=self.config.TRAINING_JOBS
+        )
+        forest.fit(X_new, y_new)
+        forest.set_params(warm_start=False, n_jobs=None)
+        
+        self.ensemble_model = forest
+        self.inference_pipeline = pipeline
+        return retired_count
+    
+    def evaluate_holdout(self, X_test: pd.DataFrame, y_test: pd.Series) -> Dict[str, float]:
+        """Score the assembled pipeline on the validation partition"""
+        metrics = compute_regression_metrics(y_test, self.inference_pipeline.predict(X_test))
+        logger.info(f"Holdout metrics: RMSE={metrics['rmse']:,.0f} RMSLE={metrics['rmsle']:.4f} MAE={metrics['mae']:,.0f}")
+        return metrics
+
+
+# ==================== HYPERPARAMETER SEARCH ====================
+# Training data is handed to each worker process once, through the pool initializer,
+# instead of being pickled into every (candidate, fold) task
+_SEARCH_WORKER_DATA: Dict[str, np.ndarray] = {}
+
+
+def _initialize_search_worker(X: np.ndarray, y: np.ndarray):
+    """Process pool initializer: keep the shared training arrays in worker globals"""
+    _SEARCH_WORKER_DATA['X'] = X
+    _SEARCH_WORKER_DATA['y'] = y
+
+
+def _evaluate_search_fold(candidate_index: int, fold_index: int, parameters: Dict[str, Any],
+                          train_rows: np.ndarray, validation_rows: np.ndarray, seed: int) -> Dict[str, Any]:
+    """Fit one candidate on one fold's training rows and score its validation rows"""
+    X, y = _SEARCH_WORKER_DATA['X'], _SEARCH_WORKER_DATA['y']
+    started = time.perf_counter()
+    
+    # Single-threaded fits: the pool already occupies every core
+    forest = RandomForestRegressor(random_state=seed, n_jobs=1, **parameters)
+    forest.fit(X[train_rows], y[train_rows])
+    metrics = compute_regression_metrics(y[validation_rows], forest.predict(X[validation_rows]))
+    
+    return {
+        'candidate': candidate_index,
+        'fold': fold_index,
+        'fit_seconds': time.perf_counter() - started,
+        **metrics
+    }
+
+
+class HyperparameterSearchCoordinator:
+    """
+    Parallel k-fold cross-validated search over forest hyperparameters.
+    Every (candidate, fold) pair is an independent task on a process pool, so wall
+    time shrinks close to linearly with cores while tasks outnumber workers.
+    """
+    
+    def __init__(self, config: CornerstoneModelConfig):
+        self.config = config
+        self.search_report: Dict[str, Any] = {}
+    
+    def enumerate_candidates(self) -> List[Dict[str, Any]]:
+        """Expand SEARCH_SPACE into the full grid, or a seeded random sample of it"""
+        parameter_names = sorted(self.config.SEARCH_SPACE)
+        grid = [
+            dict(zip(parameter_names, values))
+            for values in itertools.product(*(self.config.SEARCH_SPACE[name] for name in parameter_names))
+        ]
+        
+        if self.config.SEARCH_STRATEGY == 'random' and self.config.SEARCH_ITERATIONS < len(grid):
+            grid = random.Random(self.config.SEED_VALUE).sample(grid, self.config.SEARCH_ITERATIONS)
+        elif self.config.SEARCH_STRATEGY not in ('grid', 'random'):
+            raise ValueError(f'Unknown search strategy: {self.config.SEARCH_STRATEGY}')
+        
+        return grid
+    
+    def run_search(self, X_train: pd.DataFrame, y_train: pd.Series) -> Dict[str, Any]:
+        """Cross-validate every candidate and return the winning forest parameters"""
+        candidates = self.enumerate_candidates()
+        folds = list(KFold(
+            n_splits=self.config.SEARCH_FOLDS,
+            shuffle=True,
+            random_state=self.config.SEED_VALUE
+        ).split(X_train))
+        worker_count = self.config.SEARCH_WORKERS or os.cpu_count() or 1
+        
+        logger.info(f'Hyperparameter search: {len(candidates)} candidates x {len(folds)} folds '
+                    f'on {worker_count} workers')
+        
+        # Largest forests first so the slowest tasks do not straggle at the end
+        tasks = sorted(
+            ((candidate_index, fold_index) for candidate_index in range(len(candidates))
+             for fold_index in range(len(folds))),
+            key=lambda task: -candidates[task[0]].get('n_estimators', self.config.TREE_COUNT)
+        )
+        
+        started = time.perf_counter()
+        X = X_train.to_numpy(dtype=np.float32)
+        y = y_train.to_numpy(dtype=np.float64)
+        
+        with ProcessPoolExecutor(max_workers=worker_count, initializer=_initialize_search_worker,
+                                 initargs=(X, y)) as pool:
+            futures = [
+                pool.submit(_evaluate_search_fold, candidate_index, fold_index, candidates[candidate_index],
+                            folds[fold_index][0], folds[fold_index][1], self.config.SEED_VALUE)
+                for candidate_index, fold_index in tasks
+            ]
+            fold_results = [future.result() for future in futures]
+        
+        wall_seconds = time.perf_counter() - started
+        candidate_reports = self._summarize_candidates(candidates, fold_results)
+        best_report = min(candidate_reports, key=lambda report: report['mean_rmse'])
+        
+        self.search_report = {
+            'strategy': self.config.SEARCH_STRATEGY,
+            'folds': len(folds),
+            'workers': worker_count,
+            'wall_seconds': wall_seconds,
+            'cpu_seconds': float(sum(result['fit_seconds'] for result in fold_results)),
+            'best_parameters': best_report['parameters'],
+            'candidates': candidate_reports
+        }
+        logger.info(f"Search complete in {wall_seconds:.1f}s: best {best_report['parameters']} "
+                    f"(CV RMSE {best_report['mean_rmse']:,.0f})")
+        return best_report['parameters']
+    
+    @staticmethod
+    def _summarize_candidates(candidates: List[Dict[str, Any]], fold_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group per-fold metrics by candidate with mean and standard deviation"""
+        reports = []
+        for candidate_index, parameters in enumerate(candidates):
+            folds = sorted(
+                (result for result in fold_results if result['candidate'] == candidate_index),
+                key=lambda result: result['fold']
+            )
+            report = {'parameters': parameters, 'folds': folds}
+            for metric in ('rmse', 'rmsle', 'mae'):
+                values = np.array([fold[metric] for fold in folds])
+                report[f'mean_{metric}'] = float(values.mean())
+                report[f'std_{metric}'] = float(values.std())
+            reports.append(report)
+        return reports
 
 
 # ==================== MODEL ARTIFACT REGISTRY ====================
@@ -195,22 +644,217 @@ class ModelArtifactRegistry:
     def __init__(self, registry_directory: str, config: CornerstoneModelConfig):
         self.registry_directory = registry_directory
         self.config = config
+    
+    @staticmethod
+    def _atomic_dump(artifact, artifact_path: str):
+        """
+        Write to a temporary file and rename it into place.
+        A serving process hot-reloading the artifact never observes a half-written file.
+        """
+        staging_path = f'{artifact_path}.tmp-{os.getpid()}'
+        joblib.dump(artifact, staging_path)
+        os.replace(staging_path, artifact_path)
         
     def persist_inference_pipeline(self, pipeline: Pipeline):
         """Serialize the complete inference pipeline"""
         artifact_path = os.path.join(self.registry_directory, self.config.MODEL_ARTIFACT_NAME)
-        joblib.dump(pipeline, artifact_path)
+        self._atomic_dump(pipeline, artifact_path)
         logger.info(f'Inference pipeline persisted to {artifact_path}')
     
     def persist_feature_metadata(self, features: List[str]):
         """Serialize feature column metadata for inference consistency"""
         metadata_path = os.path.join(self.registry_directory, self.config.METADATA_ARTIFACT_NAME)
-        joblib.dump(features, metadata_path)
+        self._atomic_dump(features, metadata_path)
         logger.info(f'Feature metadata persisted to {metadata_path}')
+    
+    def persist_compiled_engine(self, pipeline: Pipeline, features: List[str], lineage: Optional[Dict[str, Any]] = None,
+                                engine_path: Optional[str] = None):
+        """Export the forest as raw NumPy buffers + manifest that serving workers memory-map"""
+        engine_path = engine_path or os.path.join(self.registry_directory, self.config.ENGINE_ARTIFACT_NAME)
+        predictor = DirectForestPredictor.from_pipeline(pipeline, features)
+        if predictor is None:
+            logger.warning('Pipeline is not an imputer + forest pair - skipping compiled engine export')
+            # An engine left over from an earlier forest would otherwise be served instead of this model
+            if os.path.isdir(engine_path):
+                shutil.rmtree(engine_path)
+                logger.info(f'Removed stale compiled engine at {engine_path}')
+            return
+        
+        # Only a compacted forest's leaves survive the quantized layout unchanged
+        quantize = self.config.COMPACTION_ENABLED and has_float32_leaves(predictor.estimators)
+        engine = CompiledForestEngine.from_direct_predictor(predictor, quantize=quantize)
+        if self.config.LATTICE_ENABLED and engine.attach_lattice(self.config.LATTICE_MAX_CELLS):
+            logger.info(f'Prediction lattice: {engine.lattice.cell_count:,} cells, '
+                        f'{len(engine.lattice.cell_values):,} distinct predictions')
+        metadata = {'training_config': asdict(self.config)}
+        if lineage is not None:
+            metadata['lineage_version'] = lineage['version']
+            metadata['tree_windows'] = lineage['tree_windows']
+        engine.save(engine_path, metadata=metadata)
+        logger.info(f'Compiled engine ({engine.tree_count} trees, {engine.node_count} nodes, '
+                    f'{engine.nbytes / 1e6:.1f} MB) persisted to {engine_path}')
+    
+    def persist_training_report(self, report: Dict[str, Any]):
+        """Write the training configuration, metrics and search results as JSON"""
+        report_path = os.path.join(self.registry_directory, self.config.REPORT_ARTIFACT_NAME)
+        staging_path = f'{report_path}.tmp-{os.getpid()}'
+        with open(staging_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2, default=str)
+        os.replace(staging_path, report_path)
+        logger.info(f'Training report persisted to {report_path}')
+    
+    def publish_model_version(self, pipeline: Pipeline, features: List[str], metrics: Dict[str, float],
+                              lineage: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Publish the model as an immutable version in the versioned registry and move the
+        configured aliases to it, then prune versions past the retention limit.
+        Returns the content id (None when the registry is off).
+        """
+        if not self.config.MODEL_REGISTRY_ENABLED:
+            return None
+        
+        versioned_registry = VersionedModelRegistry(
+            os.path.join(self.registry_directory, self.config.MODEL_REGISTRY_DIRECTORY)
+        )
+        staging_directory = versioned_registry.stage_version()
+        try:
+            joblib.dump(pipeline, os.path.join(staging_directory, versioned_registry.PIPELINE_NAME))
+            self.persist_compiled_engine(
+                pipeline, features, lineage, os.path.join(staging_directory, versioned_registry.ENGINE_NAME)
+            )
+            model_id = versioned_registry.commit_version(staging_directory, {
+                'features': list(features),
+                'segment': self.config.MODEL_SEGMENT,
+                'metrics': metrics,
+                'lineage_version': lineage['version'] if lineage else None,
+                'training_config': asdict(self.config)
+            })
+        except Exception:
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            raise
+        
+        for alias in self.config.MODEL_ALIASES:
+            versioned_registry.assign_alias(alias, model_id)
+        if self.config.MODEL_REGISTRY_RETAIN_VERSIONS > 0:
+            versioned_registry.prune_versions(self.config.MODEL_REGISTRY_RETAIN_VERSIONS)
+        return model_id
+    
+    def load_inference_pipeline(self) -> Pipeline:
+        """Load the currently persisted inference pipeline"""
+        artifact_path = os.path.join(self.registry_directory, self.config.MODEL_ARTIFACT_NAME)
+        if not os.path.exists(artifact_path):
+            raise FileNotFoundError(f'No trained pipeline at {artifact_path}; run a full training first')
+        return joblib.load(artifact_path)
+    
+    def load_model_lineage(self, tree_count: int) -> Dict[str, Any]:
+        """Per-tree data-window lineage, synthesized for models trained before lineage existed"""
+        lineage_path = os.path.join(self.registry_directory, self.config.LINEAGE_ARTIFACT_NAME)
+        if os.path.exists(lineage_path):
+            with open(lineage_path) as lineage_file:
+                lineage = json.load(lineage_file)
+            if len(lineage['tree_windows']) == tree_count:
+                return lineage
+            logger.warning(f'Lineage at {lineage_path} does not match the pipeline - treating all trees as one window')
+        
+        window = {'window_id': 'untracked', 'source': None, 'sha256': None, 'records': None,
+                  'trained_at': None, 'mode': 'full', 'tree_count': tree_count}
+        return {'version': 0, 'windows': [window], 'tree_windows': ['untracked'] * tree_count}
+    
+    def current_lineage_version(self) -> int:
+        """Version of the persisted lineage, 0 when none exists yet"""
+        lineage_path = os.path.join(self.registry_directory, self.config.LINEAGE_ARTIFACT_NAME)
+        if not os.path.exists(lineage_path):
+            return 0
+        with open(lineage_path) as lineage_file:
+            return json.load(lineage_file)['version']
+    
+    def persist_model_lineage(self, lineage: Dict[str, Any]):
+        """Write which data window every tree was fit on"""
+        lineage_path = os.path.join(self.registry_directory, self.config.LINEAGE_ARTIFACT_NAME)
+        staging_path = f'{lineage_path}.tmp-{os.getpid()}'
+        with open(staging_path, 'w') as lineage_file:
+            json.dump(lineage, lineage_file, indent=2)
+        os.replace(staging_path, lineage_path)
+        logger.info(f"Model lineage v{lineage['version']} persisted to {lineage_path}")
+    
+    def persist_ensemble_delta(self, version: int, window: Dict[str, Any], added_trees: List, retired_tree_windows: List[str]):
+        """
+        Store one incremental update as its own versioned artifact.
+        Applying the deltas in version order to the last full model reproduces the
+        current forest, and any version can be rebuilt or audited on its own.
+        """
+        delta_directory = os.path.join(self.registry_directory, self.config.DELTA_DIRECTORY_NAME)
+        os.makedirs(delta_directory, exist_ok=True)
+        delta_path = os.path.join(delta_directory, f"v{version:04d}-{window['window_id']}.pkl")
+        self._atomic_dump({
+            'version': version,
+            'window': window,
+            'added_trees': added_trees,
+            'retired_tree_count': len(retired_tree_windows),
+            'retired_tree_windows': retired_tree_windows
+        }, delta_path)
+        logger.info(f'Ensemble delta v{version} ({len(added_trees)} trees) persisted to {delta_path}')
+
+
+# ==================== DATA WINDOW LINEAGE ====================
+def describe_data_window(dataset_path: str, record_count: int, mode: str, tree_count: int) -> Dict[str, Any]:
+    """Identify the data a group of trees was fit on by content hash and time"""
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as dataset_file:
+        for block in iter(lambda: dataset_file.read(1 << 20), b''):
+            digest.update(block)
+    trained_at = time.gmtime()
+    
+    return {
+        'window_id': f"{time.strftime('%Y%m%dT%H%M%S', trained_at)}-{digest.hexdigest()[:8]}",
+        'source': os.path.basename(dataset_path),
+        'sha256': digest.hexdigest(),
+        'records': record_count,
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', trained_at),
+        'mode': mode,
+        'tree_count': tree_count
+    }
 
 
 # ==================== TRAINING ORCHESTRATION ====================
-def execute_cornerstone_training():
+@contextmanager
+def profiled_training_run(config: CornerstoneModelConfig, base_directory: str, mode: str) -> Iterator[TrainingProfiler]:
+    """
+    Profiler for one training run (a no-op unless PROFILING_ENABLED).
+    If the run raises before finish_training_profiler, its partial profile is written
+    marked as failed; the sampler thread, tracemalloc and the method wrappers are
+    released either way.
+    """
+    profiler = TrainingProfiler(config.PROFILING_ENABLED, config.PROFILE_TRACE_ALLOCATIONS, config.PROFILE_CPROFILE)
+    profiler.start()
+    try:
+        yield profiler
+    except BaseException as e:
+        if profiler.is_running:
+            try:
+                finish_training_profiler(profiler, config, base_directory, {'mode': mode},
+                                         status='failed', error=f'{type(e).__name__}: {e}')
+            except Exception as report_error:
+                logger.error(f'Could not write the partial training profile: {report_error}')
+        raise
+    finally:
+        profiler.release()
+
+
+def finish_training_profiler(profiler: TrainingProfiler, config: CornerstoneModelConfig, base_directory: str,
+                             context: Dict[str, Any], status: str = 'completed', error: Optional[str] = None):
+    """Write the profile, its run history line and the optional cProfile dump next to the artifacts"""
+    profiler.finish(
+        os.path.join(base_directory, config.PROFILE_ARTIFACT_NAME),
+        os.path.join(base_directory, config.PROFILE_HISTORY_NAME),
+        os.path.join(base_directory, config.PROFILE_STATS_NAME),
+        context,
+        status,
+        error
+    )
+
+
+def execute_cornerstone_training(config: CornerstoneModelConfig = None):
     """
     Main training orchestration function that coordinates all custom components.
     Provides a clear, readable workflow for the complete ML pipeline.
@@ -218,31 +862,283 @@ def execute_cornerstone_training():
     logger.info('=== CORNERSTONE MODEL TRAINING INITIATED ===')
     
     # Initialize configuration
-    config = CornerstoneModelConfig()
+    config = config or CornerstoneModelConfig()
     base_directory = os.path.dirname(__file__)
-    
-    # Phase 1: Data Preparation
-    logger.info('PHASE 1: Dataset Orchestration')
-    dataset_manager = DatasetOrchestrator(base_directory, config)
-    dataset_manager.load_training_data()
-    dataset_manager.extract_model_features()
-    dataset_manager.handle_missing_values()
-    X_train, X_test, y_train, y_test = dataset_manager.partition_for_training()
-    
-    # Phase 2: Model Training
-    logger.info('PHASE 2: Predictor Ensemble Construction')
-    trainer = PredictorEnsembleBuilder(config)
-    trainer.construct_ensemble(X_train, y_train)
-    trainer.build_inference_pipeline()
-    
-    # Phase 3: Artifact Persistence
-    logger.info('PHASE 3: Model Artifact Registry')
-    registry = ModelArtifactRegistry(base_directory, config)
-    registry.persist_inference_pipeline(trainer.inference_pipeline)
-    registry.persist_feature_metadata(config.CORNERSTONE_FEATURES)
+    with profiled_training_run(config, base_directory, 'full') as profiler:
+        # Phase 1: Data Preparation
+        logger.info('PHASE 1: Dataset Orchestration')
+        profiler.begin_phase('dataset_orchestration')
+        dataset_manager = DatasetOrchestrator(base_directory, config)
+        profiler.instrument(dataset_manager)
+        X_train, X_test, y_train, y_test = dataset_manager.prepare_training_partitions()
+        
+        # Compaction selects trees on rows of its own, so the holdout metrics stay unbiased
+        X_selection = y_selection = None
+        if config.COMPACTION_ENABLED and config.ENSEMBLE_ENGINE == 'forest':
+            X_train, X_selection, y_train, y_selection = train_test_split(
+                X_train, y_train,
+                test_size=config.COMPACTION_SELECTION_PROPORTION,
+                random_state=config.SEED_VALUE
+            )
+            logger.info(f'Compaction selection split: {len(X_selection)} records held out of the fit')
+        
+        # Optional Phase: Hyperparameter Search
+        search_report = None
+        if config.SEARCH_ENABLED and config.ENSEMBLE_ENGINE != 'forest':
+            logger.warning(f'Hyperparameter search covers forest settings only - skipped for the {config.ENSEMBLE_ENGINE} engine')
+        elif config.SEARCH_ENABLED:
+            logger.info('PHASE 1b: Hyperparameter Search')
+            profiler.begin_phase('hyperparameter_search')
+            search_coordinator = HyperparameterSearchCoordinator(config)
+            best_parameters = search_coordinator.run_search(X_train, y_train)
+            config = config.with_forest_parameters(best_parameters)
+            search_report = search_coordinator.search_report
+        
+        # Phase 2: Model Training
+        logger.info('PHASE 2: Predictor Ensemble Construction')
+        profiler.begin_phase('ensemble_construction')
+        trainer = PredictorEnsembleBuilder(config)
+        profiler.instrument(trainer)
+        # Boosting picks its iteration count on the validation partition, so its holdout
+        # metrics are slightly optimistic; the forest never sees these rows
+        trainer.construct_ensemble(X_train, y_train, X_test, y_test)
+        trainer.build_inference_pipeline(X_train)
+        holdout_metrics = trainer.evaluate_holdout(X_test, y_test)
+        
+        # Optional Phase: Model Compaction
+        compaction_report = None
+        if config.COMPACTION_ENABLED:
+            logger.info('PHASE 2b: Model Compaction')
+            profiler.begin_phase('model_compaction')
+            compactor = ForestCompactor(config)
+            compacted_pipeline = None
+            if X_selection is not None:
+                compacted_pipeline = compactor.compact(trainer.inference_pipeline, X_selection, y_selection)
+            else:
+                logger.warning(f'Compaction applies to random forests only - {config.ENSEMBLE_ENGINE} ensemble left as is')
+            compaction_report = {**compactor.compaction_report, 'applied': compacted_pipeline is not None,
+                                 'holdout_metrics_original': holdout_metrics} if compactor.compaction_report else None
+            if compacted_pipeline is not None:
+                original_pipeline = trainer.inference_pipeline
+                trainer.inference_pipeline = compacted_pipeline
+                compacted_metrics = trainer.evaluate_holdout(X_test, y_test)
+                compaction_report['holdout_metrics_compacted'] = compacted_metrics
+        
+                # A small selection split can pass a subset the holdout rejects: never ship it
+                if compacted_metrics['rmse'] > holdout_metrics['rmse'] * (1.0 + config.COMPACTION_TOLERANCE):
+                    logger.warning('Compacted forest is outside the tolerance on the holdout partition - '
+                                   'keeping the original forest')
+                    trainer.inference_pipeline = original_pipeline
+                    compaction_report['applied'] = False
+                else:
+                    trainer.ensemble_model = compacted_pipeline.named_steps['ensemble_predictor']
+                    holdout_metrics = compacted_metrics
+        tree_count = trainer.ensemble_size()
+        
+        # Phase 3: Artifact Persistence
+        logger.info('PHASE 3: Model Artifact Registry')
+        profiler.begin_phase('artifact_registry')
+        registry = ModelArtifactRegistry(base_directory, config)
+        profiler.instrument(registry)
+        window = describe_data_window(
+            os.path.join(base_directory, dataset_manager.dataset_filename), len(X_train), 'full', tree_count
+        )
+        lineage = {
+            'version': registry.current_lineage_version() + 1,
+            'windows': [window],
+            'tree_windows': [window['window_id']] * tree_count
+        }
+        
+        registry.persist_inference_pipeline(trainer.inference_pipeline)
+        registry.persist_feature_metadata(config.CORNERSTONE_FEATURES)
+        registry.persist_compiled_engine(trainer.inference_pipeline, config.CORNERSTONE_FEATURES, lineage)
+        registry.persist_model_lineage(lineage)
+        model_id = registry.publish_model_version(
+            trainer.inference_pipeline, config.CORNERSTONE_FEATURES, holdout_metrics, lineage
+        )
+        registry.persist_training_report({
+            'configuration': asdict(config),
+            'model_id': model_id,
+            'holdout_metrics': holdout_metrics,
+            'ensemble': {'engine': config.ENSEMBLE_ENGINE, 'size': tree_count},
+            'compaction': compaction_report,
+            'ingestion': dataset_manager.ingestion_report,
+            'search': search_report
+        })
+        finish_training_profiler(profiler, config, base_directory, {
+            'mode': 'full',
+            'model_id': model_id,
+            'ensemble': {'engine': config.ENSEMBLE_ENGINE, 'size': tree_count},
+            'ingestion_mode': config.INGESTION_MODE,
+            'training_rows': len(X_train)
+        })
     
     logger.info('=== CORNERSTONE MODEL TRAINING COMPLETED ===')
 
 
+def execute_incremental_training(config: CornerstoneModelConfig = None, batch_path: str = None):
+    """
+    Daily refresh: fit a few warm-started trees on newly closed sales and persist the
+    updated model, its lineage and the delta, without rebuilding the existing trees.
+    """
+    logger.info('=== CORNERSTONE INCREMENTAL TRAINING INITIATED ===')
+    
+    config = config or CornerstoneModelConfig()
+    base_directory = os.path.dirname(__file__)
+    batch_path = os.path.abspath(batch_path or os.path.join(base_directory, config.INCREMENTAL_DATA_FILE))
+    with profiled_training_run(config, base_directory, 'incremental') as profiler:
+        profiler.begin_phase('model_loading')
+        registry = ModelArtifactRegistry(base_directory, config)
+        profiler.instrument(registry)
+        pipeline = registry.load_inference_pipeline()
+        forest = pipeline.named_steps['ensemble_predictor']
+        if not isinstance(forest, RandomForestRegressor):
+            raise ValueError(f'Incremental retraining needs a random forest, not {type(forest).__name__}; '
+                             f'run a full training instead')
+        lineage = registry.load_model_lineage(len(forest.estimators_))
+        
+        # Phase 1: Fresh sales, imputed with the medians the served model already uses
+        logger.info('PHASE 1: Fresh Sales Preparation')
+        profiler.begin_phase('fresh_sales_preparation')
+        batch_manager = DatasetOrchestrator(
+            os.path.dirname(batch_path), replace(config, DATASET_CACHE_ENABLED=False), os.path.basename(batch_path)
+        )
+        profiler.instrument(batch_manager)
+        batch_manager.load_training_data()
+        batch_manager.extract_model_features()
+        fill_values = batch_manager.processed_dataframe.median()
+        fill_values.update(pd.Series(pipeline.named_steps['imputation_layer'].statistics_, index=config.CORNERSTONE_FEATURES))
+        batch_manager.handle_missing_values(fill_values)
+        X_new, X_check, y_new, y_check = batch_manager.partition_for_training()
+        
+        # Phase 2: Warm-started trees
+        logger.info('PHASE 2: Incremental Ensemble Extension')
+        profiler.begin_phase('incremental_extension')
+        window = describe_data_window(batch_path, len(X_new), config.INCREMENTAL_STRATEGY, config.INCREMENTAL_TREE_COUNT)
+        trainer = PredictorEnsembleBuilder(config)
+        profiler.instrument(trainer)
+        started = time.perf_counter()
+        retired_count = trainer.extend_ensemble(pipeline, X_new, y_new, lineage['version'] + 1)
+        window['fit_seconds'] = time.perf_counter() - started
+        holdout_metrics = trainer.evaluate_holdout(X_check, y_check)
+        
+        retired_tree_windows = lineage['tree_windows'][:retired_count]
+        tree_windows = lineage['tree_windows'][retired_count:] + [window['window_id']] * config.INCREMENTAL_TREE_COUNT
+        live_windows = set(tree_windows)
+        lineage = {
+            'version': lineage['version'] + 1,
+            'windows': [existing for existing in lineage['windows'] if existing['window_id'] in live_windows] + [window],
+            'tree_windows': tree_windows
+        }
+        
+        # Phase 3: Artifact Persistence
+        logger.info('PHASE 3: Model Artifact Registry')
+        profiler.begin_phase('artifact_registry')
+        registry.persist_ensemble_delta(
+            lineage['version'], window, forest.estimators_[-config.INCREMENTAL_TREE_COUNT:], retired_tree_windows
+        )
+        registry.persist_inference_pipeline(pipeline)
+        registry.persist_compiled_engine(pipeline, config.CORNERSTONE_FEATURES, lineage)
+        registry.persist_model_lineage(lineage)
+        model_id = registry.publish_model_version(pipeline, config.CORNERSTONE_FEATURES, holdout_metrics, lineage)
+        registry.persist_training_report({
+            'configuration': asdict(config),
+            'model_id': model_id,
+            'holdout_metrics': holdout_metrics,
+            'incremental': {
+                'window': window,
+                'retired_trees': retired_count,
+                'forest_size': len(forest.estimators_),
+                'lineage_version': lineage['version']
+            }
+        })
+        finish_training_profiler(profiler, config, base_directory, {
+            'mode': 'incremental',
+            'model_id': model_id,
+            'strategy': config.INCREMENTAL_STRATEGY,
+            'added_trees': config.INCREMENTAL_TREE_COUNT,
+            'training_rows': len(X_new)
+        })
+    
+    logger.info('=== CORNERSTONE INCREMENTAL TRAINING COMPLETED ===')
+
+
+def parse_training_arguments(argv: List[str] = None) -> Tuple[CornerstoneModelConfig, bool]:
+    """Build a training configuration from command-line flags, plus whether to run incrementally"""
+    parser = argparse.ArgumentParser(description='Train the Cornerstone house price model')
+    parser.add_argument('--engine', choices=['forest', 'boosted'], default='forest',
+                        help='Random forest or histogram gradient boosting with early stopping')
+    parser.add_argument('--boosting-iterations', type=int, default=1000, help='Upper bound on boosting iterations')
+    parser.add_argument('--compact', action='store_true', help='Prune, subset and quantize the trained forest')
+    parser.add_argument('--compaction-tolerance', type=float, default=0.01,
+                        help='Allowed relative validation RMSE increase of the compacted forest')
+    parser.add_argument('--leaf-merge-dollars', type=float, default=500.0,
+                        help='Collapse subtrees whose leaf predictions differ by at most this much')
+    parser.add_argument('--compaction-max-depth', type=int, default=None)
+    parser.add_argument('--lattice', action='store_true',
+                        help='Precompute the prediction lattice (shallow forests of a few dozen trees only)')
+    parser.add_argument('--lattice-max-cells', type=int, default=4000000,
+                        help='Largest prediction lattice to precompute (bigger forests keep tree traversal)')
+    parser.add_argument('--search', action='store_true', help='Run k-fold hyperparameter search first')
+    parser.add_argument('--search-strategy', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=20, help='Candidates sampled by random search')
+    parser.add_argument('--workers', type=int, default=0, help='Search processes (0 = all cores)')
+    parser.add_argument('--ingestion', choices=['memory', 'streaming'], default='memory')
+    parser.add_argument('--chunk-rows', type=int, default=250000, help='Rows per chunk in streaming ingestion')
+    parser.add_argument('--dataset-cache', action='store_true',
+                        help='Load the model columns from a memory-mapped cache of train.csv')
+    parser.add_argument('--incremental', nargs='?', const='new_sales.csv', default=None, metavar='CSV',
+                        help='Warm-start new trees on fresh sales instead of a full rebuild')
+    parser.add_argument('--incremental-trees', type=int, default=20)
+    parser.add_argument('--incremental-strategy', choices=['rolling', 'append'], default='rolling')
+    parser.add_argument('--alias', action='append', default=None, metavar='NAME',
+                        help="Registry alias to point at the new version (repeatable, default 'latest'; implies --publish)")
+    parser.add_argument('--segment', default=None, help='Region/segment label recorded in the version manifest')
+    parser.add_argument('--publish', action='store_true',
+                        help='Also publish the model as a version in the versioned registry')
+    parser.add_argument('--registry-retain', type=int, default=5,
+                        help='Newest registry versions to keep besides routed ones (0 keeps all)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record time and memory per training method and phase in training_profile.json')
+    parser.add_argument('--cprofile', action='store_true', help='With --profile, also dump cProfile stats')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='With --profile, skip allocation tracing (lower overhead, RSS only)')
+    args = parser.parse_args(argv)
+    
+    return CornerstoneModelConfig(
+        ENSEMBLE_ENGINE=args.engine,
+        BOOSTING_MAX_ITERATIONS=args.boosting_iterations,
+        COMPACTION_ENABLED=args.compact,
+        COMPACTION_TOLERANCE=args.compaction_tolerance,
+        COMPACTION_LEAF_MERGE_DOLLARS=args.leaf_merge_dollars,
+        COMPACTION_MAX_DEPTH=args.compaction_max_depth,
+        LATTICE_ENABLED=args.lattice,
+        LATTICE_MAX_CELLS=args.lattice_max_cells,
+        SEARCH_ENABLED=args.search,
+        SEARCH_STRATEGY=args.search_strategy,
+        SEARCH_FOLDS=args.folds,
+        SEARCH_ITERATIONS=args.iterations,
+        SEARCH_WORKERS=args.workers,
+        INGESTION_MODE=args.ingestion,
+        INGESTION_CHUNK_ROWS=args.chunk_rows,
+        DATASET_CACHE_ENABLED=args.dataset_cache,
+        INCREMENTAL_DATA_FILE=os.path.abspath(args.incremental) if args.incremental else 'new_sales.csv',
+        INCREMENTAL_TREE_COUNT=args.incremental_trees,
+        INCREMENTAL_STRATEGY=args.incremental_strategy,
+        MODEL_REGISTRY_ENABLED=args.publish or args.alias is not None,
+        MODEL_REGISTRY_RETAIN_VERSIONS=args.registry_retain,
+        MODEL_ALIASES=args.alias,
+        MODEL_SEGMENT=args.segment,
+        PROFILING_ENABLED=args.profile,
+        PROFILE_TRACE_ALLOCATIONS=not args.no_tracemalloc,
+        PROFILE_CPROFILE=args.cprofile
+    ), args.incremental is not None
+
+
 if __name__ == '__main__':
-    execute_cornerstone_training()
+    training_config, incremental = parse_training_arguments()
+    if incremental:
+        execute_incremental_training(training_config)
+    else:
+        execute_cornerstone_training(training_config)
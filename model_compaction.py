@@ -0,0 +1,336 @@
+"""
+Cornerstone Model Compaction
+============================
+Post-training compaction of the random forest into a smaller, faster model that
+scores within a tolerance of the original on the validation partition.
+
+A fully grown 200-tree forest carries many trees that add little once the others
+are averaged, and deep branches whose sibling leaves predict nearly the same
+price. Compaction works on the fitted sklearn trees themselves, so pipeline.pkl,
+the direct predictor and the compiled engine all serve the same compacted model:
+
+1. Pruning: splits whose whole subtree predicts within COMPACTION_LEAF_MERGE_DOLLARS
+   are collapsed into one leaf, and branches below COMPACTION_MAX_DEPTH are cut.
+   A collapsed node predicts the training mean of its subtree, so no original leaf
+   moves by more than the merge tolerance.
+2. Tree selection: pruned trees are ordered by greedy forward selection on half of
+   a selection split carved from the training partition, and the shortest prefix
+   whose RMSE on the other half is within COMPACTION_TOLERANCE of the full, unpruned
+   forest is kept. When no prefix gets there, the original forest is kept instead.
+3. Quantization: leaf values are rounded to float32 so the compiled engine can store
+   them at half width without changing a single prediction (see
+   CompiledForestEngine.from_direct_predictor(quantize=True)).
+
+Usage:
+    python model.py --compact [--compaction-tolerance 0.01] [--leaf-merge-dollars 500]
+
+Pruning rebuilds trees through sklearn's private Tree state (__getstate__ /
+__setstate__); check_tree_internals refuses sklearn releases outside the range that
+layout was verified against, and compaction is then skipped.
+
+Components:
+- check_tree_internals: Guard on the sklearn version and Tree state layout pruning relies on
+- prune_tree: Depth cap and near-identical leaf merging on one fitted sklearn tree
+- select_tree_subset: Greedy forward selection of trees against a validation RMSE target
+- has_float32_leaves: Whether a forest can take the quantized engine layout losslessly
+- ForestCompactor: Runs the stages on a fitted pipeline and measures size, latency
+  and accuracy of the compacted model against the original
+"""
+
+import copy
+import time
+import pickle
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree._tree import Tree, TREE_LEAF, TREE_UNDEFINED
+
+from inference_engine import DirectForestPredictor, CompiledForestEngine
+
+logger = logging.getLogger(__name__)
+
+# Greedy selection costs rows * trees^2; a sample this large pins the RMSE to well
+# under the tolerances used in practice
+SELECTION_SAMPLE_ROWS = 20000
+
+# sklearn releases whose private Tree state layout prune_tree was verified against
+# (lowest supported, first unverified)
+SKLEARN_TREE_STATE_VERSIONS = ((1, 3), (1, 10))
+TREE_STATE_NODE_FIELDS = ('left_child', 'right_child', 'feature', 'threshold')
+
+
+# ==================== SKLEARN TREE INTERNALS ====================
+def check_tree_internals(tree: Tree):
+    """
+    Raise RuntimeError unless the installed sklearn and the tree's pickled state have
+    the layout prune_tree rewrites: a 'nodes' record array with child, feature and
+    threshold fields and a (nodes, 1, 1) 'values' array.
+    """
+    version = tuple(int(part) for part in sklearn.__version__.split('.')[:2] if part.isdigit())
+    lowest, unverified = SKLEARN_TREE_STATE_VERSIONS
+    if not lowest <= version < unverified:
+        raise RuntimeError(f'Tree pruning is verified for scikit-learn {lowest[0]}.{lowest[1]} up to '
+                           f'{unverified[0]}.{unverified[1]} (exclusive), not {sklearn.__version__}')
+    
+    state = tree.__getstate__()
+    node_fields = getattr(state.get('nodes'), 'dtype', np.dtype([])).names or ()
+    values = state.get('values')
+    if (not set(TREE_STATE_NODE_FIELDS) <= set(node_fields) or values is None
+            or values.shape[1:] != (1, 1) or len(values) != len(state['nodes'])):
+        raise RuntimeError(f'Unexpected Tree state layout in scikit-learn {sklearn.__version__}')
+
+
+def has_float32_leaves(estimators: list) -> bool:
+    """Whether every node value is float32-representable, as pruned trees guarantee"""
+    for estimator in estimators:
+        values = np.asarray(estimator.tree_.value, dtype=np.float64)
+        if not np.array_equal(values, values.astype(np.float32)):
+            return False
+    return True
+
+
+# ==================== TREE PRUNING ====================
+def node_depths(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """Depth of every node, computed one level at a time"""
+    depths = np.zeros(len(children_left), dtype=np.int64)
+    frontier = np.array([0], dtype=np.int64)
+    depth = 0
+    while frontier.size:
+        depths[frontier] = depth
+        internal = frontier[children_left[frontier] != TREE_LEAF]
+        frontier = np.concatenate([children_left[internal], children_right[internal]])
+        depth += 1
+    return depths
+
+
+def prune_tree(tree: Tree, n_features: int, merge_tolerance: float = 0.0,
+               max_depth: Optional[int] = None) -> Tree:
+    """
+    Copy of a fitted regression tree with near-identical subtrees collapsed and
+    branches below max_depth cut. Every node keeps its training-mean value, so a
+    collapsed node predicts the sample-weighted mean of the leaves it replaces.
+    Leaf values are rounded to float32.
+    """
+    state = tree.__getstate__()
+    nodes, values = state['nodes'], state['values']
+    left, right = nodes['left_child'], nodes['right_child']
+    node_value = values[:, 0, 0]
+    depths = node_depths(left, right)
+    is_leaf = left == TREE_LEAF
+    
+    # Range of the original leaf values under every node, filled deepest level first
+    # (children always sit one level below their parent)
+    lowest = np.where(is_leaf, node_value, np.inf)
+    highest = np.where(is_leaf, node_value, -np.inf)
+    for depth in range(int(depths.max()) - 1, -1, -1):
+        parents = np.flatnonzero((depths == depth) & ~is_leaf)
+        lowest[parents] = np.minimum(lowest[left[parents]], lowest[right[parents]])
+        highest[parents] = np.maximum(highest[left[parents]], highest[right[parents]])
+    
+    becomes_leaf = is_leaf | (highest - lowest <= merge_tolerance)
+    if max_depth is not None:
+        becomes_leaf |= depths >= max_depth
+    
+    # Keep the nodes still reachable from the root; parents precede children in
+    # sklearn's layout, so a prefix sum renumbers them in the same order
+    kept = np.zeros(len(nodes), dtype=bool)
+    kept[0] = True
+    for depth in range(int(depths.max())):
+        parents = np.flatnonzero((depths == depth) & kept & ~becomes_leaf)
+        kept[left[parents]] = True
+        kept[right[parents]] = True
+    new_index = np.cumsum(kept) - 1
+    
+    pruned_nodes = nodes[kept].copy()
+    pruned_leaf = becomes_leaf[kept]
+    pruned_nodes['left_child'] = np.where(pruned_leaf, TREE_LEAF, new_index[np.maximum(pruned_nodes['left_child'], 0)])
+    pruned_nodes['right_child'] = np.where(pruned_leaf, TREE_LEAF, new_index[np.maximum(pruned_nodes['right_child'], 0)])
+    pruned_nodes['feature'][pruned_leaf] = TREE_UNDEFINED
+    pruned_nodes['threshold'][pruned_leaf] = TREE_UNDEFINED
+    
+    pruned = Tree(n_features, np.array([1], dtype=np.intp), 1)
+    pruned.__setstate__({
+        'max_depth': int(depths[kept].max()),
+        'node_count': int(kept.sum()),
+        'nodes': pruned_nodes,
+        'values': np.ascontiguousarray(values[kept].astype(np.float32).astype(np.float64))
+    })
+    return pruned
+
+
+# ==================== TREE SELECTION ====================
+def greedy_tree_order(tree_outputs: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Order trees by greedy forward selection: each step adds the tree that most lowers
+    the RMSE of the running subset mean on the given rows
+    """
+    row_count, tree_count = tree_outputs.shape
+    running_sum = np.zeros(row_count, dtype=np.float64)
+    remaining = np.ones(tree_count, dtype=bool)
+    order = np.empty(tree_count, dtype=np.int64)
+    
+    for subset_size in range(1, tree_count + 1):
+        candidates = np.flatnonzero(remaining)
+        candidate_errors = (running_sum[:, None] + tree_outputs[:, candidates]) / subset_size - targets[:, None]
+        best = candidates[int(np.argmin(np.mean(candidate_errors ** 2, axis=0)))]
+        order[subset_size - 1] = best
+        running_sum += tree_outputs[:, best]
+        remaining[best] = False
+    return order
+
+
+def select_tree_subset(order_outputs: np.ndarray, order_targets: np.ndarray, check_outputs: np.ndarray,
+                       check_targets: np.ndarray, target_rmse: float, min_trees: int = 1) -> Tuple[List[int], np.ndarray]:
+    """
+    Smallest greedy prefix (of at least min_trees) whose RMSE on the check rows reaches
+    target_rmse. The order is fit on different rows than the ones judging it, since a
+    greedy search scored on its own rows picks trees that merely fit those rows.
+    Returns the chosen tree positions in forest order and the check RMSE per prefix
+    size; falls back to the most accurate prefix when the target is never reached.
+    """
+    order = greedy_tree_order(order_outputs, order_targets)
+    prefix_means = np.cumsum(check_outputs[:, order], axis=1) / np.arange(1, len(order) + 1)
+    rmse_path = np.sqrt(np.mean((prefix_means - check_targets[:, None]) ** 2, axis=0))
+    
+    reaching = np.flatnonzero(rmse_path[min_trees - 1:] <= target_rmse)
+    if reaching.size:
+        subset_size = min_trees + int(reaching[0])
+    else:
+        subset_size = min_trees + int(np.argmin(rmse_path[min_trees - 1:]))
+    return sorted(int(position) for position in order[:subset_size]), rmse_path
+
+
+# ==================== FOREST COMPACTOR ====================
+class ForestCompactor:
+    """
+    Compacts a fitted imputer + forest pipeline using the COMPACTION_* settings of a
+    CornerstoneModelConfig. Tree selection needs rows the forest was not fit on and
+    the holdout partition must not see, so callers pass a separate selection split.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self.compaction_report: Dict[str, Any] = {}
+        
+        # Last compacted pipeline built, returned by compact() only when within tolerance
+        self.candidate_pipeline: Optional[Pipeline] = None
+    
+    def compact(self, pipeline: Pipeline, X_validation: pd.DataFrame, y_validation: pd.Series) -> Optional[Pipeline]:
+        """
+        Compacted copy of the pipeline, or None when the original should be kept: it does
+        not end in a random forest, sklearn's tree internals are unsupported, or no tree
+        subset stays within COMPACTION_TOLERANCE of the original on the selection rows.
+        """
+        forest = pipeline.steps[-1][1]
+        if not isinstance(forest, RandomForestRegressor):
+            logger.warning(f'Compaction applies to random forests only - {type(forest).__name__} left as is')
+            return None
+        try:
+            check_tree_internals(forest.estimators_[0].tree_)
+        except RuntimeError as e:
+            logger.warning(f'Compaction skipped - {e}')
+            return None
+        
+        features = list(self.config.CORNERSTONE_FEATURES)
+        sample = X_validation
+        targets = y_validation
+        if len(X_validation) > SELECTION_SAMPLE_ROWS:
+            sample = X_validation.sample(SELECTION_SAMPLE_ROWS, random_state=self.config.SEED_VALUE)
+            targets = y_validation.loc[sample.index]
+        validation_matrix = sample[features].to_numpy(dtype=np.float64)
+        targets = targets.to_numpy(dtype=np.float64)
+        
+        # Alternate rows order the trees and judge the prefixes
+        order_rows = np.arange(len(targets)) % 2 == 0
+        check_rows = ~order_rows
+        original_predictions = np.asarray(pipeline.predict(sample), dtype=np.float64)
+        original_check_rmse = float(np.sqrt(np.mean((original_predictions[check_rows] - targets[check_rows]) ** 2)))
+        target_rmse = original_check_rmse * (1.0 + self.config.COMPACTION_TOLERANCE)
+        
+        # Stage 1: prune every tree
+        n_features = forest.n_features_in_
+        pruned_estimators = []
+        for estimator in forest.estimators_:
+            pruned_estimator = copy.copy(estimator)
+            pruned_estimator.tree_ = prune_tree(
+                estimator.tree_, n_features, self.config.COMPACTION_LEAF_MERGE_DOLLARS, self.config.COMPACTION_MAX_DEPTH
+            )
+            pruned_estimators.append(pruned_estimator)
+        
+        # Stage 2: smallest subset of pruned trees within tolerance of the full forest
+        pruned_predictor = DirectForestPredictor(features, pipeline.steps[0][1].statistics_, pruned_estimators)
+        tree_outputs = pruned_predictor.predict_tree_outputs(validation_matrix.copy())
+        chosen, rmse_path = select_tree_subset(
+            tree_outputs[order_rows], targets[order_rows], tree_outputs[check_rows], targets[check_rows],
+            target_rmse, min(self.config.COMPACTION_MIN_TREES, len(pruned_estimators))
+        )
+        
+        compacted_forest = copy.copy(forest)
+        compacted_forest.estimators_ = [pruned_estimators[position] for position in chosen]
+        compacted_forest.set_params(n_estimators=len(chosen))
+        compacted_pipeline = Pipeline([pipeline.steps[0], (pipeline.steps[-1][0], compacted_forest)])
+        self.candidate_pipeline = compacted_pipeline
+        
+        self.compaction_report = {
+            'tolerance': self.config.COMPACTION_TOLERANCE,
+            'leaf_merge_dollars': self.config.COMPACTION_LEAF_MERGE_DOLLARS,
+            'max_depth': self.config.COMPACTION_MAX_DEPTH,
+            'selection_rows': len(targets),
+            'check_rmse_original': original_check_rmse,
+            'check_rmse_target': target_rmse,
+            'check_rmse_compacted': float(rmse_path[len(chosen) - 1]),
+            'within_tolerance': bool(rmse_path[len(chosen) - 1] <= target_rmse),
+            'kept_tree_positions': chosen,
+            **self.measure(pipeline, compacted_pipeline, validation_matrix, targets)
+        }
+        
+        original, compacted = self.compaction_report['original'], self.compaction_report['compacted']
+        logger.info(f"Compacted forest: {original['trees']} -> {compacted['trees']} trees, "
+                    f"{original['nodes']} -> {compacted['nodes']} nodes, "
+                    f"engine {original['engine_mb']:.1f} -> {compacted['engine_mb']:.1f} MB, "
+                    f"validation RMSE {original['rmse']:,.0f} -> {compacted['rmse']:,.0f}")
+        if not self.compaction_report['within_tolerance']:
+            logger.warning(f"No tree subset reached the RMSE target ({target_rmse:,.0f}, best "
+                           f"{self.compaction_report['check_rmse_compacted']:,.0f}) - keeping the original forest")
+            return None
+        return compacted_pipeline
+    
+    def measure(self, original_pipeline: Pipeline, compacted_pipeline: Pipeline, validation_matrix: np.ndarray,
+                targets: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """Size, compiled-engine predict latency and accuracy of both models"""
+        features = list(self.config.CORNERSTONE_FEATURES)
+        measurements = {}
+        for name, pipeline, quantize in (('original', original_pipeline, False), ('compacted', compacted_pipeline, True)):
+            engine = CompiledForestEngine.from_direct_predictor(
+                DirectForestPredictor.from_pipeline(pipeline, features), quantize=quantize
+            )
+            predictions = engine.predict_buffer(validation_matrix.copy())
+            estimators = pipeline.steps[-1][1].estimators_
+            measurements[name] = {
+                'trees': len(estimators),
+                'nodes': int(sum(estimator.tree_.node_count for estimator in estimators)),
+                'max_depth': int(max(estimator.tree_.max_depth for estimator in estimators)),
+                'pipeline_mb': len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6,
+                'engine_mb': engine.nbytes / 1e6,
+                'rmse': float(np.sqrt(np.mean((predictions - targets) ** 2))),
+                'single_row_ms': self._median_latency_ms(engine, validation_matrix[:1], repeats=200),
+                'batch_ms': self._median_latency_ms(engine, validation_matrix, repeats=5),
+                'batch_rows': len(validation_matrix)
+            }
+        return measurements
+    
+    @staticmethod
+    def _median_latency_ms(engine: CompiledForestEngine, feature_matrix: np.ndarray, repeats: int) -> float:
+        """Median wall time of engine.predict_buffer over a batch, after one warmup call"""
+        engine.predict_buffer(feature_matrix.copy())
+        samples = []
+        for _ in range(repeats):
+            buffer = feature_matrix.copy()
+            started = time.perf_counter()
+            engine.predict_buffer(buffer)
+            samples.append(time.perf_counter() - started)
+        return float(np.median(samples) * 1000.0)
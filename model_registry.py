@@ -0,0 +1,303 @@
+"""
+Cornerstone Versioned Model Registry
+====================================
+Content-addressed store of trained model versions plus the routing that serving
+reads: aliases and weighted traffic splits.
+
+Every published model gets its own directory named by the SHA-256 of its pipeline
+pickle, so one set of bytes always has one id and a version is never overwritten.
+Aliases ('production', 'region-north', ...) and traffic splits ('default' sending
+90% to one version and 10% to another) live in one small JSON file. Promoting a
+version, rolling it back or starting an A/B test is one atomic rewrite of that file.
+
+Layout:
+    model_registry/
+        routing.json                        aliases and traffic splits
+        models/<model_id>/manifest.json     features, metrics, training config, lineage
+        models/<model_id>/pipeline.pkl
+        models/<model_id>/forest_engine/    compiled engine (optional)
+
+Usage:
+    python model_registry.py list
+    python model_registry.py show MODEL
+    python model_registry.py alias NAME MODEL
+    python model_registry.py split NAME MODEL=WEIGHT [MODEL=WEIGHT ...]
+    python model_registry.py prune KEEP
+
+Components:
+- VersionedModelRegistry: Publish, inspect and route between model versions
+- choose_weighted_target: Deterministic (routing key) or random weighted choice
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import random
+import argparse
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def choose_weighted_target(weights: Dict[str, float], routing_key: Optional[str] = None, salt: str = '') -> str:
+    """
+    Pick one target with probability proportional to its weight.
+    A routing key (user, session or property id) maps to the same target every time
+    for unchanged weights, so a client sees one model throughout an A/B test.
+    """
+    targets = sorted(weights)
+    total_weight = sum(weights[target] for target in targets)
+    if routing_key is None:
+        position = random.random() * total_weight
+    else:
+        digest = hashlib.sha256(f'{salt}:{routing_key}'.encode('utf-8')).digest()
+        position = int.from_bytes(digest[:8], 'big') / 2 ** 64 * total_weight
+    
+    for target in targets:
+        position -= weights[target]
+        if position < 0:
+            return target
+    return targets[-1]
+
+
+# ==================== VERSIONED MODEL REGISTRY ====================
+class VersionedModelRegistry:
+    """
+    Directory-backed registry of immutable model versions.
+    Versions are staged in a temporary directory and renamed into place under their
+    content id, so readers only ever see complete versions. routing.json is rewritten
+    through a temporary file for the same reason.
+    """
+    
+    MODELS_DIRECTORY = 'models'
+    ROUTING_NAME = 'routing.json'
+    MANIFEST_NAME = 'manifest.json'
+    PIPELINE_NAME = 'pipeline.pkl'
+    ENGINE_NAME = 'forest_engine'
+    FORMAT_VERSION = 1
+    
+    def __init__(self, registry_root: str):
+        self.registry_root = registry_root
+        self.models_root = os.path.join(registry_root, self.MODELS_DIRECTORY)
+        self.routing_path = os.path.join(registry_root, self.ROUTING_NAME)
+    
+    # ---------- Publishing ----------
+    
+    def stage_version(self) -> str:
+        """Fresh directory to write a new version's artifacts into before commit_version"""
+        os.makedirs(self.models_root, exist_ok=True)
+        staging_directory = os.path.join(self.models_root, f'.staging-{os.getpid()}-{time.time_ns()}')
+        os.makedirs(staging_directory)
+        return staging_directory
+    
+    @staticmethod
+    def content_id(pipeline_path: str) -> str:
+        """Model id: leading 16 hex digits of the pipeline pickle's SHA-256"""
+        digest = hashlib.sha256()
+        with open(pipeline_path, 'rb') as pipeline_file:
+            for block in iter(lambda: pipeline_file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+    
+    def commit_version(self, staging_directory: str, manifest: Dict[str, Any]) -> str:
+        """
+        Write the manifest and move a staged version to models/<model_id>.
+        Publishing identical bytes again is a no-op that returns the existing id.
+        """
+        model_id = self.content_id(os.path.join(staging_directory, self.PIPELINE_NAME))
+        model_directory = self.model_directory(model_id)
+        if os.path.isdir(model_directory):
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            logger.info(f'Model version {model_id} already registered')
+            return model_id
+        
+        manifest = {
+            'format': 'cornerstone-model-version',
+            'format_version': self.FORMAT_VERSION,
+            'model_id': model_id,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            **manifest,
+            'artifacts': {
+                'pipeline': self.PIPELINE_NAME,
+                'engine': self.ENGINE_NAME if os.path.isdir(os.path.join(staging_directory, self.ENGINE_NAME)) else None
+            }
+        }
+        with open(os.path.join(staging_directory, self.MANIFEST_NAME), 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, default=str)
+        
+        os.replace(staging_directory, model_directory)
+        logger.info(f'Model version {model_id} registered at {model_directory}')
+        return model_id
+    
+    # ---------- Reading versions ----------
+    
+    def model_directory(self, model_id: str) -> str:
+        """Directory of one model version"""
+        return os.path.join(self.models_root, model_id)
+    
+    def has_version(self, model_id: str) -> bool:
+        """Whether a committed version with this id exists"""
+        return os.path.isfile(os.path.join(self.model_directory(model_id), self.MANIFEST_NAME))
+    
+    def read_manifest(self, model_id: str) -> Dict[str, Any]:
+        """Manifest of one version"""
+        with open(os.path.join(self.model_directory(model_id), self.MANIFEST_NAME)) as manifest_file:
+            return json.load(manifest_file)
+    
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Manifests of every committed version, oldest first"""
+        if not os.path.isdir(self.models_root):
+            return []
+        manifests = [self.read_manifest(entry) for entry in os.listdir(self.models_root)
+                     if not entry.startswith('.') and self.has_version(entry)]
+        return sorted(manifests, key=lambda manifest: manifest['created_at'])
+    
+    def routed_versions(self, routing: Optional[Dict[str, Any]] = None) -> set:
+        """Model ids an alias or a traffic split currently points at"""
+        routing = routing or self.read_routing()
+        references = list(routing['aliases'].values())
+        for weights in routing['traffic_splits'].values():
+            references.extend(weights)
+        return {model_id for model_id in (self.resolve(reference, routing) for reference in references) if model_id}
+    
+    def prune_versions(self, keep_latest: int) -> List[str]:
+        """
+        Delete all but the keep_latest newest versions. Versions an alias or traffic split
+        routes to are always kept. Returns the removed model ids, oldest first.
+        """
+        routed = self.routed_versions()
+        versions = [manifest['model_id'] for manifest in self.list_versions()]
+        expired = [model_id for model_id in versions[:max(len(versions) - keep_latest, 0)] if model_id not in routed]
+        
+        for model_id in expired:
+            # Renamed out of models/ first, so readers never see a half-deleted version
+            retired_directory = os.path.join(self.models_root, f'.retired-{model_id}-{os.getpid()}')
+            os.replace(self.model_directory(model_id), retired_directory)
+            shutil.rmtree(retired_directory, ignore_errors=True)
+            logger.info(f'Model version {model_id} pruned')
+        return expired
+    
+    # ---------- Routing ----------
+    
+    def read_routing(self) -> Dict[str, Any]:
+        """Aliases and traffic splits; empty when nothing has been routed yet"""
+        try:
+            with open(self.routing_path) as routing_file:
+                routing = json.load(routing_file)
+        except FileNotFoundError:
+            routing = {}
+        return {'aliases': routing.get('aliases', {}), 'traffic_splits': routing.get('traffic_splits', {})}
+    
+    def routing_signature(self) -> Optional[tuple]:
+        """Cheap change marker for routing.json (mtime and size)"""
+        try:
+            status = os.stat(self.routing_path)
+        except FileNotFoundError:
+            return None
+        return status.st_mtime_ns, status.st_size
+    
+    def _write_routing(self, routing: Dict[str, Any]):
+        """Replace routing.json atomically"""
+        os.makedirs(self.registry_root, exist_ok=True)
+        staging_path = f'{self.routing_path}.tmp-{os.getpid()}'
+        with open(staging_path, 'w') as routing_file:
+            json.dump(routing, routing_file, indent=2, sort_keys=True)
+        os.replace(staging_path, self.routing_path)
+    
+    def resolve(self, reference: str, routing: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Model id for an alias or a model id, or None when neither exists"""
+        routing = routing or self.read_routing()
+        model_id = routing['aliases'].get(reference, reference)
+        return model_id if self.has_version(model_id) else None
+    
+    def assign_alias(self, alias: str, reference: str):
+        """Point an alias at a model id (or at another alias's current model)"""
+        routing = self.read_routing()
+        model_id = self.resolve(reference, routing)
+        if model_id is None:
+            raise KeyError(f'Unknown model {reference!r}')
+        routing['aliases'][alias] = model_id
+        self._write_routing(routing)
+        logger.info(f'Alias {alias!r} -> {model_id}')
+    
+    def set_traffic_split(self, split_name: str, weights: Dict[str, float]):
+        """Route a split across models by weight; references may be ids or aliases"""
+        if not weights or any(weight < 0 for weight in weights.values()) or sum(weights.values()) <= 0:
+            raise ValueError('Traffic split weights must be non-negative with a positive total')
+        
+        routing = self.read_routing()
+        for reference in weights:
+            if self.resolve(reference, routing) is None:
+                raise KeyError(f'Unknown model {reference!r}')
+        routing['traffic_splits'][split_name] = dict(weights)
+        self._write_routing(routing)
+        logger.info(f'Traffic split {split_name!r}: {weights}')
+    
+    def remove_traffic_split(self, split_name: str):
+        """Stop routing a split (requests fall back to the default model)"""
+        routing = self.read_routing()
+        if routing['traffic_splits'].pop(split_name, None) is not None:
+            self._write_routing(routing)
+
+
+# ==================== COMMAND LINE ====================
+def main(argv: List[str] = None):
+    """Inspect the registry and edit aliases and traffic splits"""
+    parser = argparse.ArgumentParser(description='Cornerstone model registry')
+    parser.add_argument('--registry', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_registry'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='registered versions, aliases and splits')
+    show = commands.add_parser('show', help='manifest of one version')
+    show.add_argument('model')
+    alias = commands.add_parser('alias', help='point an alias at a version')
+    alias.add_argument('name')
+    alias.add_argument('model')
+    split = commands.add_parser('split', help='set a weighted traffic split (no weights removes it)')
+    split.add_argument('name')
+    split.add_argument('weights', nargs='*', metavar='MODEL=WEIGHT')
+    prune = commands.add_parser('prune', help='delete old versions no alias or split routes to')
+    prune.add_argument('keep', type=int, help='newest versions to keep')
+    args = parser.parse_args(argv)
+    
+    registry = VersionedModelRegistry(args.registry)
+    try:
+        if args.command == 'list':
+            routing = registry.read_routing()
+            for manifest in registry.list_versions():
+                aliases = sorted(name for name, target in routing['aliases'].items() if target == manifest['model_id'])
+                rmse = (manifest.get('metrics') or {}).get('rmse')
+                print(f"{manifest['model_id']}  {manifest['created_at']}  "
+                      f"rmse={rmse if rmse is None else round(rmse, 2)}  aliases={','.join(aliases) or '-'}")
+            for split_name, weights in routing['traffic_splits'].items():
+                print(f'split {split_name}: ' + ', '.join(f'{target}={weight:g}' for target, weight in weights.items()))
+        elif args.command == 'show':
+            model_id = registry.resolve(args.model)
+            if model_id is None:
+                raise KeyError(f'Unknown model {args.model!r}')
+            print(json.dumps(registry.read_manifest(model_id), indent=2))
+        elif args.command == 'alias':
+            registry.assign_alias(args.name, args.model)
+        elif args.command == 'split':
+            if not args.weights:
+                registry.remove_traffic_split(args.name)
+            else:
+                weights = {}
+                for entry in args.weights:
+                    reference, _, weight = entry.partition('=')
+                    weights[reference] = float(weight)
+                registry.set_traffic_split(args.name, weights)
+        elif args.command == 'prune':
+            for model_id in registry.prune_versions(args.keep):
+                print(f'removed {model_id}')
+    except (KeyError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    main()
@@ -0,0 +1,283 @@
+"""
+Cornerstone Service Metrics
+===========================
+Dependency-free counters, gauges and histograms rendered in the Prometheus text
+exposition format (version 0.0.4).
+
+Recording is a dictionary update plus, for histograms, one bisect over the bucket
+bounds, all under a per-metric lock. It is cheap enough for every request on the
+hot path; formatting happens only when /metrics is scraped.
+
+Components:
+- Counter / Gauge / Histogram: labelled metric families
+- MetricsRegistry: owns the families, runs scrape-time collectors and renders text
+- RequestStageTimer: per-request stage durations, also rendered as a Server-Timing header
+"""
+
+import math
+import time
+import threading
+from contextlib import contextmanager
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Request latencies from sub-millisecond cache hits up to multi-second batch scoring
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (label values, sample value) pairs reported by a scrape-time collector
+Samples = List[Tuple[Tuple[str, ...], float]]
+
+
+def format_sample_value(value: float) -> str:
+    """Prometheus float formatting, including the special values"""
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    """Render {name="value",...} with the exposition format's escaping"""
+    if not label_names:
+        return ''
+    escaped = (
+        str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        for value in label_values
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(label_names, escaped)) + '}'
+
+
+# ==================== METRIC FAMILIES ====================
+class MetricFamily:
+    """
+    Shared base of the labelled metric types.
+    Label values are passed positionally, in label_names order.
+    """
+    
+    metric_type = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+    
+    def _check_labels(self, label_values: Tuple[str, ...]):
+        """Reject label tuples that do not match the declared label names"""
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f'{self.name} expects labels {self.label_names}, got {label_values}')
+    
+    def header_lines(self) -> List[str]:
+        """HELP and TYPE lines that precede the samples"""
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+    
+    def render(self) -> List[str]:
+        """Exposition lines for every labelled child"""
+        raise NotImplementedError
+
+
+class Counter(MetricFamily):
+    """Monotonically increasing total per label set"""
+    
+    metric_type = 'counter'
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, label_values: Tuple[str, ...] = (), amount: float = 1.0):
+        """Add a non-negative amount to one label set"""
+        if amount < 0:
+            raise ValueError('Counters can only increase')
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+    
+    def set_total(self, value: float, label_values: Tuple[str, ...] = ()):
+        """Mirror a monotonically increasing count that is owned and incremented elsewhere"""
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = float(value)
+    
+    def value(self, label_values: Tuple[str, ...] = ()) -> float:
+        """Current total of one label set"""
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+    
+    def render(self) -> List[str]:
+        """Exposition lines for every labelled child"""
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header_lines() + [
+            f'{self.name}{format_labels(self.label_names, labels)} {format_sample_value(value)}'
+            for labels, value in values
+        ]
+
+
+class Gauge(MetricFamily):
+    """Point-in-time value per label set"""
+    
+    metric_type = 'gauge'
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def set(self, value: float, label_values: Tuple[str, ...] = ()):
+        """Replace the value of one label set"""
+        self._check_labels(label_values)
+        with self._lock:
+            self._values[label_values] = float(value)
+    
+    def replace_all(self, samples: Samples):
+        """Swap every labelled value at once, e.g. an info metric whose labels change"""
+        for label_values, _ in samples:
+            self._check_labels(label_values)
+        with self._lock:
+            self._values = {label_values: float(value) for label_values, value in samples}
+    
+    def render(self) -> List[str]:
+        """Exposition lines for every labelled child"""
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header_lines() + [
+            f'{self.name}{format_labels(self.label_names, labels)} {format_sample_value(value)}'
+            for labels, value in values
+        ]
+
+
+class Histogram(MetricFamily):
+    """
+    Fixed-bucket distribution per label set.
+    Only per-bucket counts are stored; cumulative counts are computed at render time.
+    """
+    
+    metric_type = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+    
+    def observe(self, value: float, label_values: Tuple[str, ...] = ()):
+        """Record one observation; a value equal to a bound falls in that bucket (le)"""
+        self._check_labels(label_values)
+        bucket_index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0.0
+            counts[bucket_index] += 1
+            self._sums[label_values] += value
+    
+    def count(self, label_values: Tuple[str, ...] = ()) -> int:
+        """Number of observations recorded for one label set"""
+        with self._lock:
+            return sum(self._counts.get(label_values, ()))
+    
+    def render(self) -> List[str]:
+        """Exposition lines: cumulative buckets, +Inf, _sum and _count per label set"""
+        with self._lock:
+            snapshot = sorted((labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items())
+        
+        lines = self.header_lines()
+        bucket_label_names = self.label_names + ('le',)
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                bucket_labels = format_labels(bucket_label_names, labels + (format_sample_value(bound),))
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            label_text = format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {format_sample_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+# ==================== METRICS REGISTRY ====================
+class MetricsRegistry:
+    """
+    Named collection of metric families plus scrape-time collectors.
+    Collectors refresh gauges that mirror state owned elsewhere (active model,
+    cache counters) right before rendering, so the hot path never updates them.
+    """
+    
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self, namespace: str = 'cornerstone'):
+        self.namespace = namespace
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        """Add a family, returning the existing one when the name is already registered"""
+        with self._lock:
+            existing = self._families.get(family.name)
+            if existing is not None:
+                if type(existing) is not type(family) or existing.label_names != family.label_names:
+                    raise ValueError(f'Metric {family.name} already registered with a different shape')
+                return existing
+            self._families[family.name] = family
+            return family
+    
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Register (or fetch) a counter family"""
+        return self._register(Counter(f'{self.namespace}_{name}', documentation, label_names))
+    
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        """Register (or fetch) a gauge family"""
+        return self._register(Gauge(f'{self.namespace}_{name}', documentation, label_names))
+    
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Optional[Iterable[float]] = None) -> Histogram:
+        """Register (or fetch) a histogram family"""
+        return self._register(Histogram(
+            f'{self.namespace}_{name}', documentation, label_names,
+            tuple(buckets) if buckets is not None else DEFAULT_LATENCY_BUCKETS
+        ))
+    
+    def register_collector(self, collector: Callable[[], None]):
+        """Run a callback before every render to refresh mirrored gauges"""
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """Full exposition document"""
+        for collector in self._collectors:
+            collector()
+        
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda family: family.name)
+        lines = []
+        for family in families:
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+# ==================== REQUEST STAGE TIMING ====================
+class RequestStageTimer:
+    """
+    Wall-clock breakdown of one prediction request into named stages.
+    Renders as a W3C Server-Timing header, which browsers' network panels and the
+    serving benchmark read without any extra endpoint.
+    """
+    
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+    
+    @contextmanager
+    def measure(self, stage: str):
+        """Accumulate the duration of the enclosed block under a stage name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.perf_counter() - started
+    
+    def server_timing_header(self) -> str:
+        """Durations in Server-Timing syntax (milliseconds)"""
+        return ', '.join(f'{stage};dur={seconds * 1000.0:.3f}' for stage, seconds in self.durations.items())
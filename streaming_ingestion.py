@@ -0,0 +1,233 @@
+"""
+Cornerstone Streaming Ingestion
+===============================
+Chunked loading of training CSVs that are far larger than memory.
+
+The in-memory path reads every column of train.csv into pandas, copies the model
+columns out and imputes them, so peak memory is several times the raw file. This
+module reads only the model columns in compact dtypes, one chunk at a time, routes
+each row to the training or validation partition as it arrives, and estimates the
+imputation medians with a bounded-memory quantile sketch.
+
+Components:
+- StreamingQuantileSketch: KLL-style mergeable-compactor sketch; exact until the
+  stream outgrows its capacity, then rank error shrinks with the capacity
+- StreamingDatasetIngestor: Single-pass chunked reader producing float32 training
+  and validation partitions
+"""
+
+import os
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== QUANTILE SKETCH ====================
+class StreamingQuantileSketch:
+    """
+    Approximate quantiles of an unbounded stream in O(capacity) memory.
+    Items are kept in levels where an item at level h stands for 2**h observations.
+    A level that overflows is sorted and every other item (random offset) is promoted
+    one level up, so total weight is preserved and the retained items stay an
+    unbiased sample of the ranks.
+    """
+    
+    # Floor on the capacity of the lowest levels, which shrink geometrically
+    MINIMUM_LEVEL_CAPACITY = 8
+    
+    def __init__(self, capacity: int = 2048, seed: int = 11):
+        self.capacity = capacity
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._random = np.random.default_rng(seed)
+    
+    def update(self, values: np.ndarray):
+        """Add a chunk of observations; NaN values are ignored like pandas.median"""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+    
+    def _level_capacity(self, level: int) -> int:
+        """Top level holds capacity items; each level below holds two thirds of the next"""
+        depth = len(self.levels) - 1 - level
+        return max(self.MINIMUM_LEVEL_CAPACITY, int(self.capacity * (2.0 / 3.0) ** depth))
+    
+    def _compact(self):
+        """Promote half of every overflowing level until all levels fit"""
+        level = 0
+        while level < len(self.levels):
+            if self.levels[level].size > self._level_capacity(level):
+                items = np.sort(self.levels[level])
+                
+                # An odd item out stays behind so the promoted pairs keep total weight exact
+                retained = items[-1:] if items.size % 2 else items[:0]
+                items = items[:items.size - retained.size]
+                promoted = items[int(self._random.integers(2))::2]
+                
+                self.levels[level] = retained
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+    
+    @property
+    def is_exact(self) -> bool:
+        """True while no item has been compacted away"""
+        return len(self.levels) == 1
+    
+    @property
+    def retained_items(self) -> int:
+        """Number of items currently held across all levels"""
+        return int(sum(level.size for level in self.levels))
+    
+    def value_at_rank(self, rank: int) -> float:
+        """Estimated value of the observation at 0-based rank in sorted order"""
+        if not self.count:
+            return float('nan')
+        
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** height) for height, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative_weight = np.cumsum(weights[order])
+        position = min(int(np.searchsorted(cumulative_weight, rank, side='right')), values.size - 1)
+        return float(values[order][position])
+    
+    def quantile(self, fraction: float) -> float:
+        """Estimated quantile at the given fraction (0 = minimum, 1 = maximum)"""
+        return self.value_at_rank(int(round(fraction * (self.count - 1))))
+    
+    def median(self) -> float:
+        """Median with pandas semantics: mean of the two middle ranks for even counts"""
+        lower = self.value_at_rank((self.count - 1) // 2)
+        upper = self.value_at_rank(self.count // 2)
+        return (lower + upper) / 2.0
+
+
+# ==================== STREAMING DATASET INGESTOR ====================
+class StreamingDatasetIngestor:
+    """
+    Reads a training CSV chunk by chunk into compact train/validation partitions.
+    Only the model columns are parsed, using explicit dtypes. Each chunk is split
+    with a seeded Bernoulli draw per row and discarded. Partitions are assembled one
+    column at a time into preallocated float32 matrices, so peak memory stays close
+    to the size of the final arrays.
+    """
+    
+    def __init__(self, dataset_path: str, feature_columns: List[str], target_column: str,
+                 column_dtypes: Dict[str, str], chunk_rows: int = 250000,
+                 test_proportion: float = 0.2, seed: int = 11, sketch_capacity: int = 2048):
+        self.dataset_path = dataset_path
+        self.feature_columns = list(feature_columns)
+        self.target_column = target_column
+        self.column_dtypes = dict(column_dtypes)
+        self.chunk_rows = chunk_rows
+        self.test_proportion = test_proportion
+        self.seed = seed
+        self.sketch_capacity = sketch_capacity
+        self.imputation_medians: Dict[str, float] = {}
+        self.ingestion_report: Dict = {}
+    
+    def _validate_columns(self):
+        """Check the CSV header before streaming so a missing column fails fast"""
+        if not os.path.exists(self.dataset_path):
+            raise FileNotFoundError(f'Training data not found at {self.dataset_path}')
+        
+        header = pd.read_csv(self.dataset_path, nrows=0).columns
+        missing_columns = set(self.feature_columns + [self.target_column]) - set(header)
+        if missing_columns:
+            raise ValueError(f'Missing features in dataset: {missing_columns}')
+    
+    def _read_csv_chunks(self, columns: List[str]) -> Iterator[Dict[str, np.ndarray]]:
+        """Parse only the model columns of the CSV, chunk_rows records at a time"""
+        self._validate_columns()
+        dtypes = {column: self.column_dtypes.get(column, 'float32') for column in columns}
+        
+        logger.info(f'Streaming {self.dataset_path} in chunks of {self.chunk_rows} rows')
+        with pd.read_csv(self.dataset_path, usecols=columns, dtype=dtypes, chunksize=self.chunk_rows) as reader:
+            for chunk in reader:
+                yield {column: chunk[column].to_numpy() for column in columns}
+    
+    def ingest(self, chunks: Optional[Iterable[Dict[str, np.ndarray]]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+        """
+        Stream the data once and return (X_train, X_test, y_train, y_test).
+        chunks overrides the CSV reader with pre-parsed column chunks, such as those
+        of a columnar cache.
+        """
+        columns = self.feature_columns + [self.target_column]
+        if chunks is None:
+            chunks = self._read_csv_chunks(columns)
+        
+        partitions = {
+            'train': {column: [] for column in columns},
+            'validation': {column: [] for column in columns}
+        }
+        sketches = {column: StreamingQuantileSketch(self.sketch_capacity, self.seed) for column in columns}
+        split_random = np.random.default_rng(self.seed)
+        total_rows, chunk_count = 0, 0
+        
+        for chunk in chunks:
+            chunk_size = chunk[self.target_column].size
+            validation_rows = split_random.random(chunk_size) < self.test_proportion
+            for column in columns:
+                values = chunk[column]
+                sketches[column].update(values)
+                partitions['train'][column].append(values[~validation_rows])
+                partitions['validation'][column].append(values[validation_rows])
+            
+            total_rows += chunk_size
+            chunk_count += 1
+        
+        # Medians over the whole file, matching the in-memory path's impute-then-split order
+        self.imputation_medians = {column: sketches[column].median() for column in columns}
+        
+        X_train, y_train = self._assemble_partition(partitions['train'])
+        X_test, y_test = self._assemble_partition(partitions['validation'])
+        
+        self.ingestion_report = {
+            'rows': total_rows,
+            'chunks': chunk_count,
+            'training_rows': len(X_train),
+            'validation_rows': len(X_test),
+            'partition_mb': (X_train.to_numpy().nbytes + X_test.to_numpy().nbytes
+                             + y_train.to_numpy().nbytes + y_test.to_numpy().nbytes) / 1e6,
+            'medians': self.imputation_medians,
+            'exact_medians': all(sketch.is_exact for sketch in sketches.values())
+        }
+        logger.info(f'Streamed {total_rows} records in {chunk_count} chunks: '
+                    f'{len(X_train)} training, {len(X_test)} validation records')
+        return X_train, X_test, y_train, y_test
+    
+    def _assemble_partition(self, column_chunks: Dict[str, List[np.ndarray]]) -> Tuple[pd.DataFrame, pd.Series]:
+        """Concatenate and impute one column at a time, releasing its chunks as it goes"""
+        row_count = int(sum(values.size for values in column_chunks[self.target_column]))
+        
+        # Column-major so pandas wraps the matrix as a single block without copying
+        feature_matrix = np.empty((row_count, len(self.feature_columns)), dtype=np.float32, order='F')
+        for position, column in enumerate(self.feature_columns):
+            self._fill_column(feature_matrix[:, position], column_chunks.pop(column), self.imputation_medians[column])
+        
+        target = np.empty(row_count, dtype=np.float32)
+        self._fill_column(target, column_chunks.pop(self.target_column), self.imputation_medians[self.target_column])
+        
+        return (
+            pd.DataFrame(feature_matrix, columns=self.feature_columns, copy=False),
+            pd.Series(target, name=self.target_column, copy=False)
+        )
+    
+    @staticmethod
+    def _fill_column(destination: np.ndarray, chunks: List[np.ndarray], median: float):
+        """Copy chunk values into a preallocated column and fill gaps with the median"""
+        offset = 0
+        while chunks:
+            values = chunks.pop(0)
+            destination[offset:offset + values.size] = values
+            offset += values.size
+        destination[np.isnan(destination)] = median
@@ -0,0 +1,91 @@
+"""
+Shared fixtures for the Cornerstone test suite.
+The modules under test live at the repository root, next to app.py and model.py.
+"""
+
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+from app import CornerstoneApiServer, CornerstoneServiceConfig  # noqa: E402
+from model import CornerstoneModelConfig, PredictorEnsembleBuilder  # noqa: E402
+
+FEATURE_NAMES = ['OverallQual', 'GrLivArea', 'YearBuilt', 'TotalBsmtSF', 'FullBath', 'BedroomAbvGr', 'GarageCars']
+
+
+def synthetic_sales(row_count: int, seed: int = 0):
+    """Integer-valued house features with a few missing values, and a price depending on them"""
+    generator = np.random.default_rng(seed)
+    features = pd.DataFrame({
+        'OverallQual': generator.integers(1, 11, row_count),
+        'GrLivArea': generator.integers(400, 4000, row_count),
+        'YearBuilt': generator.integers(1880, 2010, row_count),
+        'TotalBsmtSF': generator.integers(0, 3000, row_count),
+        'FullBath': generator.integers(0, 4, row_count),
+        'BedroomAbvGr': generator.integers(0, 7, row_count),
+        'GarageCars': generator.integers(0, 5, row_count),
+    }).astype(np.float64)
+    
+    price = (20000 * features['OverallQual'] + 60 * features['GrLivArea'] + 400 * (features['YearBuilt'] - 1880)
+             + 25 * features['TotalBsmtSF'] + 8000 * features['GarageCars'] + generator.normal(0, 15000, row_count))
+    
+    # Missing basement and garage values, as in the Kaggle data
+    features.loc[generator.random(row_count) < 0.05, 'TotalBsmtSF'] = np.nan
+    features.loc[generator.random(row_count) < 0.05, 'GarageCars'] = np.nan
+    return features, price
+
+
+def fit_pipeline(features: pd.DataFrame, price: pd.Series, **forest_parameters) -> Pipeline:
+    """
+    Imputer + forest pipeline built by model.py's PredictorEnsembleBuilder, on the
+    median-filled frame the training script hands it, so the forest keeps feature names
+    """
+    config = CornerstoneModelConfig(TREE_COUNT=25, TRAINING_JOBS=1).with_forest_parameters(forest_parameters)
+    filled_features = features.fillna(features.median())
+    
+    builder = PredictorEnsembleBuilder(config)
+    builder.construct_forest(filled_features, price)
+    builder.build_inference_pipeline(filled_features)
+    return builder.inference_pipeline
+
+
+def serve_pipeline(artifact_directory, pipeline, **config_overrides) -> CornerstoneApiServer:
+    """API server serving the pipeline from artifact_directory, with the reload watcher off"""
+    joblib.dump(pipeline, artifact_directory / 'pipeline.pkl')
+    joblib.dump(FEATURE_NAMES, artifact_directory / 'model_columns.pkl')
+    config = CornerstoneServiceConfig(ARTIFACT_DIRECTORY=str(artifact_directory), MODEL_RELOAD_INTERVAL_SECONDS=0,
+                                      **config_overrides)
+    return CornerstoneApiServer(REPOSITORY_DIRECTORY, config)
+
+
+@pytest.fixture(scope='session')
+def training_sales():
+    return synthetic_sales(400)
+
+
+@pytest.fixture(scope='session')
+def fitted_pipeline(training_sales):
+    return fit_pipeline(*training_sales)
+
+
+@pytest.fixture(scope='session')
+def probe_frames(training_sales):
+    """Training rows, rows with missing values and random rows far outside the training range"""
+    features, _ = training_sales
+    generator = np.random.default_rng(7)
+    
+    with_missing = features.iloc[:60].copy()
+    mask = generator.random(with_missing.shape) < 0.3
+    with_missing = with_missing.mask(mask)
+    with_missing.iloc[0] = np.nan
+    
+    out_of_range = pd.DataFrame(generator.uniform(-1e5, 1e5, (200, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+    return {'training': features, 'missing': with_missing, 'out_of_range': out_of_range}
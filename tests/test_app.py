@@ -0,0 +1,133 @@
+"""
+Batch endpoint tests: point predictions and uncertainty mode against Pipeline.predict.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import InvalidPredictionRequestError
+from conftest import FEATURE_NAMES, serve_pipeline
+from inference_engine import canonical_feature_keys
+
+
+@pytest.fixture()
+def api_server(tmp_path, fitted_pipeline):
+    return serve_pipeline(tmp_path, fitted_pipeline)
+
+
+@pytest.fixture()
+def batch_client(api_server):
+    return api_server.app.test_client()
+
+
+@pytest.fixture()
+def instances(training_sales):
+    features, _ = training_sales
+    return features.iloc[:5].fillna(0).to_dict(orient='records')
+
+
+def test_batch_point_predictions(batch_client, fitted_pipeline, instances):
+    response = batch_client.post('/cornerstone-predict/batch', json={'instances': instances})
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    assert 'uncertainty' not in body
+    expected = fitted_pipeline.predict(pd.DataFrame(instances)[FEATURE_NAMES])
+    assert np.array_equal(body['predictions'], expected)
+
+
+@pytest.mark.parametrize('options', [
+    {'uncertainty': True},
+    {'uncertainty': True, 'quantiles': [0.25, 0.5, 0.75]},
+    {'quantiles': [0.25, 0.5, 0.75]},
+], ids=['uncertainty', 'uncertainty_with_quantiles', 'quantiles_only'])
+def test_batch_uncertainty_mode(batch_client, fitted_pipeline, instances, options):
+    response = batch_client.post('/cornerstone-predict/batch', json={'instances': instances, **options})
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    expected_levels = ['0.25', '0.5', '0.75'] if 'quantiles' in options else ['0.1', '0.9']
+    assert [sorted(row['quantiles'], key=float) for row in body['uncertainty']] == [expected_levels] * len(instances)
+    expected = fitted_pipeline.predict(pd.DataFrame(instances)[FEATURE_NAMES])
+    assert np.array_equal(body['predictions'], expected)
+
+
+def test_batch_rejects_invalid_quantiles(batch_client, instances):
+    response = batch_client.post('/cornerstone-predict/batch', json={'instances': instances, 'quantiles': [1.5]})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('bad_value', [float('inf'), '-inf', 'inf', 1e300],
+                         ids=['inf', 'negative_inf_string', 'inf_string', 'float32_overflow'])
+def test_batch_rejects_values_beyond_float32(batch_client, fitted_pipeline, instances, bad_value):
+    rows = [dict(row) for row in instances]
+    rows[2]['GrLivArea'] = bad_value
+    response = batch_client.post('/cornerstone-predict/batch', data=json.dumps({'instances': rows}),
+                                 content_type='application/json')
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [error['row'] for error in body['errors']] == [2]
+    expected = fitted_pipeline.predict(pd.DataFrame(instances)[FEATURE_NAMES]).tolist()
+    expected[2] = None
+    assert body['predictions'] == expected
+
+
+def test_batch_columns_reject_values_beyond_float32(batch_client):
+    columns = {feature: [1.0, 2.0, 3.0] for feature in FEATURE_NAMES}
+    columns['GrLivArea'] = [1.0, 'inf', 1e300]
+    response = batch_client.post('/cornerstone-predict/batch', json={'columns': columns})
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [error['row'] for error in body['errors']] == [1, 2]
+    assert body['rows_predicted'] == 1
+
+
+def test_frame_prediction_aligns_shuffled_columns(api_server, fitted_pipeline, training_sales):
+    features, _ = training_sales
+    row = features.iloc[[3]]
+    bridge = api_server.inference_bridge
+    assert bridge.active_model.direct_predictor is not None
+    
+    shuffled = row[list(reversed(FEATURE_NAMES))]
+    assert bridge.generate_prediction(shuffled) == fitted_pipeline.predict(row)[0]
+    assert bridge.generate_prediction(row) == fitted_pipeline.predict(row)[0]
+
+
+def test_frame_prediction_rejects_missing_features(api_server, training_sales):
+    features, _ = training_sales
+    with pytest.raises(InvalidPredictionRequestError, match='GarageCars'):
+        api_server.inference_bridge.generate_prediction(features.iloc[[0], :-1])
+
+
+@pytest.mark.parametrize('direct_inference', [True, False], ids=['direct', 'pipeline'])
+def test_cache_hits_match_misses(tmp_path, fitted_pipeline, probe_frames, direct_inference):
+    bridge = serve_pipeline(tmp_path, fitted_pipeline, DIRECT_INFERENCE_ENABLED=direct_inference).inference_bridge
+    frame = pd.concat([probe_frames['training'].iloc[:20], probe_frames['missing']], ignore_index=True)
+    matrix = frame.to_numpy(dtype=np.float64, copy=True)
+    # A row whose zeros are negative must share the prediction and the key of its positive twin
+    signed_zero = np.nan_to_num(matrix[[0]], nan=0.0)
+    signed_zero[0, [3, 6]] = 0.0
+    negative_zero = signed_zero.copy()
+    negative_zero[0, [3, 6]] = -0.0
+    matrix = np.vstack([matrix, signed_zero, negative_zero])
+    expected = fitted_pipeline.predict(pd.DataFrame(matrix, columns=FEATURE_NAMES))
+    
+    misses = bridge.generate_batch_predictions(matrix.copy(), FEATURE_NAMES)
+    hits = bridge.generate_batch_predictions(matrix.copy(), FEATURE_NAMES)
+    
+    assert bridge.prediction_cache.statistics()['hits'] >= len(matrix)
+    assert np.array_equal(misses, expected)
+    assert np.array_equal(hits, expected)
+
+
+def test_cache_keys_separate_column_layouts():
+    row = np.array([[7.0, 1500.0]])
+    assert canonical_feature_keys(row, feature_columns=['OverallQual', 'GrLivArea']) != \
+        canonical_feature_keys(row, feature_columns=['GrLivArea', 'OverallQual'])
+    assert canonical_feature_keys(row, feature_columns=['OverallQual', 'GrLivArea']) == \
+        canonical_feature_keys(row.copy(), feature_columns=['OverallQual', 'GrLivArea'])
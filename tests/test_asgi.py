@@ -0,0 +1,148 @@
+"""
+Async front-end tests: admission control, slot release on errors and graceful draining.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from cornerstone_asgi import AsyncHttpServer, CornerstoneAsgiApplication
+from conftest import serve_pipeline
+
+
+@pytest.fixture()
+def batch_body(training_sales):
+    features, _ = training_sales
+    return json.dumps({'instances': features.iloc[:3].fillna(0).to_dict(orient='records')}).encode('utf-8')
+
+
+@pytest.fixture()
+def gated_application(tmp_path, fitted_pipeline, monkeypatch):
+    """
+    Application over one in-flight slot whose batch scoring blocks until released.
+    Returns the application, the event set once scoring started and the release event.
+    """
+    api_server = serve_pipeline(tmp_path, fitted_pipeline, ASYNC_MAX_IN_FLIGHT=1)
+    scoring_started, release_scoring = threading.Event(), threading.Event()
+    score_batch_payload = api_server.score_batch_payload
+    
+    def gated_score_batch_payload(*args, **kwargs):
+        scoring_started.set()
+        release_scoring.wait(10)
+        return score_batch_payload(*args, **kwargs)
+    
+    monkeypatch.setattr(api_server, 'score_batch_payload', gated_score_batch_payload)
+    return CornerstoneAsgiApplication(api_server), scoring_started, release_scoring
+
+
+async def call_application(application, path: str, body: bytes, content_type: bytes = b'application/json'):
+    """Send one POST through the ASGI interface; returns status, headers and body"""
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': b'',
+             'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode('latin-1'))]}
+    request_messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    response = {'status': None, 'headers': {}, 'body': b''}
+    
+    async def receive():
+        return request_messages.pop() if request_messages else {'type': 'http.disconnect'}
+    
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = dict(message['headers'])
+        else:
+            response['body'] += message.get('body', b'')
+    
+    await application(scope, receive, send)
+    return response['status'], response['headers'], response['body']
+
+
+async def wait_for_event(event: threading.Event):
+    while not event.is_set():
+        await asyncio.sleep(0.005)
+
+
+def test_saturated_server_answers_503(gated_application, batch_body):
+    application, scoring_started, release_scoring = gated_application
+    
+    async def scenario():
+        admitted = asyncio.create_task(call_application(application, '/cornerstone-predict/batch', batch_body))
+        await asyncio.wait_for(wait_for_event(scoring_started), 10)
+        
+        status, headers, _ = await call_application(application, '/cornerstone-predict/batch', batch_body)
+        assert status == 503
+        assert headers[b'retry-after'] == b'1'
+        
+        release_scoring.set()
+        status, _, body = await asyncio.wait_for(admitted, 10)
+        assert status == 200
+        assert json.loads(body)['rows_predicted'] == 3
+        
+        assert application.limiter.in_flight == 0 and application.limiter.rejected == 1
+        await application.shutdown()
+    
+    asyncio.run(scenario())
+
+
+def test_slot_is_released_when_the_handler_raises(tmp_path, fitted_pipeline, monkeypatch):
+    api_server = serve_pipeline(tmp_path, fitted_pipeline, ASYNC_MAX_IN_FLIGHT=1)
+    application = CornerstoneAsgiApplication(api_server)
+    score_form_submission = api_server.score_form_submission
+    
+    def failing_score_form_submission(*args, **kwargs):
+        raise RuntimeError('scoring crashed')
+    
+    async def scenario():
+        monkeypatch.setattr(api_server, 'score_form_submission', failing_score_form_submission)
+        with pytest.raises(RuntimeError, match='scoring crashed'):
+            await call_application(application, '/cornerstone-predict', b'OverallQual=7',
+                                   b'application/x-www-form-urlencoded')
+        assert application.limiter.in_flight == 0
+        
+        # The single slot is free again for the next request
+        monkeypatch.setattr(api_server, 'score_form_submission', score_form_submission)
+        status, _, page = await call_application(application, '/cornerstone-predict', b'OverallQual=7',
+                                                 b'application/x-www-form-urlencoded')
+        assert status == 200 and b'Error' not in page
+        assert application.limiter.rejected == 0
+        await application.shutdown()
+    
+    asyncio.run(scenario())
+
+
+def test_graceful_shutdown_finishes_in_flight_requests(gated_application, batch_body):
+    application, scoring_started, release_scoring = gated_application
+    
+    async def scenario():
+        server = AsyncHttpServer(application, port=0)
+        listening = asyncio.Event()
+        serving = asyncio.create_task(server.serve(on_ready=lambda port: listening.set()))
+        await asyncio.wait_for(listening.wait(), 10)
+        
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(b'POST /cornerstone-predict/batch HTTP/1.1\r\nhost: localhost\r\n'
+                     b'content-type: application/json\r\ncontent-length: ' + str(len(batch_body)).encode('latin-1')
+                     + b'\r\n\r\n' + batch_body)
+        await writer.drain()
+        await asyncio.wait_for(wait_for_event(scoring_started), 10)
+        
+        server.stop()
+        await asyncio.sleep(0.05)
+        assert not serving.done()
+        # Draining: the admitted request keeps running while new ones are refused
+        status, _, _ = await call_application(application, '/cornerstone-predict/batch', batch_body)
+        assert status == 503
+        
+        release_scoring.set()
+        raw_response = await asyncio.wait_for(reader.read(), 10)
+        head, _, body = raw_response.partition(b'\r\n\r\n')
+        assert head.startswith(b'HTTP/1.1 200')
+        assert b'connection: close' in head
+        assert json.loads(body)['rows_predicted'] == 3
+        
+        await asyncio.wait_for(serving, 10)
+        writer.close()
+        assert application.limiter.in_flight == 0
+    
+    asyncio.run(scenario())
@@ -0,0 +1,152 @@
+"""
+Hot reload tests: change detection, smoke-test rejection and the atomic model swap.
+"""
+
+import copy
+import itertools
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import CornerstoneServiceConfig, InferenceServiceBridge
+from conftest import FEATURE_NAMES, fit_pipeline
+
+# Each publish moves the mtime a further second ahead, so every write changes the signature
+MTIME_OFFSETS = itertools.count(1)
+
+
+def publish_pipeline(artifact_directory, pipeline):
+    """Write the pipeline artifact and move its modification time forward"""
+    artifact_path = os.path.join(artifact_directory, 'pipeline.pkl')
+    joblib.dump(pipeline, artifact_path)
+    touch_artifact(artifact_directory)
+
+
+def touch_artifact(artifact_directory):
+    artifact_path = os.path.join(artifact_directory, 'pipeline.pkl')
+    modified_ns = os.stat(artifact_path).st_mtime_ns + next(MTIME_OFFSETS) * 1_000_000_000
+    os.utime(artifact_path, ns=(modified_ns, modified_ns))
+
+
+@pytest.fixture()
+def reloading_bridge(tmp_path, fitted_pipeline):
+    joblib.dump(FEATURE_NAMES, tmp_path / 'model_columns.pkl')
+    publish_pipeline(tmp_path, fitted_pipeline)
+    bridge = InferenceServiceBridge(str(tmp_path), CornerstoneServiceConfig(MODEL_RELOAD_INTERVAL_SECONDS=0))
+    assert bridge.load_inference_artifacts()
+    return bridge
+
+
+@pytest.fixture(scope='module')
+def replacement_pipeline(training_sales):
+    return fit_pipeline(*training_sales, n_estimators=12, max_depth=3)
+
+
+def non_finite_pipeline(pipeline):
+    broken = copy.deepcopy(pipeline)
+    for estimator in broken.named_steps['ensemble_predictor'].estimators_:
+        estimator.tree_.value[:] = np.nan
+    return broken
+
+
+def multi_output_pipeline(training_sales):
+    features, price = training_sales
+    return fit_pipeline(features, pd.DataFrame({'price': price, 'doubled': 2 * price}))
+
+
+# ==================== CHANGE DETECTION ====================
+def test_unchanged_artifact_is_not_reloaded(reloading_bridge):
+    active = reloading_bridge.active_model
+    assert not reloading_bridge.reload_if_changed()
+    assert reloading_bridge.active_model is active
+    assert reloading_bridge.reload_history['reload_count'] == 0
+
+
+def test_touched_artifact_adopts_signature_and_keeps_cache(reloading_bridge, tmp_path, probe_frames):
+    active = reloading_bridge.active_model
+    reloading_bridge.generate_batch_predictions(probe_frames['training'].to_numpy(dtype=np.float64), FEATURE_NAMES)
+    cached_rows = reloading_bridge.prediction_cache.statistics()['size']
+    
+    touch_artifact(tmp_path)
+    assert not reloading_bridge.reload_if_changed()
+    
+    adopted = reloading_bridge.active_model
+    assert adopted.version == active.version
+    assert adopted.artifact_signature != active.artifact_signature
+    assert reloading_bridge.prediction_cache.statistics()['size'] == cached_rows
+    assert reloading_bridge.reload_history['reload_count'] == 0
+
+
+def test_new_artifact_is_swapped_in(reloading_bridge, tmp_path, replacement_pipeline, probe_frames):
+    previous = reloading_bridge.active_model
+    publish_pipeline(tmp_path, replacement_pipeline)
+    
+    assert reloading_bridge.reload_if_changed()
+    assert reloading_bridge.active_model.version != previous.version
+    assert reloading_bridge.reload_history['reload_count'] == 1
+    frame = probe_frames['missing']
+    actual = reloading_bridge.generate_batch_predictions(frame.to_numpy(dtype=np.float64, copy=True), FEATURE_NAMES)
+    assert np.array_equal(actual, replacement_pipeline.predict(frame))
+
+
+# ==================== SMOKE-TEST REJECTION ====================
+@pytest.mark.parametrize('broken_kind', ['non_finite', 'wrong_shape'])
+def test_smoke_failure_keeps_active_model(reloading_bridge, tmp_path, fitted_pipeline, training_sales,
+                                          replacement_pipeline, broken_kind):
+    active = reloading_bridge.active_model
+    broken = non_finite_pipeline(fitted_pipeline) if broken_kind == 'non_finite' else multi_output_pipeline(training_sales)
+    publish_pipeline(tmp_path, broken)
+    
+    assert not reloading_bridge.reload_if_changed()
+    assert reloading_bridge.active_model is active
+    assert reloading_bridge.reload_history['failure_count'] == 1
+    assert 'Smoke prediction' in reloading_bridge.reload_history['last_error']
+    
+    # The rejected signature is not retried until the artifact changes again
+    assert not reloading_bridge.reload_if_changed()
+    assert reloading_bridge.reload_history['failure_count'] == 1
+    
+    publish_pipeline(tmp_path, replacement_pipeline)
+    assert reloading_bridge.reload_if_changed()
+    assert reloading_bridge.reload_history['last_error'] is None
+
+
+# ==================== ATOMIC SWAP ====================
+def test_requests_finish_on_their_snapshot_during_swaps(reloading_bridge, tmp_path, fitted_pipeline,
+                                                        replacement_pipeline, probe_frames):
+    frame = probe_frames['missing']
+    matrix = frame.to_numpy(dtype=np.float64, copy=True)
+    expected = {reloading_bridge.active_model.version: fitted_pipeline.predict(frame)}
+    publish_pipeline(tmp_path, replacement_pipeline)
+    assert reloading_bridge.reload_if_changed()
+    expected[reloading_bridge.active_model.version] = replacement_pipeline.predict(frame)
+    
+    stop = threading.Event()
+    failures = []
+    
+    def serve_requests():
+        while not stop.is_set():
+            # Requests pin one snapshot, as score_form_submission and score_batch_payload do
+            snapshot = reloading_bridge.select_model(None, None)
+            actual = reloading_bridge.generate_batch_predictions(matrix.copy(), FEATURE_NAMES, snapshot)
+            if not np.array_equal(actual, expected[snapshot.version]):
+                failures.append(snapshot.version)
+    
+    workers = [threading.Thread(target=serve_requests) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    try:
+        for pipeline in [fitted_pipeline, replacement_pipeline] * 5:
+            publish_pipeline(tmp_path, pipeline)
+            assert reloading_bridge.reload_if_changed()
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+    
+    assert failures == []
+    assert reloading_bridge.reload_history['reload_count'] == 11
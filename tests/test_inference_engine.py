@@ -0,0 +1,259 @@
+"""
+Agreement tests for the low-overhead prediction paths in inference_engine.py.
+Every fast path must reproduce Pipeline.predict bit for bit, not just approximately.
+"""
+
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference_engine import DirectForestPredictor, CompiledForestEngine, MicroBatchCoalescer
+from conftest import FEATURE_NAMES, fit_pipeline
+
+PROBE_KINDS = ['training', 'missing', 'out_of_range']
+
+
+def pipeline_predictions(pipeline, frame) -> np.ndarray:
+    return np.asarray(pipeline.predict(frame), dtype=np.float64)
+
+
+# ==================== DIRECT FOREST PREDICTOR ====================
+@pytest.mark.parametrize('probe_kind', PROBE_KINDS)
+def test_direct_predictor_matches_pipeline(fitted_pipeline, probe_frames, probe_kind):
+    frame = probe_frames[probe_kind]
+    predictor = DirectForestPredictor.from_pipeline(fitted_pipeline, FEATURE_NAMES)
+    
+    actual = predictor.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True))
+    assert np.array_equal(actual, pipeline_predictions(fitted_pipeline, frame))
+
+
+def test_model_built_pipeline_predicts_frames_without_warnings(fitted_pipeline, probe_frames):
+    """The forest is fitted on a named frame as in model.py, so scoring frames must not warn"""
+    assert list(fitted_pipeline.named_steps['ensemble_predictor'].feature_names_in_) == FEATURE_NAMES
+    predictor = DirectForestPredictor.from_pipeline(fitted_pipeline, FEATURE_NAMES)
+    
+    for frame in probe_frames.values():
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            expected = pipeline_predictions(fitted_pipeline, frame)
+        assert np.array_equal(predictor.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True)), expected)
+
+
+@pytest.mark.parametrize('probe_kind', PROBE_KINDS)
+def test_direct_tree_outputs_average_to_pipeline(fitted_pipeline, probe_frames, probe_kind):
+    frame = probe_frames[probe_kind]
+    predictor = DirectForestPredictor.from_pipeline(fitted_pipeline, FEATURE_NAMES)
+    
+    tree_outputs = predictor.predict_tree_outputs(frame.to_numpy(dtype=np.float64, copy=True))
+    assert tree_outputs.shape == (len(frame), len(predictor.estimators))
+    mean = np.add.accumulate(tree_outputs, axis=1)[:, -1] / tree_outputs.shape[1]
+    assert np.array_equal(mean, pipeline_predictions(fitted_pipeline, frame))
+
+
+def test_direct_predictor_imputes_in_place(fitted_pipeline):
+    predictor = DirectForestPredictor.from_pipeline(fitted_pipeline, FEATURE_NAMES)
+    buffer = np.full((1, len(FEATURE_NAMES)), np.nan)
+    
+    predictor.predict_buffer(buffer)
+    assert np.array_equal(buffer[0], predictor.imputation_medians)
+
+
+def test_direct_predictor_rejects_other_layouts(fitted_pipeline):
+    assert DirectForestPredictor.from_pipeline(fitted_pipeline, FEATURE_NAMES[:-1]) is None
+    assert DirectForestPredictor.from_pipeline(fitted_pipeline, list(reversed(FEATURE_NAMES))) is None
+
+
+# ==================== COMPILED FOREST ENGINE ====================
+@pytest.fixture(scope='module')
+def float32_leaf_pipeline(training_sales):
+    """
+    Forest whose leaves are float32-representable, as compaction guarantees: fully grown
+    trees on distinct rows leave one whole-dollar training price in every leaf
+    """
+    features, price = training_sales
+    return fit_pipeline(features, price.round(), max_features=0.5)
+
+
+def compile_pipeline(pipeline, quantize: bool = False) -> CompiledForestEngine:
+    return CompiledForestEngine.from_direct_predictor(
+        DirectForestPredictor.from_pipeline(pipeline, FEATURE_NAMES), quantize=quantize
+    )
+
+
+@pytest.mark.parametrize('tree_major', [False, True], ids=['all_trees', 'tree_major'])
+@pytest.mark.parametrize('probe_kind', PROBE_KINDS)
+def test_compiled_engine_matches_pipeline(fitted_pipeline, probe_frames, probe_kind, tree_major, monkeypatch):
+    if tree_major:
+        monkeypatch.setattr(CompiledForestEngine, 'TREE_MAJOR_ROW_THRESHOLD', 1)
+    frame = probe_frames[probe_kind]
+    engine = compile_pipeline(fitted_pipeline)
+    assert engine.node_threshold.dtype == np.float32
+    
+    actual = engine.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True))
+    assert np.array_equal(actual, pipeline_predictions(fitted_pipeline, frame))
+
+
+@pytest.mark.parametrize('probe_kind', PROBE_KINDS)
+def test_quantized_engine_matches_pipeline(float32_leaf_pipeline, probe_frames, probe_kind):
+    frame = probe_frames[probe_kind]
+    engine = compile_pipeline(float32_leaf_pipeline, quantize=True)
+    
+    # Half- and quarter-integer thresholds must take the scaled int16 encoding
+    assert engine.node_threshold.dtype == np.int16
+    assert engine.threshold_scale > 1.0
+    assert engine.node_value.dtype == np.float32
+    
+    actual = engine.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True))
+    assert np.array_equal(actual, pipeline_predictions(float32_leaf_pipeline, frame))
+
+
+@pytest.mark.parametrize('quantize', [False, True], ids=['float32', 'quantized'])
+def test_compiled_engine_round_trip(float32_leaf_pipeline, probe_frames, quantize, tmp_path):
+    engine = compile_pipeline(float32_leaf_pipeline, quantize=quantize)
+    artifact_directory = tmp_path / 'forest_engine'
+    engine.save(str(artifact_directory), metadata={'source': 'test'})
+    
+    loaded = CompiledForestEngine.load(str(artifact_directory), verify_checksums=True)
+    assert isinstance(loaded.node_threshold, np.memmap)
+    assert loaded.metadata == {'source': 'test'}
+    assert loaded.threshold_scale == engine.threshold_scale
+    for name in CompiledForestEngine.ARRAY_FIELDS:
+        assert getattr(loaded, name).dtype == getattr(engine, name).dtype
+    
+    for frame in probe_frames.values():
+        actual = loaded.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True))
+        assert np.array_equal(actual, pipeline_predictions(float32_leaf_pipeline, frame))
+
+
+def test_compiled_engine_rejects_corrupted_buffers(fitted_pipeline, tmp_path):
+    artifact_directory = tmp_path / 'forest_engine'
+    compile_pipeline(fitted_pipeline).save(str(artifact_directory))
+    with open(artifact_directory / 'node_value.npy', 'r+b') as buffer_file:
+        buffer_file.seek(-8, 2)
+        buffer_file.write(b'\xff' * 8)
+    
+    with pytest.raises(ValueError, match='Checksum mismatch'):
+        CompiledForestEngine.load(str(artifact_directory), verify_checksums=True)
+
+
+# ==================== PREDICTION LATTICE ====================
+@pytest.fixture(scope='module')
+def shallow_pipeline(training_sales):
+    """A forest small enough for the dense lattice"""
+    return fit_pipeline(*training_sales, n_estimators=12, max_depth=3)
+
+
+def threshold_edge_rows(engine: CompiledForestEngine, base_matrix: np.ndarray) -> np.ndarray:
+    """Rows moved exactly onto, just above and just below every split threshold"""
+    generator = np.random.default_rng(3)
+    edge_rows = []
+    for feature, thresholds in enumerate(engine.split_thresholds()):
+        for edge_values in (thresholds, np.nextafter(thresholds, np.float32(np.inf)),
+                            np.nextafter(thresholds, np.float32(-np.inf))):
+            rows = base_matrix[generator.integers(len(base_matrix), size=len(thresholds))].copy()
+            rows[:, feature] = edge_values
+            edge_rows.append(rows)
+    return np.vstack(edge_rows)
+
+
+@pytest.mark.parametrize('quantize', [False, True], ids=['float32', 'quantized'])
+def test_lattice_matches_compiled_engine(shallow_pipeline, probe_frames, quantize):
+    engine = compile_pipeline(shallow_pipeline, quantize=quantize)
+    assert engine.attach_lattice(max_cells=10 ** 7)
+    
+    base_matrix = probe_frames['training'].fillna(0).to_numpy(dtype=np.float64)
+    probes = np.vstack([frame.to_numpy(dtype=np.float64) for frame in probe_frames.values()]
+                       + [threshold_edge_rows(engine, base_matrix)])
+    lattice_predictions = engine.predict_buffer(probes.copy())
+    engine.lattice = None
+    traversal_predictions = engine.predict_buffer(probes.copy())
+    
+    assert np.array_equal(lattice_predictions, traversal_predictions)
+    if not quantize:
+        expected = pipeline_predictions(shallow_pipeline, pd.DataFrame(probes, columns=FEATURE_NAMES))
+        assert np.array_equal(lattice_predictions, expected)
+
+
+def test_lattice_round_trip(shallow_pipeline, probe_frames, tmp_path):
+    engine = compile_pipeline(shallow_pipeline)
+    engine.attach_lattice(max_cells=10 ** 7)
+    engine.save(str(tmp_path / 'forest_engine'))
+    
+    loaded = CompiledForestEngine.load(str(tmp_path / 'forest_engine'), verify_checksums=True)
+    assert loaded.lattice is not None and loaded.lattice.cell_count == engine.lattice.cell_count
+    for frame in probe_frames.values():
+        actual = loaded.predict_buffer(frame.to_numpy(dtype=np.float64, copy=True))
+        assert np.array_equal(actual, pipeline_predictions(shallow_pipeline, frame))
+
+
+def test_lattice_skipped_beyond_cell_budget(fitted_pipeline):
+    engine = compile_pipeline(fitted_pipeline)
+    assert not engine.attach_lattice(max_cells=10 ** 6)
+    assert engine.lattice is None
+
+
+# ==================== MICRO-BATCH COALESCER ====================
+def submit_concurrently(coalescer, rows, predict_batch):
+    """Submit every row from its own thread at once; each outcome is a value or the raised error"""
+    start = threading.Barrier(len(rows))
+    
+    def submit(row):
+        start.wait()
+        try:
+            return coalescer.submit('model', row, predict_batch)
+        except Exception as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=len(rows)) as executor:
+        return list(executor.map(submit, rows))
+
+
+def test_coalesced_callers_receive_their_own_rows():
+    coalescer = MicroBatchCoalescer(max_batch_rows=4, max_wait_seconds=5.0)
+    batch_sizes = []
+    
+    def predict_batch(matrix):
+        batch_sizes.append(len(matrix))
+        return matrix[:, 0] * 10.0 + matrix[:, 1]
+    
+    rows = [np.array([float(caller), 0.5]) for caller in range(8)]
+    results = submit_concurrently(coalescer, rows, predict_batch)
+    
+    assert results == [caller * 10.0 + 0.5 for caller in range(8)]
+    assert batch_sizes == [4, 4]
+    statistics = coalescer.statistics()
+    assert statistics['size_flushes'] == 2 and statistics['deadline_flushes'] == 0
+
+
+def test_leader_error_reaches_every_follower():
+    coalescer = MicroBatchCoalescer(max_batch_rows=3, max_wait_seconds=5.0)
+    failure = ValueError('predict failed')
+    
+    def predict_batch(matrix):
+        raise failure
+    
+    results = submit_concurrently(coalescer, [np.zeros(2)] * 3, predict_batch)
+    
+    assert all(result is failure for result in results)
+    assert coalescer.statistics()['errors'] == 1
+    
+    # The failed batch is closed: the next rows start a fresh one
+    assert submit_concurrently(coalescer, [np.ones(2)] * 3, lambda matrix: matrix.sum(axis=1)) == [2.0] * 3
+
+
+def test_lone_row_flushes_at_the_deadline():
+    coalescer = MicroBatchCoalescer(max_batch_rows=32, max_wait_seconds=0.05)
+    
+    started = time.perf_counter()
+    result = coalescer.submit('model', np.array([3.0]), lambda matrix: matrix[:, 0])
+    elapsed = time.perf_counter() - started
+    
+    assert result == 3.0
+    assert 0.05 <= elapsed < 1.0
+    statistics = coalescer.statistics()
+    assert statistics['deadline_flushes'] == 1 and statistics['size_flushes'] == 0
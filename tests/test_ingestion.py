@@ -0,0 +1,71 @@
+"""
+Ingestion tests: the streaming ingestor and the columnar cache with the default
+INGESTION_DTYPES must accept missing values in any model column.
+"""
+
+import numpy as np
+import pytest
+
+from columnar_cache import ColumnarDatasetCache
+from model import CornerstoneModelConfig, DatasetOrchestrator
+from conftest import FEATURE_NAMES, synthetic_sales
+
+
+@pytest.fixture()
+def sales_with_gaps(tmp_path):
+    """train.csv with at least one missing value in every model column"""
+    features, price = synthetic_sales(300, seed=3)
+    frame = features.assign(SalePrice=price.round(), Id=np.arange(len(features)))
+    for position, column in enumerate(FEATURE_NAMES + ['SalePrice']):
+        frame.loc[position, column] = np.nan
+    frame.to_csv(tmp_path / 'train.csv', index=False)
+    return frame
+
+
+@pytest.mark.parametrize('ingestion_mode', ['memory', 'streaming'])
+@pytest.mark.parametrize('cache_enabled', [False, True], ids=['csv', 'cache'])
+def test_ingestion_accepts_missing_values(tmp_path, sales_with_gaps, ingestion_mode, cache_enabled):
+    config = CornerstoneModelConfig(INGESTION_MODE=ingestion_mode, DATASET_CACHE_ENABLED=cache_enabled,
+                                    INGESTION_CHUNK_ROWS=64)
+    X_train, X_test, y_train, y_test = DatasetOrchestrator(str(tmp_path), config).prepare_training_partitions()
+    
+    assert len(X_train) + len(X_test) == len(sales_with_gaps)
+    assert list(X_train.columns) == FEATURE_NAMES
+    assert not X_train.isna().any().any() and not X_test.isna().any().any()
+    assert not y_train.isna().any() and not y_test.isna().any()
+
+
+def test_cached_load_keeps_missing_values(tmp_path, sales_with_gaps):
+    config = CornerstoneModelConfig(DATASET_CACHE_ENABLED=True)
+    
+    # Written by the first load, mapped by the second
+    for _ in range(2):
+        loaded = DatasetOrchestrator(str(tmp_path), config).load_training_data()
+    
+    expected = sales_with_gaps[FEATURE_NAMES + ['SalePrice']]
+    assert list(loaded.columns) == list(expected.columns)
+    assert np.array_equal(loaded.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), equal_nan=True)
+
+
+def test_default_load_returns_every_csv_column(tmp_path, sales_with_gaps):
+    loaded = DatasetOrchestrator(str(tmp_path), CornerstoneModelConfig()).load_training_data()
+    assert list(loaded.columns) == list(sales_with_gaps.columns)
+
+
+def test_cache_entries_are_separate_per_source_file(tmp_path):
+    cache_root = str(tmp_path / 'dataset_cache')
+    caches = []
+    for seed in (1, 2):
+        features, price = synthetic_sales(50, seed=seed)
+        source_path = tmp_path / f'sales_{seed}.csv'
+        features.assign(SalePrice=price.round()).to_csv(source_path, index=False)
+        caches.append(ColumnarDatasetCache(cache_root, str(source_path), FEATURE_NAMES + ['SalePrice'], {}))
+    
+    first, second = caches
+    assert first.schema_key() != second.schema_key()
+    
+    # Building the second file must leave the first file's entry current
+    first.ensure()
+    second.ensure()
+    assert first.is_current() and second.is_current()
+    assert not np.array_equal(first.load_frame().to_numpy(), second.load_frame().to_numpy())
@@ -0,0 +1,108 @@
+"""
+Compaction tests: pruned trees predict what merging their leaves should give, and a
+compacted forest is only returned when it stays within tolerance.
+"""
+
+import functools
+
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+
+import model_compaction
+from model import CornerstoneModelConfig
+from model_compaction import ForestCompactor, check_tree_internals, prune_tree
+from conftest import fit_pipeline, synthetic_sales
+
+
+def merged_leaf_expectation(tree, feature_matrix: np.ndarray, merge_tolerance: float, max_depth=None) -> np.ndarray:
+    """
+    Reference for prune_tree, walking the original tree: a row stops at the first node
+    on its path that is a leaf, sits at max_depth or whose leaves all lie within
+    merge_tolerance of each other, and predicts that node's value rounded to float32.
+    """
+    left, right = tree.children_left, tree.children_right
+    values = tree.value.reshape(tree.node_count, -1)[:, 0]
+    
+    @functools.lru_cache(maxsize=None)
+    def leaf_range(node):
+        if left[node] == -1:
+            return values[node], values[node]
+        left_low, left_high = leaf_range(left[node])
+        right_low, right_high = leaf_range(right[node])
+        return min(left_low, right_low), max(left_high, right_high)
+    
+    expected = np.empty(len(feature_matrix))
+    for row, features in enumerate(feature_matrix.astype(np.float32)):
+        node, depth = 0, 0
+        while left[node] != -1 and (max_depth is None or depth < max_depth):
+            low, high = leaf_range(node)
+            if high - low <= merge_tolerance:
+                break
+            node = left[node] if features[tree.feature[node]] <= tree.threshold[node] else right[node]
+            depth += 1
+        expected[row] = np.float32(values[node])
+    return expected
+
+
+@pytest.fixture(scope='module')
+def sales():
+    features, price = synthetic_sales(600, seed=5)
+    return features.fillna(features.median()), price
+
+
+@pytest.mark.parametrize('merge_tolerance, max_depth', [(0.0, None), (5000.0, None), (0.0, 4), (2000.0, 6)])
+def test_pruned_tree_matches_merged_leaf_expectation(sales, merge_tolerance, max_depth):
+    features, price = sales
+    feature_matrix = features.to_numpy(dtype=np.float64)
+    tree = DecisionTreeRegressor(random_state=0).fit(feature_matrix, price).tree_
+    
+    pruned = prune_tree(tree, feature_matrix.shape[1], merge_tolerance, max_depth)
+    assert pruned.node_count <= tree.node_count
+    if max_depth is not None:
+        assert pruned.max_depth <= max_depth
+    
+    probes = np.vstack([feature_matrix, np.random.default_rng(1).uniform(-1e4, 1e4, (100, feature_matrix.shape[1]))])
+    actual = pruned.predict(probes.astype(np.float32)).reshape(-1)
+    assert np.array_equal(actual, merged_leaf_expectation(tree, probes, merge_tolerance, max_depth))
+
+
+def test_tree_internals_guard_rejects_unverified_sklearn(sales, monkeypatch):
+    features, price = sales
+    tree = DecisionTreeRegressor(max_depth=3).fit(features, price).tree_
+    check_tree_internals(tree)
+    
+    monkeypatch.setattr(model_compaction.sklearn, '__version__', '9.0.0')
+    with pytest.raises(RuntimeError, match='9.0.0'):
+        check_tree_internals(tree)
+
+
+def compactor_inputs(sales):
+    features, price = sales
+    pipeline = fit_pipeline(features.iloc[:400], price.iloc[:400], n_estimators=30)
+    return pipeline, features.iloc[400:], price.iloc[400:]
+
+
+def test_compaction_within_tolerance_returns_compacted_pipeline(sales):
+    pipeline, X_selection, y_selection = compactor_inputs(sales)
+    compactor = ForestCompactor(CornerstoneModelConfig(COMPACTION_TOLERANCE=1.0, COMPACTION_MIN_TREES=5))
+    
+    compacted = compactor.compact(pipeline, X_selection, y_selection)
+    assert compacted is not None
+    assert compactor.compaction_report['within_tolerance']
+    assert len(compacted.steps[-1][1].estimators_) <= len(pipeline.steps[-1][1].estimators_)
+
+
+def test_compaction_outside_tolerance_keeps_original(sales):
+    pipeline, X_selection, y_selection = compactor_inputs(sales)
+    compactor = ForestCompactor(CornerstoneModelConfig(COMPACTION_TOLERANCE=-0.5, COMPACTION_MAX_DEPTH=2))
+    
+    assert compactor.compact(pipeline, X_selection, y_selection) is None
+    assert not compactor.compaction_report['within_tolerance']
+
+
+def test_compaction_skipped_on_unverified_sklearn(sales, monkeypatch):
+    pipeline, X_selection, y_selection = compactor_inputs(sales)
+    monkeypatch.setattr(model_compaction.sklearn, '__version__', '9.0.0')
+    
+    assert ForestCompactor(CornerstoneModelConfig()).compact(pipeline, X_selection, y_selection) is None
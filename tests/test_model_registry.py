@@ -0,0 +1,62 @@
+"""
+Versioned registry tests: content-addressed publishing, alias routing and retention.
+"""
+
+import json
+import os
+
+import pytest
+
+from model_registry import VersionedModelRegistry
+
+
+def publish(registry: VersionedModelRegistry, payload: bytes, created_at: str) -> str:
+    """Commit a version holding payload as its pipeline, with a fixed creation time"""
+    staging_directory = registry.stage_version()
+    with open(os.path.join(staging_directory, registry.PIPELINE_NAME), 'wb') as pipeline_file:
+        pipeline_file.write(payload)
+    model_id = registry.commit_version(staging_directory, {'features': []})
+    
+    manifest_path = os.path.join(registry.model_directory(model_id), registry.MANIFEST_NAME)
+    manifest = registry.read_manifest(model_id)
+    manifest['created_at'] = created_at
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+    return model_id
+
+
+@pytest.fixture()
+def registry(tmp_path):
+    return VersionedModelRegistry(str(tmp_path / 'model_registry'))
+
+
+@pytest.fixture()
+def model_ids(registry):
+    """Five versions, oldest first"""
+    return [publish(registry, f'model {position}'.encode(), f'2026-01-0{position + 1}T00:00:00Z')
+            for position in range(5)]
+
+
+def test_republishing_identical_bytes_returns_existing_id(registry, model_ids):
+    assert publish(registry, b'model 0', '2026-02-01T00:00:00Z') == model_ids[0]
+    assert len(registry.list_versions()) == 5
+
+
+def test_prune_keeps_newest_versions(registry, model_ids):
+    assert registry.prune_versions(2) == model_ids[:3]
+    assert [manifest['model_id'] for manifest in registry.list_versions()] == model_ids[3:]
+    assert sorted(os.listdir(registry.models_root)) == sorted(model_ids[3:])
+
+
+def test_prune_keeps_routed_versions(registry, model_ids):
+    registry.assign_alias('production', model_ids[0])
+    registry.set_traffic_split('default', {model_ids[1]: 0.9, 'production': 0.1})
+    
+    assert registry.prune_versions(1) == model_ids[2:4]
+    assert registry.resolve('production') == model_ids[0]
+    assert {manifest['model_id'] for manifest in registry.list_versions()} == {model_ids[0], model_ids[1], model_ids[4]}
+
+
+def test_prune_without_excess_is_a_no_op(registry, model_ids):
+    assert registry.prune_versions(10) == []
+    assert len(registry.list_versions()) == 5
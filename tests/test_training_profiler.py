@@ -0,0 +1,67 @@
+"""
+Training profiler tests: a run that raises must still release the profiler and
+leave a partial report marked as failed.
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+from model import CornerstoneModelConfig, finish_training_profiler, profiled_training_run
+
+
+class Component:
+    def work(self) -> int:
+        return 1
+    
+    def fail(self):
+        raise RuntimeError('fit exploded')
+
+
+@pytest.fixture()
+def profiling_config():
+    assert not tracemalloc.is_tracing()
+    return CornerstoneModelConfig(PROFILING_ENABLED=True)
+
+
+def assert_released(profiler, component):
+    assert not profiler.is_running
+    assert not tracemalloc.is_tracing()
+    assert not profiler.rss_sampler._thread.is_alive()
+    assert 'work' not in vars(component) and 'fail' not in vars(component)
+
+
+def test_failed_run_writes_partial_report_and_releases_profiler(tmp_path, profiling_config):
+    component = Component()
+    with pytest.raises(RuntimeError, match='fit exploded'):
+        with profiled_training_run(profiling_config, str(tmp_path), 'full') as profiler:
+            profiler.begin_phase('ensemble_construction')
+            profiler.instrument(component)
+            component.work()
+            component.fail()
+    
+    assert_released(profiler, component)
+    report = json.loads((tmp_path / profiling_config.PROFILE_ARTIFACT_NAME).read_text())
+    assert report['status'] == 'failed'
+    assert report['error'] == 'RuntimeError: fit exploded'
+    assert report['context'] == {'mode': 'full'}
+    assert [phase['name'] for phase in report['phases']] == ['ensemble_construction']
+    assert [call['name'] for call in report['calls']] == ['Component.work', 'Component.fail']
+    
+    history = [json.loads(line) for line in (tmp_path / profiling_config.PROFILE_HISTORY_NAME).read_text().splitlines()]
+    assert [line['status'] for line in history] == ['failed']
+
+
+def test_completed_run_reports_its_own_context(tmp_path, profiling_config):
+    component = Component()
+    with profiled_training_run(profiling_config, str(tmp_path), 'full') as profiler:
+        profiler.begin_phase('ensemble_construction')
+        profiler.instrument(component)
+        component.work()
+        finish_training_profiler(profiler, profiling_config, str(tmp_path), {'mode': 'full', 'model_id': 'm1'})
+    
+    assert_released(profiler, component)
+    report = json.loads((tmp_path / profiling_config.PROFILE_ARTIFACT_NAME).read_text())
+    assert report['status'] == 'completed' and report['error'] is None
+    assert report['context'] == {'mode': 'full', 'model_id': 'm1'}
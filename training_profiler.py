@@ -0,0 +1,395 @@
+"""
+Cornerstone Training Profiler
+=============================
+Per-method and per-phase resource accounting for a training run.
+
+execute_cornerstone_training only logs its phase banners, which says nothing about
+whether the CSV parse, the feature copy, the median fill, the forest fit or the
+joblib dump dominates on a large dataset. In profiling mode every method of the
+DatasetOrchestrator, PredictorEnsembleBuilder and ModelArtifactRegistry instances
+of the run is wrapped, and each call records:
+
+- wall time and CPU time (all threads of the process, plus reaped child processes
+  such as the search pool)
+- RSS at entry and exit and the peak RSS while it ran (sampled by a background thread)
+- the peak of Python-traced allocations above the level at entry (tracemalloc;
+  NumPy buffers are traced as well)
+
+Nested calls are attributed correctly: a method's peak includes its callees, and
+its self time excludes them. The training phases are recorded the same way. The
+report is written as JSON next to the other artifacts, one summary line per run
+is appended to a history file for tracking across runs, and a cProfile dump of the
+whole run can be added for function-level detail (open it with pstats or snakeviz).
+A run that raises still gets its partial report, marked as failed.
+
+Usage:
+    python model.py --profile [--cprofile] [--no-tracemalloc]
+
+Components:
+- RssPeakSampler: Background thread keeping the highest RSS seen since the last reset
+- TrainingProfiler: Wraps component methods, tracks phases and writes the report,
+  the run history line and the optional cProfile dump
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import platform
+import threading
+import functools
+import inspect
+import logging
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MEGABYTE = 1024 * 1024
+
+
+# ==================== RSS SAMPLING ====================
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (None where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def process_peak_rss_bytes() -> Optional[int]:
+    """Highest RSS of the process so far, as reported by the kernel"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssPeakSampler:
+    """
+    Samples the current RSS every interval_seconds on a daemon thread.
+    The kernel's ru_maxrss only ever grows, so per-call peaks need their own maximum
+    that can be collected and reset at every call boundary.
+    """
+    
+    def __init__(self, interval_seconds: float = 0.01):
+        self.interval_seconds = interval_seconds
+        self._peak = current_rss_bytes() or 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Begin sampling in the background"""
+        self._thread = threading.Thread(target=self._sample, name='cornerstone-rss-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _sample(self):
+        """Sampling loop"""
+        while not self._stopped.wait(self.interval_seconds):
+            self._observe(current_rss_bytes() or 0)
+    
+    def _observe(self, rss: int):
+        """Fold one sample into the running peak"""
+        with self._lock:
+            self._peak = max(self._peak, rss)
+    
+    def collect(self) -> int:
+        """Peak RSS since the last collect (including right now), then restart from the current RSS"""
+        rss = current_rss_bytes() or 0
+        with self._lock:
+            peak, self._peak = max(self._peak, rss), rss
+        return peak
+
+
+# ==================== TRAINING PROFILER ====================
+class TrainingProfiler:
+    """
+    Records wall time, CPU time, peak RSS and peak traced allocations of every
+    instrumented method call and of every training phase.
+    Open calls form a stack: when a call starts or ends, the peaks gathered so far are
+    folded into the caller before the samplers are reset, so each entry's peak covers
+    exactly its own lifetime, callees included. A disabled profiler does nothing.
+    """
+    
+    def __init__(self, enabled: bool = True, trace_allocations: bool = True, cprofile: bool = False,
+                 sample_interval_seconds: float = 0.01):
+        self.enabled = enabled
+        self.trace_allocations = trace_allocations
+        self.cprofile = cprofile
+        self.rss_sampler = RssPeakSampler(sample_interval_seconds)
+        self.calls: List[Dict[str, Any]] = []
+        self.phases: List[Dict[str, Any]] = []
+        self.profile_report: Dict[str, Any] = {}
+        self._stack: List[Dict[str, Any]] = []
+        self._phase_frame: Optional[Dict[str, Any]] = None
+        self._run_frame: Optional[Dict[str, Any]] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._instrumented: List[Tuple[Any, str]] = []
+        self._started_tracemalloc = False
+        self._started_at = 0.0
+    
+    # ---------- Run lifecycle ----------
+    
+    def start(self):
+        """Start the samplers (and cProfile) for the whole run"""
+        if not self.enabled:
+            return
+        
+        self._started_at = time.time()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.rss_sampler.start()
+        self._run_frame = self._open_frame('run', 'run')
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+    
+    def begin_phase(self, name: str):
+        """Close the current training phase, if any, and open the next one"""
+        if not self.enabled:
+            return
+        
+        self._end_phase()
+        self._phase_frame = self._open_frame(name, 'phase')
+    
+    def _end_phase(self):
+        """Record the open phase"""
+        if self._phase_frame is not None:
+            self.phases.append(self._close_frame(self._phase_frame))
+            self._phase_frame = None
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether start() was called and finish() has not run yet"""
+        return self._run_frame is not None
+    
+    def finish(self, report_path: str, history_path: Optional[str] = None, stats_path: Optional[str] = None,
+               context: Optional[Dict[str, Any]] = None, status: str = 'completed',
+               error: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Stop profiling and write the JSON report, the history line and the cProfile dump.
+        status and error mark the partial report of a run that raised before completing.
+        """
+        if not self.enabled or self._run_frame is None:
+            return None
+        
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+            self._end_phase()
+            run = self._close_frame(self._run_frame)
+        finally:
+            self._run_frame = None
+            self.release()
+        
+        peak_rss = process_peak_rss_bytes()
+        self.profile_report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self._started_at)),
+            'status': status,
+            'error': error,
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'context': context or {},
+            'trace_allocations': self.trace_allocations,
+            'run': {**run, 'process_peak_rss_mb': peak_rss / MEGABYTE if peak_rss is not None else None},
+            'phases': self.phases,
+            'methods': self.summarize_methods(),
+            'calls': self.calls
+        }
+        
+        if self._profile is not None and stats_path:
+            self._profile.dump_stats(stats_path)
+            self.profile_report['cprofile'] = {
+                'stats_path': stats_path,
+                'top_cumulative': self.top_functions(self._profile)
+            }
+        
+        self._write_json(report_path, self.profile_report)
+        if history_path:
+            self._append_history(history_path)
+        
+        logger.info(f"Training profile ({status}) persisted to {report_path} ({run['wall_seconds']:.2f}s wall, "
+                    f"{run['cpu_seconds']:.2f}s CPU, peak RSS {run['peak_rss_mb']:.0f} MB)")
+        for method in self.profile_report['methods'][:5]:
+            logger.info(f"  {method['name']}: {method['self_wall_seconds']:.2f}s self, "
+                        f"{method['wall_seconds']:.2f}s total over {method['calls']} call(s)")
+        return self.profile_report
+    
+    def release(self):
+        """Stop the sampler thread and tracemalloc and unwrap the instrumented methods (idempotent)"""
+        self.rss_sampler.stop()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        for component, name in self._instrumented:
+            vars(component).pop(name, None)
+        self._instrumented.clear()
+    
+    # ---------- Instrumentation ----------
+    
+    def instrument(self, *components: Any):
+        """Wrap every method of the given objects (on the instances only, the classes are untouched)"""
+        if not self.enabled:
+            return
+        
+        for component in components:
+            class_name = type(component).__name__
+            for name in dir(type(component)):
+                if name.startswith('__'):
+                    continue
+                attribute = inspect.getattr_static(component, name)
+                if isinstance(attribute, (staticmethod, classmethod)) or inspect.isfunction(attribute):
+                    setattr(component, name, self._wrap(getattr(component, name), f'{class_name}.{name}'))
+                    self._instrumented.append((component, name))
+    
+    def _wrap(self, method, qualified_name: str):
+        """Profiled stand-in for one bound method"""
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            frame = self._open_frame(qualified_name, 'method')
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.calls.append(self._close_frame(frame))
+        return profiled
+    
+    # ---------- Measurement ----------
+    
+    def _collect_peaks(self):
+        """Fold the peaks since the last call boundary into every open frame"""
+        rss_peak = self.rss_sampler.collect()
+        traced_peak = 0
+        if tracemalloc.is_tracing():
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        for frame in self._stack:
+            frame['rss_peak'] = max(frame['rss_peak'], rss_peak)
+            frame['traced_peak'] = max(frame['traced_peak'], traced_peak)
+    
+    def _open_frame(self, name: str, kind: str) -> Dict[str, Any]:
+        """Snapshot the counters at the start of a call or phase"""
+        self._collect_peaks()
+        child_times = os.times()
+        rss = current_rss_bytes() or 0
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        frame = {
+            'name': name,
+            'kind': kind,
+            'parent': self._stack[-1]['name'] if self._stack else None,
+            'phase': self._phase_frame['name'] if self._phase_frame is not None else None,
+            'depth': len(self._stack),
+            'wall_start': time.perf_counter(),
+            'cpu_start': time.process_time(),
+            'child_cpu_start': child_times.children_user + child_times.children_system,
+            'rss_start': rss,
+            'rss_peak': rss,
+            'traced_start': traced,
+            'traced_peak': traced,
+            'child_wall': 0.0
+        }
+        self._stack.append(frame)
+        return frame
+    
+    def _close_frame(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """Measure a finished call or phase and credit its wall time to the enclosing one"""
+        wall = time.perf_counter() - frame['wall_start']
+        cpu = time.process_time() - frame['cpu_start']
+        child_times = os.times()
+        self._collect_peaks()
+        rss = current_rss_bytes() or 0
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        
+        # Phases are closed in sequence rather than nested, so pop by identity
+        self._stack = [open_frame for open_frame in self._stack if open_frame is not frame]
+        if frame['kind'] == 'method' and self._stack:
+            self._stack[-1]['child_wall'] += wall
+        
+        record = {
+            'name': frame['name'],
+            'kind': frame['kind'],
+            'parent': frame['parent'],
+            'phase': frame['phase'],
+            'depth': frame['depth'],
+            'wall_seconds': wall,
+            'self_wall_seconds': wall - frame['child_wall'],
+            'cpu_seconds': cpu,
+            'child_process_cpu_seconds': child_times.children_user + child_times.children_system - frame['child_cpu_start'],
+            'rss_start_mb': frame['rss_start'] / MEGABYTE,
+            'rss_end_mb': rss / MEGABYTE,
+            'peak_rss_mb': frame['rss_peak'] / MEGABYTE
+        }
+        if self.trace_allocations:
+            record['peak_traced_mb'] = (frame['traced_peak'] - frame['traced_start']) / MEGABYTE
+            record['traced_delta_mb'] = (traced - frame['traced_start']) / MEGABYTE
+        return record
+    
+    # ---------- Report ----------
+    
+    def summarize_methods(self) -> List[Dict[str, Any]]:
+        """Calls aggregated per method, most expensive self time first"""
+        peak_keys = ('peak_rss_mb', 'peak_traced_mb') if self.trace_allocations else ('peak_rss_mb',)
+        summaries: Dict[str, Dict[str, Any]] = {}
+        for call in self.calls:
+            summary = summaries.setdefault(call['name'], {
+                'name': call['name'], 'calls': 0, 'wall_seconds': 0.0, 'self_wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                **{key: 0.0 for key in peak_keys}
+            })
+            summary['calls'] += 1
+            for key in ('wall_seconds', 'self_wall_seconds', 'cpu_seconds'):
+                summary[key] += call[key]
+            for key in peak_keys:
+                summary[key] = max(summary[key], call[key])
+        return sorted(summaries.values(), key=lambda summary: summary['self_wall_seconds'], reverse=True)
+    
+    @staticmethod
+    def top_functions(profile: cProfile.Profile, limit: int = 25) -> List[Dict[str, Any]]:
+        """Functions with the highest cumulative time in a cProfile run"""
+        entries = []
+        for (filename, line, function), (_, call_count, total_time, cumulative_time, _) in pstats.Stats(profile).stats.items():
+            entries.append({
+                'function': f'{os.path.basename(filename)}:{line}({function})',
+                'calls': call_count,
+                'total_seconds': total_time,
+                'cumulative_seconds': cumulative_time
+            })
+        return sorted(entries, key=lambda entry: entry['cumulative_seconds'], reverse=True)[:limit]
+    
+    def _append_history(self, history_path: str):
+        """One line per run: totals and per-phase wall time, for tracking across runs"""
+        run = self.profile_report['run']
+        line = {
+            'started_at': self.profile_report['started_at'],
+            'status': self.profile_report['status'],
+            'context': self.profile_report['context'],
+            'wall_seconds': run['wall_seconds'],
+            'cpu_seconds': run['cpu_seconds'],
+            'peak_rss_mb': run['peak_rss_mb'],
+            'phases': {phase['name']: phase['wall_seconds'] for phase in self.phases}
+        }
+        with open(history_path, 'a') as history_file:
+            history_file.write(json.dumps(line, default=str) + '\n')
+    
+    @staticmethod
+    def _write_json(report_path: str, report: Dict[str, Any]):
+        """Replace the JSON report atomically"""
+        staging_path = f'{report_path}.tmp-{os.getpid()}'
+        with open(staging_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2, default=str)
+        os.replace(staging_path, report_path)